@@ -0,0 +1,338 @@
+"""
+Script-generation throughput benchmarks for pyFlightscript.
+
+Each workload drives the public API the way a user script does and reports commands per
+second (one command is one pyfs call) and script bytes per second. The write workloads
+time State.write_to_file for an in-memory script and for a streamed one; read_script times
+parsing a generated script back into commands. read_tecplot times loading a Tecplot ASCII
+file such as export_volume_section_tecplot writes, counting values instead of commands and
+reporting the file size, so its MB/s is the read throughput. The *_compact workloads repeat
+a workload in compact mode (pyfs.compact_mode) and are reported against it as size and time
+ratios.
+
+Results can be stored as baselines and later runs compared against them; a workload whose
+throughput drops by more than the tolerance is reported as a regression and the run exits
+with status 1. Baselines are only meaningful on the machine that recorded them.
+
+Usage:
+    python benchmarks/bench_generation.py                  # run, compare to stored baselines
+    python benchmarks/bench_generation.py --save           # run, store as new baselines
+    python benchmarks/bench_generation.py --quick -k sweep # small scale, matching workloads only
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pyFlightscript as pyfs
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+def convergence_sweep(tmpdir, scale):
+    """ccs_import + initialize_solver + execute_solver_sweeper loop of WriteConvergenceScript.py."""
+    ccs_path = os.path.join(tmpdir, 'Analysis.csv')
+    with open(ccs_path, 'w') as file:
+        file.write('Mesh_U;80;1;1;1\n')
+    cases = 10000 * scale // 10
+
+    pyfs.open_fsm(fsm_filepath=os.path.join(tmpdir, 'base.fsm'))
+    pyfs.surface_clearall()
+    for case in range(cases):
+        pyfs.ccs_import(ccs_path)
+        pyfs.solver_uninitialize()
+        pyfs.set_vorticity_drag_boundaries(-1)
+        pyfs.initialize_solver(-1, 1, symmetry_periodicity=1,
+                               proximity_avoidance='DISABLE', stabilization='DISABLE', stabilization_strength=1.0,
+                               fast_multipole='ENABLE', wake_termination_x='DEFAULT', symmetry_type='PLANE')
+        pyfs.change_scene_to('PLOTS')
+        pyfs.execute_solver_sweeper(os.path.join(tmpdir, 'results', f'AnalysisU{case}.txt'),
+                                    angle_of_attack='ENABLE', angle_of_attack_start=0.0,
+                                    angle_of_attack_stop=15, angle_of_attack_delta=15,
+                                    export_surface_data_per_step='DISABLE',
+                                    clear_solution_after_each_run='DISABLE',
+                                    reference_velocity_equals_freestream='ENABLE',
+                                    append_to_existing_sweep='DISABLE')
+    pyfs.close_flightstream()
+    return 3 + 6 * cases
+
+def stability_coefficients(tmpdir, scale):
+    """Stability toolbox setup and AOA loop of run_stability_coefficients.py, repeated."""
+    V0, cref, bref = 10.0, 1.0, 10.0
+    coefficients = [('CL', 'AOA', 1, 'CLA'), ('CD', 'AOA', 1, 'CDA'), ('MOMENT_Y', 'AOA', 1, 'CmA'),
+                    ('FORCE_Y', 'BETA', 1, 'CYB'), ('MOMENT_X', 'BETA', 1, 'ClB'), ('MOMENT_Z', 'BETA', 1, 'CnB'),
+                    ('MOMENT_Y', 'ROTY', 2*V0/cref, 'Cmq'), ('MOMENT_X', 'ROTX', 2*V0/bref*cref/bref, 'Clp'),
+                    ('MOMENT_Z', 'ROTX', 2*V0/bref*cref/bref, 'Cnp'), ('MOMENT_X', 'ROTZ', 2*V0/bref*cref/bref, 'Clr'),
+                    ('MOMENT_Z', 'ROTZ', 2*V0/bref*cref/bref, 'Cnr')]
+    angles = [0.0, 4.0, 8.0, 12.0, 16.0]
+    setups = 4000 * scale // 10
+
+    commands = 0
+    for _ in range(setups):
+        pyfs.open_fsm(os.path.join(tmpdir, 'file.fsm'))
+        pyfs.create_new_coordinate_system()
+        pyfs.edit_coordinate_system(2, 'CG', 1, 0, 1, -1, 0, 0, 0, 1, 0, 0, 0, -1)
+        pyfs.stability_toolbox_settings(ROTATION_FRAME=2, UNITS='PER_RADIAN', CLEAR_SOLVER_PER_RUN='ENABLE',
+                                        ANGULAR_RATE_INCREMENT=0.2)
+        for numerator, denominator, constant, name in coefficients:
+            pyfs.stability_toolbox_new_coefficient(FRAME=2, UNITS='COEFFICIENTS', NUMERATOR=numerator,
+                                                   DENOMINATOR=denominator, CONSTANT=constant, NAME=name,
+                                                   BOUNDARIES=-1)
+        pyfs.solver_settings(angle_of_attack=0.0, sideslip_angle=0.0, freestream_velocity=V0, iterations=500,
+                             convergence_limit=1e-05, forced_run='DISABLE', reference_velocity=V0,
+                             reference_area=1.0, reference_length=cref, processors=12, wake_size=1000)
+        pyfs.initialize_solver(surfaces=-1, load_frame=2, symmetry_type='NONE',
+                               proximity_avoidance='DISABLE', stabilization='ENABLE', stabilization_strength=1.0,
+                               fast_multipole='ENABLE', wake_termination_x='DEFAULT')
+        for angle in angles:
+            pyfs.aoa(angle)
+            pyfs.compute_stability_coefficients()
+        pyfs.close_flightstream()
+        commands += 7 + len(coefficients) + 2 * len(angles)
+    return commands
+
+def motion_tables(tmpdir, scale):
+    """Many custom motion definitions, each with its table, frame and boundaries."""
+    motions = 20000 * scale // 10
+    for motion_id in range(1, motions + 1):
+        pyfs.create_new_motion_custom()
+        pyfs.set_motion_custom_table(motion_type='POSITION-TIME', motion_id=motion_id,
+                                     filename=os.path.join(tmpdir, f'motion_{motion_id}.txt'))
+        pyfs.set_motion_coordinate_system(motion_id, 2)
+        pyfs.set_motion_boundaries(motion_id, 3, [1, 2, 3])
+        pyfs.set_motion_start_time(motion_id, 0.5)
+    return 5 * motions
+
+def probe_survey(tmpdir, scale):
+    """Probe points and lines on a grid, updated and exported after every plane."""
+    planes = 2000 * scale // 10
+    for plane in range(planes):
+        for j in range(25):
+            pyfs.new_probe_point('VOLUME', 0.1 * plane, 0.2 * j, -0.5)
+        pyfs.new_probe_line(15, 0.1 * plane, 0, 0, 0.1 * plane, 5.0, 0)
+        pyfs.update_probe_points()
+        pyfs.export_probe_points(os.path.join(tmpdir, f'probes_{plane}.txt'))
+        pyfs.delete_probe_points()
+    return 29 * planes
+
+def _fill(lines):
+    block = ['#' + '*' * 72, '#**** Benchmark block ' + '*' * 51, '#' + '*' * 72, '#', 'SET_SOLVER_ITERATIONS 500']
+    for _ in range(lines // len(block)):
+        pyfs.script.append_lines(block)
+    return lines // len(block)
+
+def write_memory(tmpdir, scale):
+    """State.write_to_file of an in-memory script."""
+    commands = _fill(100000 * scale)
+    start = time.perf_counter()
+    pyfs.write_to_file(os.path.join(tmpdir, 'script_out.txt'))
+    return commands, time.perf_counter() - start
+
+def write_streaming(tmpdir, scale):
+    """append_lines into a streaming sink plus the final write_to_file."""
+    filename = os.path.join(tmpdir, 'script_out.txt')
+    pyfs.stream_to_file(filename)
+    start = time.perf_counter()
+    commands = _fill(100000 * scale)
+    pyfs.write_to_file(filename)
+    return commands, time.perf_counter() - start
+
+def read_script(tmpdir, scale):
+    """read_script of a file with the convergence sweep and motion tables scripts."""
+    filename = os.path.join(tmpdir, 'script_out.txt')
+    convergence_sweep(tmpdir, scale)
+    motion_tables(tmpdir, scale)
+    pyfs.write_to_file(filename)
+    start = time.perf_counter()
+    commands = pyfs.read_script(filename)
+    return len(commands), time.perf_counter() - start
+
+_TECPLOT_TEXT = {}
+
+def _tecplot_text(scale):
+    # Generated once per scale, outside the timed part
+    if scale not in _TECPLOT_TEXT:
+        import numpy as np
+        rng = np.random.default_rng(0)
+        nodes, elements = 20000 * scale, 19000 * scale
+        parts = ['TITLE = "Volume section"\nVARIABLES = "X" "Y" "Z" "Cp" "Vmag"\n']
+        for zone in range(2):
+            parts.append(f'ZONE T="Section {zone + 1}", N={nodes}, E={elements}, ZONETYPE=FEQUADRILATERAL, '
+                         f'DATAPACKING=BLOCK\n')
+            values = rng.standard_normal(5 * nodes)
+            parts.append('\n'.join(' '.join(row) for row in
+                                   np.char.mod('%.9E', values).reshape(-1, 5).tolist()) + '\n')
+            connectivity = rng.integers(1, nodes + 1, (elements, 4))
+            parts.append('\n'.join(' '.join(row) for row in connectivity.astype(str).tolist()) + '\n')
+        _TECPLOT_TEXT[scale] = ''.join(parts)
+    return _TECPLOT_TEXT[scale]
+
+def read_tecplot(tmpdir, scale):
+    """read_tecplot of a two-zone FEQUADRILATERAL file with five variables in BLOCK packing."""
+    filename = os.path.join(tmpdir, 'section.dat')
+    with open(filename, 'w') as file:
+        file.write(_tecplot_text(scale))
+    start = time.perf_counter()
+    zones = pyfs.read_tecplot(filename)
+    elapsed = time.perf_counter() - start
+    values = sum(sum(array.size for array in zone.values.values()) + zone.connectivity.size for zone in zones)
+    return values, elapsed, os.path.getsize(filename)
+
+def _compact(workload):
+    """The same workload in compact mode, without comment banners."""
+    def compact(tmpdir, scale):
+        pyfs.compact_mode()
+        try:
+            return workload(tmpdir, scale)
+        finally:
+            pyfs.compact_mode(False)
+    compact.__doc__ = f"{workload.__doc__} Compact mode."
+    return compact
+
+WORKLOADS = {
+    'convergence_sweep': convergence_sweep,
+    'stability_coefficients': stability_coefficients,
+    'motion_tables': motion_tables,
+    'probe_survey': probe_survey,
+    'write_memory': write_memory,
+    'write_streaming': write_streaming,
+    'read_script': read_script,
+    'read_tecplot': read_tecplot,
+    'convergence_sweep_compact': _compact(convergence_sweep),
+    'probe_survey_compact': _compact(probe_survey),
+    'write_memory_compact': _compact(write_memory),
+    'write_streaming_compact': _compact(write_streaming),
+}
+
+def run_workload(workload, scale):
+    with tempfile.TemporaryDirectory() as tmpdir, contextlib.redirect_stdout(io.StringIO()):
+        pyfs.hard_reset(os.path.join(tmpdir, 'script_out.txt'))
+        # As in timeit, the collector is paused so that its pauses do not land in a sample
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            commands = workload(tmpdir, scale)
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        size = None
+        if isinstance(commands, tuple):
+            # Workloads timing part of their work return (commands, seconds) or (items, seconds, bytes)
+            commands, elapsed, *measured = commands
+            size = measured[0] if measured else None
+
+        script_path = os.path.join(tmpdir, 'script_out.txt')
+        if size is None:
+            if os.path.exists(script_path):
+                size = os.path.getsize(script_path)
+            else:
+                size = sum(len(line) + 1 for line in pyfs.script.lines)
+        pyfs.hard_reset(script_path)
+    return commands, size, elapsed
+
+def run(names, scale, repeat):
+    results = {}
+    for name in names:
+        run_workload(WORKLOADS[name], 1)  # warm-up
+        best = None
+        for _ in range(repeat):
+            commands, size, elapsed = run_workload(WORKLOADS[name], scale)
+            if best is None or elapsed < best[2]:
+                best = (commands, size, elapsed)
+        commands, size, elapsed = best
+        results[name] = {'commands': commands, 'bytes': size, 'seconds': elapsed,
+                         'commands_per_s': commands / elapsed, 'bytes_per_s': size / elapsed}
+    return results
+
+def machine():
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'processor': platform.processor() or platform.machine()}
+
+def compare(results, baselines, tolerance):
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"{name:<24} no baseline")
+            continue
+        ratio = result['commands_per_s'] / baseline['commands_per_s']
+        status = 'ok'
+        if ratio < 1.0 - tolerance:
+            status = 'REGRESSION'
+            regressions.append(name)
+        print(f"{name:<24} {ratio:>7.2f}x baseline  {status}")
+    return regressions
+
+def compare_compact(results):
+    pairs = [(name[:-len('_compact')], name) for name in results
+             if name.endswith('_compact') and name[:-len('_compact')] in results]
+    if not pairs:
+        return
+    print()
+    print(f"{'compact vs banners':<24} {'size':>7} {'time':>7}")
+    for full, compact in pairs:
+        size = results[compact]['bytes'] / results[full]['bytes']
+        elapsed = results[compact]['seconds'] / results[full]['seconds']
+        print(f"{full:<24} {size:>6.2f}x {elapsed:>6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-k', dest='pattern', default='', help="Only run workloads whose name contains this.")
+    parser.add_argument('--scale', type=int, default=10, help="Workload size; 10 is the full size.")
+    parser.add_argument('--quick', action='store_const', const=1, dest='scale', help="Same as --scale 1.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per workload; the fastest is kept.")
+    parser.add_argument('--save', action='store_true', help="Store the results as the new baselines.")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="Allowed fractional throughput drop before a regression is reported.")
+    parser.add_argument('--baselines', default=BASELINES, help="Baselines JSON file.")
+    args = parser.parse_args()
+
+    names = [name for name in WORKLOADS if args.pattern in name]
+    if not names:
+        parser.error(f"no workload matches '{args.pattern}'")
+
+    results = run(names, args.scale, args.repeat)
+    print(f"{'workload':<24} {'commands':>9} {'MB':>7} {'seconds':>8} {'commands/s':>11} {'MB/s':>7}")
+    for name, result in results.items():
+        print(f"{name:<24} {result['commands']:>9} {result['bytes'] / 1e6:>7.2f} {result['seconds']:>8.3f} "
+              f"{result['commands_per_s']:>11.0f} {result['bytes_per_s'] / 1e6:>7.1f}")
+    compare_compact(results)
+
+    stored = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines, 'r') as file:
+            stored = json.load(file)
+
+    if args.save:
+        baselines = stored.get('results', {}) if stored.get('scale') == args.scale else {}
+        baselines.update(results)
+        with open(args.baselines, 'w') as file:
+            json.dump({'machine': machine(), 'scale': args.scale, 'results': baselines}, file, indent=4, sort_keys=True)
+            file.write('\n')
+        print(f"baselines written to: {args.baselines}")
+        return 0
+
+    if not stored:
+        print("no baselines stored; run with --save to record them")
+        return 0
+    if stored.get('scale') != args.scale:
+        print(f"baselines were recorded at --scale {stored.get('scale')}; not comparing")
+        return 0
+    if stored.get('machine') != machine():
+        print("warning: baselines were recorded on a different machine or Python")
+    print()
+    regressions = compare(results, stored['results'], args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
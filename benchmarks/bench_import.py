@@ -0,0 +1,53 @@
+"""
+Import-time benchmark for pyFlightscript.
+
+Every sample is a fresh interpreter, as in a process-pool worker. Three cases are timed:
+
+- bare: `import pyFlightscript` only.
+- worker: the import plus the script state and one exec_solver command, what a solver
+  worker typically touches.
+- full: `from pyFlightscript import *`, which loads every submodule like the former eager
+  `__init__` did.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CASES = {
+    'bare': "import pyFlightscript",
+    'worker': "import pyFlightscript as pyfs; pyfs.start_solver(); pyfs.script.clear_lines()",
+    'full': "from pyFlightscript import *",
+}
+
+def time_case(code, repeat, env):
+    command = [sys.executable, '-c', code]
+    subprocess.run(command, env=env, check=True)  # warm the bytecode and OS file caches
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20, help="Interpreter launches per case.")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+
+    baseline = statistics.median(time_case("pass", args.repeat, env))
+    print(f"{'case':<8} {'median ms':>10} {'min ms':>8}   (interpreter start-up {baseline * 1e3:.1f} ms subtracted)")
+    for name, code in CASES.items():
+        samples = [sample - baseline for sample in time_case(code, args.repeat, env)]
+        print(f"{name:<8} {statistics.median(samples) * 1e3:>10.1f} {min(samples) * 1e3:>8.1f}")
+
+if __name__ == '__main__':
+    main()
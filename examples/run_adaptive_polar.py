@@ -0,0 +1,22 @@
+# this script is an example of an adaptive angle of attack polar: a coarse grid is refined
+# only where CL and CMy bend, instead of running a dense np.linspace grid.
+# Without FS_EXE set, it runs against the stand-in executable in this folder.
+import os, sys
+import pyFlightscript as pyfs
+
+fsexe_path = os.environ.get('FS_EXE') or [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'standin_flightstream.py')]
+fsm_filepath = os.path.abspath('test.fsm')
+
+def setup():
+    pyfs.solver_settings(freestream_velocity=100.0, processors=8)
+    pyfs.initialize_solver(surfaces=-1, load_frame=1)
+
+polar = pyfs.run_adaptive_aoa_sweep(fsm_filepath, -4.0, 20.0, tolerance={'CL': 0.005, 'CMy': 0.005},
+                                    setup=setup, columns=['CL', 'CMy'], min_step=0.25,
+                                    fsexe_path=fsexe_path, work_dir='adaptive_polar')
+
+uniform = int((20.0 + 4.0) / 0.25) + 1
+print(f"{len(polar.points)} solver runs instead of {uniform} for a uniform 0.25 deg grid, "
+      f"{polar.iterations} FlightStream runs, converged: {polar.converged}")
+for aoa, cl, cm in zip(polar.points, polar.values['CL'], polar.values['CMy']):
+    print(f"{aoa:8.3f} {cl:9.5f} {cm:9.5f}")
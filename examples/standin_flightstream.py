@@ -0,0 +1,44 @@
+# Stand-in for the FlightStream executable, for trying script runners without FlightStream.
+# It reads the script given after -script and answers every EXECUTE_SOLVER_SWEEPER block with
+# synthetic loads of a wing that stalls at 12 deg, written like a sweep results file.
+# Use it as fsexe_path=[sys.executable, 'standin_flightstream.py'].
+import sys
+
+def loads(aoa):
+    cl = 0.1 * aoa
+    cm = -0.02 * aoa
+    if aoa > 12:
+        cl = 1.2 - 0.08 * (aoa - 12) ** 2 / (1 + 0.1 * (aoa - 12))
+        cm -= 0.01 * (aoa - 12) ** 2
+    return cl, 0.01 + 0.05 * cl ** 2, cm
+
+def sweep_values(start, stop, delta):
+    count = int((stop - start) / delta + 1e-9) + 1
+    return [start + i * delta for i in range(count)]
+
+script_path = sys.argv[sys.argv.index('-script') + 1]
+with open(script_path, 'r') as file:
+    lines = [line.strip() for line in file]
+
+for index, line in enumerate(lines):
+    if line != 'EXECUTE_SOLVER_SWEEPER':
+        continue
+    block = {}
+    position = index + 1
+    while not lines[position].startswith('APPEND_TO_EXISTING_SWEEP'):
+        key, _, value = lines[position].partition(' ')
+        block[key] = value
+        position += 1
+    append = lines[position].endswith('ENABLE')
+    results_path = lines[position + 1]
+
+    aoas = [float(block['ANGLE_OF_ATTACK_START'])]
+    if block['ANGLE_OF_ATTACK'] == 'ENABLE':
+        aoas = sweep_values(float(block['ANGLE_OF_ATTACK_START']), float(block['ANGLE_OF_ATTACK_STOP']),
+                            float(block['ANGLE_OF_ATTACK_DELTA']))
+    with open(results_path, 'a' if append else 'w') as results:
+        results.write("Solver sweeper results\nAOA Beta Vinf CL CDi CMy\n")
+        for aoa in aoas:
+            print(f"Solving AOA {aoa}", flush=True)
+            cl, cd, cm = loads(aoa)
+            results.write(f"{aoa:.6f} 0.000000 100.000000 {cl:.6f} {cd:.6f} {cm:.6f}\n")
@@ -1,60 +1,202 @@
-from . import actuators
-from . import analysis
-from . import base
-from . import boundary_layer
-from . import cad
-from . import csys
-from . import exec_solver
-from . import export_data
-from . import freestream
-from . import mesh
-from . import fsinit
-from . import inlets
-from . import motion
-from . import plots
-from . import post_points
-from . import post_surf
-from . import post_volume
-from . import post_streamlines
-from . import scene
-from . import set_solver
-from . import solver
-from . import tools
-from . import unite
-from . import wake
-from . import wrapper
-from . import script
+from importlib import import_module as _import_module
 
-from .actuators import *
-from .analysis import *
-from .base import *
-from .boundary_layer import *
-from .cad import *
-from .csys import *
-from .exec_solver import *
-from .export_data import *
-from .freestream import *
-from .mesh import *
-from .fsinit import *
-from .inlets import *
-from .motion import *
-from .plots import *
-from .post_points import *
-from .post_surf import *
-from .post_volume import *
-from .post_streamlines import *
-from .scene import *
-from .set_solver import *
-from .solver import *
-from .tools import *
-from .unite import *
-from .wake import *
-from .wrapper import *
-from .script import *
+# Submodules are imported on first attribute access (PEP 562) so that
+# `import pyFlightscript` only pays for the modules a program actually uses.
+# The flat pyfs.<function> namespace is kept through the table below, which
+# lists the public names of each submodule. Any public name missing from it
+# still resolves: the first miss imports every submodule, like the old eager
+# star imports did.
+
+# pyfs.script is the script proxy of the current context, not the submodule
+from .script import script
+
+_SUBMODULE_EXPORTS = {
+    'actuators': (
+        'create_new_actuator', 'edit_actuator', 'set_prop_actuator_rpm',
+        'set_prop_actuator_profile', 'set_prop_actuator_thrust', 'set_prop_actuator_swirl',
+        'set_actuator_exhaust', 'enable_actuator', 'disable_actuator', 'delete_actuator'),
+    'analysis': (
+        'scene_contour', 'set_vorticity_drag_boundaries', 'delete_vorticity_drag_boundaries',
+        'set_analysis_moments_model', 'set_analysis_symmetry_loads', 'analysis_loads_frame',
+        'vorticity_lift_model', 'loads_and_moments_units', 'analysis_boundaries',
+        'set_inviscid_loads'),
+    'base': (
+        'create_new_base_region', 'auto_detect_base_regions', 'detect_base_regions_by_surface',
+        'set_base_region_trailing_edges', 'delete_base_region'),
+    'boundary_layer': ('delete_transition_trip',),
+    'cad': (
+        'create_new_model', 'create_initialize', 'create_import_curve_txt', 'create_import_ccs',
+        'create_auto_cross_sections', 'create_cross_section', 'create_point_curve',
+        'create_curve_arc', 'create_curve_select', 'create_curve_unselect',
+        'create_curve_reverse', 'create_curve_delete_all', 'create_curve_delete_selected',
+        'create_curve_delete_unselected', 'create_curve_export_ccs', 'import_cad',
+        'convert_cad_to_mesh'),
+    'csys': (
+        'create_new_coordinate_system', 'edit_coordinate_system', 'set_coordinate_system_name',
+        'set_coordinate_system_origin', 'set_coordinate_system_axis',
+        'normalize_coordinate_system', 'rotate_coordinate_system',
+        'translate_coordinate_system', 'duplicate_coordinate_system',
+        'mirror_coordinate_system', 'delete_coordinate_system'),
+    'exec_solver': ('start_solver', 'solver_clear', 'close_flightstream'),
+    'export_data': (
+        'export_solver_analysis_spreadsheet', 'export_solver_analysis_tecplot',
+        'export_solver_analysis_vtk', 'set_vtk_export_variables', 'export_solver_analysis_csv',
+        'export_solver_analysis_pload_bdf', 'export_solver_analysis_force_distributions'),
+    'freestream': ('set_freestream', 'fluid_properties', 'air_altitude'),
+    'mesh': (
+        'import_mesh', 'ccs_import', 'export_surface_mesh', 'surface_rotate',
+        'translate_surface_in_frame', 'translate_surface_by_frame', 'surface_scale',
+        'surface_invert', 'surface_rename', 'select_geometry_by_id',
+        'surface_select_by_threshold', 'create_new_surface_from_selection',
+        'surface_cut_by_plane', 'surface_mirror', 'surface_copy_paste',
+        'surface_circular_pattern', 'surface_auto_hole_fill', 'surface_combine',
+        'delete_selected_faces', 'surface_delete', 'surface_clearall'),
+    'fsinit': (
+        'open_fsm', 'stop_script', 'print', 'save_as_fsm', 'new_simulation',
+        'set_significant_digits', 'set_vertex_merge_tolerance', 'set_simulation_length_units',
+        'set_trailing_edge_sweep_angle', 'set_trailing_edge_bluntness_angle',
+        'set_base_region_bending_angle'),
+    'inlets': ('create_new_inlet', 'set_inlet_custom_profile', 'remesh_inlet', 'delete_inlet'),
+    'motion': (
+        'create_new_motion_euclidean', 'create_new_motion_custom', 'create_new_motion_6dof',
+        'create_new_motion_fsi', 'set_motion_boundaries', 'set_motion_moving_frames',
+        'set_motion_coordinate_system', 'set_motion_start_time', 'set_motion_velocity',
+        'set_motion_acceleration', 'set_motion_angular_velocity',
+        'set_motion_angular_acceleration', 'set_motion_is_rotor', 'set_motion_custom_table',
+        'set_motion_mass_properties', 'set_motion_gravity', 'set_motion_6dof_initial_velocity',
+        'set_motion_6dof_initial_angular_velocity', 'set_motion_6dof_active_variables',
+        'set_6dof_motion_symmetry_loads', 'create_new_6dof_external_force',
+        'create_new_6dof_custom_force', 'create_new_6dof_spring_force',
+        'delete_6dof_external_force', 'export_6dof_trajectory', 'set_motion_fsi_executable',
+        'set_motion_fsi_structural_nodes', 'delete_motion'),
+    'plots': ('set_plot_type', 'save_plot_to_file'),
+    'post_points': (
+        'new_probe_point', 'new_probe_line', 'update_probe_points', 'probe_points_import',
+        'export_probe_points', 'delete_probe_points'),
+    'post_surf': (
+        'create_new_surface_section', 'new_surface_section_distribution',
+        'compute_surface_sectional_loads', 'export_surface_sectional_loads',
+        'update_all_surface_sections', 'export_all_surface_sections', 'delete_surface_section',
+        'delete_all_surface_sections'),
+    'post_volume': (
+        'create_new_rectangle_volume_section', 'create_new_circle_volume_section',
+        'volume_section_boundary_layer', 'volume_section_wireframe',
+        'update_all_volume_sections', 'export_volume_section_vtk',
+        'export_volume_section_2d_vtk', 'export_volume_section_tecplot',
+        'delete_volume_section', 'delete_all_volume_sections'),
+    'post_streamlines': (
+        'new_off_body_streamline', 'new_streamline_distribution', 'new_off_body_streamtube',
+        'set_off_body_streamline_length', 'set_all_off_body_streamlines_upstream',
+        'set_all_off_body_streamlines_downstream', 'generate_all_off_body_streamlines',
+        'delete_all_off_body_streamlines', 'export_all_off_body_streamlines',
+        'generate_all_surface_streamlines', 'delete_all_surface_streamlines',
+        'export_all_surface_streamlines'),
+    'scene': (
+        'view_resize', 'change_scene_to', 'save_scene_as_image', 'set_scene_view',
+        'set_scene_colormap_type', 'set_scene_colormap_size', 'set_scene_colormap_position',
+        'set_scene_colormap_shading', 'set_scene_colormap_custom_mode',
+        'set_scene_colormap_custom_range'),
+    'set_solver': (
+        'set_solver_model', 'steady', 'unsteady', 'unsteady_solver_new_force_plot',
+        'unsteady_solver_new_fluid_plot', 'unsteady_solver_export_plots',
+        'unsteady_solver_delete_all_plots', 'unsteady_solver_animation', 'boundary_layer_type',
+        'surface_roughness', 'viscous_coupling', 'viscous_excluded_boundaries',
+        'delete_viscous_excluded_boundaries', 'unsteady_viscous_coupling_iteration',
+        'set_axial_separation_boundaries', 'delete_axial_separation_boundaries',
+        'set_crossflow_separation_boundaries', 'delete_crossflow_separation_boundaries',
+        'set_crossflow_separation_cp', 'solver_settings', 'aoa', 'sideslip', 'velocity',
+        'mach_number', 'iterations', 'convergence', 'forced_iterations', 'ref_velocity',
+        'ref_mach_number', 'ref_area', 'ref_length', 'solver_minimum_cp', 'compressibility',
+        'set_max_parallel_threads', 'mesh_induced_wake_velocity',
+        'adverse_gradient_boundary_layer', 'farfield_layers',
+        'solver_unsteady_pressure_and_kutta', 'solver_vortex_ring_normalization',
+        'convergence_iterations', 'wake_streamwise_agglomeration',
+        'wake_termination_time_steps', 'wake_relaxation'),
+    'solver': ('initialize_solver', 'solver_proximal_boundaries', 'solver_uninitialize'),
+    'tools': (
+        'execute_solver_sweeper', 'stability_toolbox_settings',
+        'stability_toolbox_new_coefficient', 'stability_toolbox_delete_all',
+        'compute_stability_coefficients', 'stability_toolbox_export'),
+    'unite': ('boolean_unite_mesh', 'boolean_unite_path', 'boolean_unite_geometry'),
+    'wake': (
+        'physics', 'detect_trailing_edges_by_surface', 'trailing_edges_import',
+        'detect_wake_termination_nodes_by_surface'),
+    'wrapper': (
+        'wrapper_set_input', 'wrapper_set_global_size', 'wrapper_set_vertex_projection',
+        'wrapper_set_anisotropy', 'wrapper_create_local_control', 'wrapper_edit_local_control',
+        'wrapper_delete_all_local_controls', 'wrapper_new_volume_control',
+        'wrapper_delete_all_volume_controls', 'wrapper_execute', 'wrapper_transfer'),
+    'runner': (
+        'RunResult', 'resolve_fsexe_path', 'build_command', 'script_processors',
+        'run_scripts_parallel', 'ScriptProcess', 'start_script_async', 'run_script_async',
+        'run_scripts_async'),
+    'bdf': (
+        'PLOAD_CARDS', 'PloadCards', 'iter_pload_bdf', 'read_pload_bdf', 'write_pload_cards',
+        'merge_pload_bdf', 'superpose_pload_bdf'),
+    'campaign': ('Campaign',),
+    'cache': (
+        'INPUT_FILE_COMMANDS', 'OUTPUT_FILE_COMMANDS', 'OUTPUT_FOLDER_COMMANDS',
+        'script_file_references', 'lines_file_references', 'ScriptCache', 'cached_execute_fsm_script'),
+    'forces': ('ForceDistribution', 'read_force_distributions', 'load_envelope'),
+    'monitor': ('LOG_PATTERNS', 'LogEvent', 'LogMonitor', 'LogTailer', 'tail_lines', 'monitor_log'),
+    'optimize': ('OPTIMIZER_PASSES', 'optimize_lines', 'optimize_script'),
+    'parse': (
+        'SCRIPT_COMMANDS', 'BLOCK_KEYWORDS', 'Command', 'parse_script', 'read_script',
+        'emit_commands'),
+    'read_sweep': ('read_sweep_blocks', 'read_sweep_results'),
+    'script': (
+        'State', 'ScriptProxy', 'current_script', 'new_script', 'display_lines',
+        'write_to_file', 'clear_lines', 'compact_mode', 'stream_to_file', 'hard_reset', 'run_script'),
+    'adaptive': ('AdaptiveSweepResult', 'refine_points', 'adaptive_sweep', 'run_adaptive_aoa_sweep'),
+    'session': ('Session',),
+    'shard': (
+        'SWEEP_AXES', 'split_sweep', 'write_sweep_shards', 'merge_sweep_files', 'run_sharded_sweep'),
+    'store': ('ResultStore',),
+    'tecplot': ('TecplotZone', 'TecplotFile', 'read_tecplot'),
+    'template': ('ScriptTemplate',),
+    'validate': ('DEFAULT_COUNTS', 'ScriptIssue', 'validate_script', 'check_script'),
+    'vtk_file': ('VTKArray', 'VTKFile', 'read_vtk'),
+    'watchdog': ('Watchdog', 'run_script_watched'),
+    'utils': (
+        'check_valid_length_units', 'check_valid_force_units', 'check_file_existence',
+        'require_numpy'),
+}
+
+_LAZY_NAMES = {name: module for module, names in _SUBMODULE_EXPORTS.items() for name in names}
+
+__all__ = ['script', 'execute_fsm_script'] + list(_LAZY_NAMES)
+
+def _import_all():
+    for module in _SUBMODULE_EXPORTS:
+        if module == 'utils':
+            # Not star-imported; its names are listed above only to resolve cheaply
+            _import_module('.' + module, __name__)
+            continue
+        for name, value in vars(_import_module('.' + module, __name__)).items():
+            if not name.startswith('_'):
+                globals().setdefault(name, value)
+
+def __getattr__(name):
+    module = _LAZY_NAMES.get(name)
+    if module is not None:
+        value = getattr(_import_module('.' + module, __name__), name)
+    elif name in _SUBMODULE_EXPORTS:
+        return _import_module('.' + name, __name__)
+    elif not name.startswith('_'):
+        _import_all()
+        if name not in globals():
+            raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+        value = globals()[name]
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES) | set(_SUBMODULE_EXPORTS))
 
 
 import os
-import subprocess
 
 def execute_fsm_script(script_path=".\script_out.txt", fsexe_path=None, hidden=False):
     """
@@ -79,6 +221,7 @@ def execute_fsm_script(script_path=".\script_out.txt", fsexe_path=None, hidden=F
     if not os.path.exists(script_path):
         raise FileNotFoundError(f"The specified file '{script_path}' does not exist on path.")
     
+    import subprocess
     try:
         command = [fsexe_path]
         if hidden:
@@ -0,0 +1,198 @@
+import os
+from .exec_solver import close_flightstream
+from .fsinit import open_fsm
+from .script import new_script
+from .tools import execute_solver_sweeper
+
+class AdaptiveSweepResult:
+    """
+    Outcome of an adaptive sweep.
+
+    Attributes:
+        points (list of float): Evaluated values of the swept variable, in increasing order.
+        values (dict): Column name to the list of values at 'points'.
+        iterations (int): Number of evaluation rounds, the coarse grid included.
+        converged (bool): True if the last round found nothing left to refine.
+        runs (list): What the evaluator returned besides the values, e.g. RunResults, per round.
+    """
+    def __init__(self, points, values, iterations, converged, runs):
+        self.points = points
+        self.values = values
+        self.iterations = iterations
+        self.converged = converged
+        self.runs = runs
+
+    def __repr__(self):
+        return (f"AdaptiveSweepResult(points={len(self.points)}, iterations={self.iterations}, "
+                f"converged={self.converged})")
+
+def _tolerance_of(tolerance, column):
+    if isinstance(tolerance, dict):
+        return tolerance.get(column)
+    return tolerance
+
+def refine_points(points, values, tolerance, min_step):
+    """
+    Points to add where a sampled curve is not piecewise linear within a tolerance.
+
+    Each interior sample is compared with the straight line between its two neighbours; when
+    any column deviates by more than its tolerance, the midpoints of both intervals around
+    the sample are returned, unless an interval is already narrower than 2 * 'min_step'.
+
+    :param points: Sampled values of the swept variable, in increasing order.
+    :param values: Column name to the list of sampled values at 'points'.
+    :param tolerance: Absolute tolerance, or dict of column name to tolerance. Columns without
+                      a tolerance in the dict are not checked.
+    :param min_step: Smallest spacing the refinement may create.
+
+    Returns:
+        list of float: New points, in increasing order.
+    """
+    refine = set()
+    for column, samples in values.items():
+        limit = _tolerance_of(tolerance, column)
+        if limit is None:
+            continue
+        for i in range(1, len(points) - 1):
+            x0, x1, x2 = points[i - 1], points[i], points[i + 1]
+            linear = samples[i - 1] + (samples[i + 1] - samples[i - 1]) * (x1 - x0) / (x2 - x0)
+            if abs(samples[i] - linear) > limit:
+                refine.add(i - 1)
+                refine.add(i)
+    return [round(0.5 * (points[i] + points[i + 1]), 12) for i in sorted(refine)
+            if points[i + 1] - points[i] >= 2 * min_step]
+
+def adaptive_sweep(evaluate, start, stop, tolerance, coarse_points=9, min_step=0.25, max_iterations=8):
+    """
+    Sample a curve on a coarse grid and refine it only where it bends.
+
+    Every round calls 'evaluate' once with all the points to add, so each round can be one
+    FlightStream run. Rounds stop when refine_points finds nothing to refine or after
+    'max_iterations' rounds.
+
+    :param evaluate: Callable taking a list of points and returning a dict of column name to
+                     the list of values at these points, or a (values, info) tuple whose 'info'
+                     is kept in AdaptiveSweepResult.runs.
+    :param start: First value of the swept variable.
+    :param stop: Last value of the swept variable.
+    :param tolerance: Absolute tolerance, or dict of column name to tolerance (see refine_points).
+    :param coarse_points: Number of points of the initial uniform grid. Defaults to 9.
+    :param min_step: Smallest spacing the refinement may create. Defaults to 0.25.
+    :param max_iterations: Maximum number of rounds, the coarse grid included. Defaults to 8.
+
+    Returns:
+        AdaptiveSweepResult
+
+    Example usage:
+    result = adaptive_sweep(lambda aoas: {'CL': [cl(a) for a in aoas]}, -5., 20., tolerance=0.005)
+    """
+    if not isinstance(coarse_points, int) or coarse_points < 3:
+        raise ValueError("`coarse_points` should be an integer value of at least 3.")
+    if not stop > start:
+        raise ValueError("`stop` should be greater than `start`.")
+    if not min_step > 0:
+        raise ValueError("`min_step` should be greater than zero.")
+    if not isinstance(max_iterations, int) or max_iterations < 1:
+        raise ValueError("`max_iterations` should be an integer value greater than 0.")
+
+    step = (stop - start) / (coarse_points - 1)
+    new_points = [round(start + i * step, 12) for i in range(coarse_points)]
+    samples = {}
+    runs = []
+    iterations = 0
+    converged = False
+    while new_points:
+        if iterations == max_iterations:
+            break
+        iterations += 1
+        result = evaluate(new_points)
+        if isinstance(result, tuple):
+            result, info = result
+            runs.append(info)
+        for column, column_values in result.items():
+            column_values = list(column_values)
+            if len(column_values) != len(new_points):
+                raise ValueError(f"`evaluate` returned {len(column_values)} values of '{column}' "
+                                 f"for {len(new_points)} points.")
+            for point, value in zip(new_points, column_values):
+                samples.setdefault(point, {})[column] = value
+
+        points = sorted(samples)
+        columns = set.intersection(*(set(samples[point]) for point in points))
+        values = {column: [samples[point][column] for point in points] for column in sorted(columns)}
+        new_points = [point for point in refine_points(points, values, tolerance, min_step)
+                      if point not in samples]
+    else:
+        converged = True
+
+    points = sorted(samples)
+    return AdaptiveSweepResult(points, values, iterations, converged, runs)
+
+def run_adaptive_aoa_sweep(fsm_filepath, aoa_start, aoa_stop, tolerance, setup=None, columns=None,
+                           coarse_points=9, min_step=0.25, max_iterations=8, fsexe_path=None,
+                           hidden=True, work_dir='.'):
+    """
+    Adaptive angle-of-attack polar run in FlightStream (see adaptive_sweep).
+
+    Every round is one FlightStream run: the script opens the simulation file, runs 'setup'
+    and solves each new angle of attack as a one-point solver sweep appended to a single
+    sweep results file, which is read back with read_sweep_results.
+
+    :param fsm_filepath: Path of the simulation file.
+    :param aoa_start: First angle of attack.
+    :param aoa_stop: Last angle of attack.
+    :param tolerance: Absolute tolerance, or dict of column name to tolerance (e.g.
+                      {'CL': 0.005, 'CMy': 0.002}). Columns are named as in the sweep results header.
+    :param setup: Callable adding the commands to run between open_fsm and the sweep. Defaults to None.
+    :param columns: Columns of the sweep results to keep. Defaults to None, all of them.
+    :param coarse_points: Number of points of the initial uniform grid. Defaults to 9.
+    :param min_step: Smallest angle spacing the refinement may create. Defaults to 0.25.
+    :param max_iterations: Maximum number of FlightStream runs. Defaults to 8.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param work_dir: Folder of the round scripts, results and logs. Defaults to the current folder.
+
+    Returns:
+        AdaptiveSweepResult, with the RunResult of every round in 'runs'.
+
+    Raises:
+        RuntimeError: If a FlightStream run fails.
+
+    Example usage:
+    polar = run_adaptive_aoa_sweep('C:/.../wing.fsm', -5., 20., {'CL': 0.005, 'CMy': 0.002}, setup=setup)
+    """
+    from .read_sweep import read_sweep_results
+    from .runner import run_scripts_parallel
+
+    os.makedirs(work_dir, exist_ok=True)
+    rounds = []
+
+    def evaluate(angles):
+        index = len(rounds)
+        script_path = os.path.join(work_dir, f'adaptive_round{index}_script.txt')
+        results_path = os.path.abspath(os.path.join(work_dir, f'adaptive_round{index}.txt'))
+        with new_script() as state:
+            open_fsm(fsm_filepath)
+            if setup is not None:
+                setup()
+            for position, angle in enumerate(angles):
+                execute_solver_sweeper(results_path, angle_of_attack_start=angle, angle_of_attack_stop=angle,
+                                       export_surface_data_per_step='DISABLE',
+                                       append_to_existing_sweep='ENABLE' if position else 'DISABLE')
+            close_flightstream()
+            state.write_to_file(script_path)
+
+        run, = run_scripts_parallel([script_path], fsexe_path=fsexe_path, hidden=hidden, max_instances=1)
+        rounds.append(run)
+        if not run.ok:
+            raise RuntimeError(f"Adaptive sweep round {index} failed with exit code {run.returncode}, "
+                               f"see {run.stderr_path}")
+        table = read_sweep_results(results_path, as_dict=True)
+        names = list(table) if columns is None else list(columns)
+        missing = [name for name in names if name not in table]
+        if missing:
+            raise ValueError(f"Column(s) {', '.join(missing)} not in '{results_path}' ({', '.join(table)}).")
+        return {name: table[name].tolist() for name in names}, run
+
+    return adaptive_sweep(evaluate, aoa_start, aoa_stop, tolerance, coarse_points=coarse_points,
+                          min_step=min_step, max_iterations=max_iterations)
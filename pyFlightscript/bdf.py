@@ -0,0 +1,361 @@
+import re
+from .utils import *
+
+# Card kinds of PloadCards.kind
+PLOAD_CARDS = {'PLOAD': 1, 'PLOAD2': 2, 'PLOAD4': 4}
+
+_IMPLICIT_EXPONENT = re.compile(r'^([-+]?(?:\d+\.?\d*|\.\d+))([-+]\d+)$')
+
+def _real(text):
+    # NASTRAN real field: blank, 1.5E+3, 1.5D+3 or 1.5+3
+    text = text.strip().upper().replace('D', 'E')
+    if not text:
+        return float('nan')
+    try:
+        return float(text)
+    except ValueError:
+        match = _IMPLICIT_EXPONENT.match(text)
+        if not match:
+            raise ValueError(f"Invalid NASTRAN real field '{text}'.")
+        return float(f"{match.group(1)}E{match.group(2)}")
+
+def _integer(text):
+    text = text.strip()
+    return int(text) if text else 0
+
+class PloadCards:
+    """
+    Pressure load cards as arrays, one row per loaded element or grid face.
+
+    Attributes:
+        kind (numpy array): Card kind of each row, see PLOAD_CARDS.
+        sid (numpy array): Load set of each row.
+        ids (numpy array): Shape (rows, 4): G1 G2 G3 G4 for PLOAD, EID 0 0 0 for PLOAD2 and
+                           EID G1 G34 0 for PLOAD4, with 0 for blank fields.
+        pressures (numpy array): Shape (rows, 4): P1 to P4 for PLOAD4, with blank P2 to P4
+                                 set to P1 as NASTRAN reads them, and P four times for PLOAD
+                                 and PLOAD2.
+    """
+    __slots__ = ('kind', 'sid', 'ids', 'pressures')
+
+    def __init__(self, kind, sid, ids, pressures):
+        np = require_numpy()
+        self.kind = np.asarray(kind, dtype=np.int8).reshape(-1)
+        self.sid = np.asarray(sid, dtype=np.int64).reshape(-1)
+        self.ids = np.asarray(ids, dtype=np.int64).reshape(-1, 4)
+        self.pressures = np.asarray(pressures, dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self):
+        return self.kind.size
+
+    def __repr__(self):
+        return f"PloadCards(rows={len(self)}, sets={sorted(set(self.sid.tolist()))})"
+
+    @classmethod
+    def concatenate(cls, parts):
+        np = require_numpy()
+        parts = list(parts)
+        if not parts:
+            return cls([], [], np.zeros((0, 4)), np.zeros((0, 4)))
+        return cls(np.concatenate([part.kind for part in parts]), np.concatenate([part.sid for part in parts]),
+                   np.concatenate([part.ids for part in parts]), np.concatenate([part.pressures for part in parts]))
+
+    def keys(self):
+        """
+        One opaque key per row identifying what it loads (card kind and ids), for superposition.
+        """
+        np = require_numpy()
+        table = np.ascontiguousarray(np.column_stack((self.kind.astype(np.int64), self.ids)))
+        return table.view(np.dtype((np.void, table.dtype.itemsize * 5))).reshape(-1)
+
+def _card_fields(lines):
+    # Fields after the card name of a small field, large field or free field card
+    head = lines[0].rstrip('\r\n')
+    if ',' in head:
+        fields = head.split(',')
+        name, fields = fields[0], fields[1:]
+        for line in lines[1:]:
+            fields.extend(line.rstrip('\r\n').split(',')[1:])
+        return name.strip().rstrip('*').upper(), fields
+    name = head[:8].strip()
+    if name.endswith('*'):
+        width, count = 16, 4
+    else:
+        width, count = 8, 8
+    fields = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        fields.extend(line[8 + width * k:8 + width * (k + 1)] for k in range(count))
+    return name.rstrip('*').upper(), fields
+
+def _parse_card(lines, rows):
+    name, fields = _card_fields(lines)
+    fields = fields + [''] * max(0, 16 - len(fields))
+    sid = _integer(fields[0])
+    if name == 'PLOAD':
+        grids = [_integer(field) for field in fields[2:6]]
+        pressure = _real(fields[1])
+        rows.append((1, sid, grids, [pressure] * 4))
+    elif name == 'PLOAD2':
+        pressure = _real(fields[1])
+        elements = [field.strip().upper() for field in fields[2:8] if field.strip()]
+        if len(elements) == 3 and elements[1] == 'THRU':
+            elements = range(int(elements[0]), int(elements[2]) + 1)
+        for element in elements:
+            rows.append((2, sid, [int(element), 0, 0, 0], [pressure] * 4))
+    elif name == 'PLOAD4':
+        if any(field.strip() for field in fields[8:16]):
+            raise ValueError("PLOAD4 cards with a load direction (CID, N1, N2, N3) are not supported.")
+        eid = _integer(fields[1])
+        pressures = [_real(field) for field in fields[2:6]]
+        pressures = [pressures[0] if value != value else value for value in pressures]
+        if fields[6].strip().upper() == 'THRU':
+            for element in range(eid, _integer(fields[7]) + 1):
+                rows.append((4, sid, [element, 0, 0, 0], pressures))
+        else:
+            rows.append((4, sid, [eid, _integer(fields[6]), _integer(fields[7]), 0], pressures))
+
+def _parse_small_pload4(np, lines):
+    # One-line small field PLOAD4 cards, converted column by column
+    cards = np.array(lines, dtype='S80').view('S8').reshape(-1, 10)
+    sid = cards[:, 1].astype(np.int64)
+    eid = cards[:, 2].astype(np.int64)
+    pressures = np.empty((len(lines), 4))
+    for k in range(4):
+        field = np.char.strip(cards[:, 3 + k])
+        pressures[:, k] = np.where(field == b'', b'nan', field).astype(np.float64)
+    blank = np.isnan(pressures)
+    pressures[blank] = np.broadcast_to(pressures[:, :1], pressures.shape)[blank]
+    grids = []
+    for k in (7, 8):
+        field = np.char.strip(cards[:, k])
+        grids.append(np.where(field == b'', b'0', field).astype(np.int64))
+    ids = np.column_stack((eid, grids[0], grids[1], np.zeros_like(eid)))
+    return PloadCards(np.full(len(lines), 4), sid, ids, pressures)
+
+def _is_continuation(line):
+    return line[:1] in ('+', '*', ',') or (line[:8].strip() == '' and line.strip() != '')
+
+def _flush(np, fast, slow):
+    parts = []
+    if fast:
+        try:
+            parts.append(_parse_small_pload4(np, fast))
+        except ValueError:
+            # e.g. reals with an implicit exponent; these cards are parsed one by one
+            slow = [[line] for line in fast] + slow
+    rows = []
+    for card in slow:
+        _parse_card(card, rows)
+    if rows:
+        kind, sid, ids, pressures = zip(*rows)
+        parts.append(PloadCards(kind, sid, ids, pressures))
+    return PloadCards.concatenate(parts)
+
+def iter_pload_bdf(filename, chunk_size=200000):
+    """
+    Read the PLOAD, PLOAD2 and PLOAD4 cards of a BDF in chunks, without loading the whole file.
+
+    One-line small field PLOAD4 cards, which make up the decks export_solver_analysis_pload_bdf
+    writes, are converted a chunk at a time with array operations; other cards and formats
+    (large field, free field, continuations) are parsed card by card. Other bulk data cards
+    and comments are skipped. Within a chunk, the rows of one-line PLOAD4 cards come first, in
+    card order, followed by the others.
+
+    :param filename: Path of the BDF file.
+    :param chunk_size: Number of lines per chunk. Defaults to 200000.
+
+    Yields:
+        PloadCards of each chunk.
+
+    Example usage:
+    for cards in iter_pload_bdf('C:/.../case12.bdf'):
+        print(len(cards), cards.pressures.max())
+    """
+    np = require_numpy()
+    check_file_existence(filename)
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise ValueError("`chunk_size` should be an integer value greater than 0.")
+
+    fast, slow, card = [], [], None
+
+    def close(card):
+        if card is None:
+            return
+        name = card[0][:8].strip().upper()
+        if len(card) == 1 and name == 'PLOAD4' and ',' not in card[0]:
+            fast.append(card[0].rstrip('\r\n'))
+        elif name.split(',')[0].rstrip('*') in PLOAD_CARDS:
+            slow.append(card)
+
+    with open(filename, 'r') as file:
+        count = 0
+        for line in file:
+            if line[:1] == '$' or not line.strip():
+                continue
+            if card is not None and _is_continuation(line):
+                card.append(line)
+                continue
+            close(card)
+            card = [line]
+            count += 1
+            if count >= chunk_size:
+                # The card just started may have continuation lines, so it stays open
+                chunk = _flush(np, fast, slow)
+                fast, slow, count = [], [], 0
+                if len(chunk):
+                    yield chunk
+        close(card)
+    chunk = _flush(np, fast, slow)
+    if len(chunk):
+        yield chunk
+
+def read_pload_bdf(filename):
+    """
+    Read all the pressure load cards of a BDF, see iter_pload_bdf.
+
+    Returns:
+        PloadCards
+    """
+    return PloadCards.concatenate(iter_pload_bdf(filename))
+
+def _large_field_lines(np, cards, sid=None, factor=1.0):
+    # Large field cards keep full precision: 16 characters per field
+    pressures = cards.pressures * factor
+    sids = cards.sid if sid is None else np.full(len(cards), sid)
+    lines = []
+    for kind, set_id, ids, values in zip(cards.kind.tolist(), sids.tolist(), cards.ids.tolist(),
+                                        pressures.tolist()):
+        if kind == 4:
+            g1 = f'{ids[1]:16d}' if ids[1] else ' ' * 16
+            g34 = f'{ids[2]:16d}' if ids[2] else ' ' * 16
+            lines.append(f'PLOAD4* {set_id:16d}{ids[0]:16d}{values[0]:16.9E}{values[1]:16.9E}\n'
+                         f'*       {values[2]:16.9E}{values[3]:16.9E}{g1}{g34}\n')
+        elif kind == 2:
+            lines.append(f'PLOAD2* {set_id:16d}{values[0]:16.9E}{ids[0]:16d}\n')
+        else:
+            g4 = f'{ids[3]:16d}' if ids[3] else ''
+            lines.append(f'PLOAD*  {set_id:16d}{values[0]:16.9E}{ids[0]:16d}{ids[1]:16d}\n'
+                         f'*       {ids[2]:16d}{g4}\n')
+    return lines
+
+def write_pload_cards(file, cards, sid=None, factor=1.0):
+    """
+    Write pressure load cards in large field format to an open BDF file.
+
+    :param file: File object opened for writing.
+    :param cards: PloadCards.
+    :param sid: Load set of every card. Defaults to None, the set of each row.
+    :param factor: Scale factor of the pressures. Defaults to 1.0.
+    """
+    np = require_numpy()
+    file.writelines(_large_field_lines(np, cards, sid, factor))
+    return
+
+def merge_pload_bdf(filenames, output_filename, sids=None, factors=None, combinations=None, chunk_size=200000):
+    """
+    Merge the PLOAD decks of several cases into one BDF, each case as its own scaled load set.
+
+    Every input is streamed chunk by chunk (see iter_pload_bdf) and written in one pass.
+    Combined load sets are written as NASTRAN LOAD cards, so the solver superposes the cases.
+
+    :param filenames: Paths of the case BDF files.
+    :param output_filename: Path of the merged BDF file.
+    :param sids: Load set of each case. Defaults to None, 1, 2, 3, ... in file order.
+    :param factors: Scale factor of each case. Defaults to None, 1.0 for every case.
+    :param combinations: Dict of combined load set to a list of (scale, load set) pairs,
+                         written as LOAD cards. Defaults to None.
+    :param chunk_size: Lines per chunk, see iter_pload_bdf. Defaults to 200000.
+
+    Returns:
+        int: Number of load rows written.
+
+    Example usage:
+    merge_pload_bdf(['pull_up.bdf', 'gust.bdf'], 'loads.bdf', sids=[101, 102], factors=[1.5, 1.5],
+                    combinations={1001: [(1.0, 101), (1.0, 102)]})
+    """
+    np = require_numpy()
+    filenames = list(filenames)
+    sids = list(range(1, len(filenames) + 1)) if sids is None else list(sids)
+    factors = [1.0] * len(filenames) if factors is None else list(factors)
+    if len(sids) != len(filenames) or len(factors) != len(filenames):
+        raise ValueError("`sids` and `factors` should have one entry per file.")
+
+    rows = 0
+    with open(output_filename, 'w') as output:
+        for filename, sid, factor in zip(filenames, sids, factors):
+            output.write(f'$ PLOAD cards of {os.path.basename(filename)}, load set {sid}, factor {factor:g}\n')
+            for cards in iter_pload_bdf(filename, chunk_size=chunk_size):
+                output.writelines(_large_field_lines(np, cards, sid, factor))
+                rows += len(cards)
+        for combined, terms in (combinations or {}).items():
+            output.write(_load_card(combined, terms))
+    return rows
+
+def _load_card(sid, terms):
+    # LOAD SID S S1 L1 S2 L2 ... in large field format, four fields per line
+    fields = [f'{sid:16d}', f'{1.0:16.9E}']
+    for scale, load_set in terms:
+        fields.extend((f'{scale:16.9E}', f'{load_set:16d}'))
+    lines = []
+    for first in range(0, len(fields), 4):
+        lines.append(('LOAD*   ' if first == 0 else '*       ') + ''.join(fields[first:first + 4]) + '\n')
+    return ''.join(lines)
+
+def superpose_pload_bdf(filenames, factors, output_filename=None, sid=1, chunk_size=200000):
+    """
+    Superpose the pressure loads of several cases into one load set.
+
+    Pressures of the same element face (same card kind and ids) are multiplied by their case
+    factor and summed with array operations, chunk by chunk, so the decks are never loaded
+    whole; cases exported from the same mesh share every key and are summed in place.
+
+    :param filenames: Paths of the case BDF files.
+    :param factors: Scale factor of each case.
+    :param output_filename: Path of the BDF file to write. Defaults to None, not written.
+    :param sid: Load set of the superposed cards. Defaults to 1.
+    :param chunk_size: Lines per chunk, see iter_pload_bdf. Defaults to 200000.
+
+    Returns:
+        PloadCards: The superposed loads, in the order the keys were first seen.
+
+    Example usage:
+    superpose_pload_bdf(['cruise.bdf', 'gust.bdf'], [1.0, 1.5], 'limit_load.bdf', sid=10)
+    """
+    np = require_numpy()
+    filenames = list(filenames)
+    factors = list(factors)
+    if len(factors) != len(filenames):
+        raise ValueError("`factors` should have one entry per file.")
+
+    # Loads in the order their keys were first seen, and the keys sorted for lookups
+    seen = PloadCards.concatenate([])
+    seen_keys = seen.keys()
+    sorted_keys, sorted_rows = seen_keys, np.zeros(0, dtype=np.int64)
+    for filename, factor in zip(filenames, factors):
+        for cards in iter_pload_bdf(filename, chunk_size=chunk_size):
+            unique, first, inverse = np.unique(cards.keys(), return_index=True, return_inverse=True)
+            sums = np.zeros((unique.size, 4))
+            np.add.at(sums, inverse.reshape(-1), cards.pressures * factor)
+
+            position = np.searchsorted(sorted_keys, unique)
+            known = position < sorted_keys.size
+            known[known] = sorted_keys[position[known]] == unique[known]
+            seen.pressures[sorted_rows[position[known]]] += sums[known]
+            if known.all():
+                continue
+            new = np.flatnonzero(~known)
+            new = new[np.argsort(first[new])]
+            rows = first[new]
+            seen = PloadCards.concatenate([seen, PloadCards(cards.kind[rows], np.full(rows.size, sid),
+                                                            cards.ids[rows], sums[new])])
+            seen_keys = np.concatenate((seen_keys, unique[new]))
+            sorted_rows = np.argsort(seen_keys)
+            sorted_keys = seen_keys[sorted_rows]
+
+    result = seen
+    if output_filename is not None:
+        with open(output_filename, 'w') as output:
+            output.write(f'$ Superposition of {len(filenames)} PLOAD decks, load set {sid}\n')
+            write_pload_cards(output, result)
+    return result
@@ -0,0 +1,422 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+
+from .runner import build_command, resolve_fsexe_path
+
+# Commands that read a file, keyed by their first one or two tokens. The value gives the
+# position of the path line after the command line and the prefix written before the path.
+INPUT_FILE_COMMANDS = {
+    'OPEN': (1, ''),
+    'IMPORT': (3, 'FILE '),
+    'CCS_IMPORT': (4, 'FILE '),
+    'IMPORT_CAD': (1, ''),
+    'CAD_CREATE_IMPORT_CURVE_TXT': (1, ''),
+    'CAD_CREATE_IMPORT_CURVE_CCS': (1, ''),
+    'SET_FREESTREAM CUSTOM': (1, ''),
+    'SET_MOTION_CUSTOM_TABLE': (1, ''),
+    'SET_MOTION_FSI_STRUCTURAL_NODES': (2, ''),
+    'CREATE_NEW_6DOF_CUSTOM_FORCE': (1, ''),
+    'SET_PROP_ACTUATOR_PROFILE': (1, ''),
+    'SET_INLET_CUSTOM_PROFILE': (2, ''),
+    'ACOUSTIC_OBSERVERS_IMPORT': (1, ''),
+    'PROBE_POINTS_IMPORT': (3, ''),
+    'TRAILING_EDGES_IMPORT': (1, ''),
+}
+
+# Commands that write a file, in the same layout as INPUT_FILE_COMMANDS
+OUTPUT_FILE_COMMANDS = {
+    'SAVEAS': (1, ''),
+    'EXPORT_LOG': (1, ''),
+    'EXPORT_SOLVER_ANALYSIS_SPREADSHEET': (1, ''),
+    'EXPORT_SOLVER_ANALYSIS_TECPLOT': (1, ''),
+    'EXPORT_SOLVER_ANALYSIS_VTK': (1, ''),
+    'EXPORT_SOLVER_ANALYSIS_CSV': (1, ''),
+    'EXPORT_SOLVER_ANALYSIS_PLOAD_BDF': (1, ''),
+    'EXPORT_SOLVER_ANALYSIS_FORCE_DISTRIBUTIONS': (1, ''),
+    'EXPORT_SURFACE_MESH': (1, ''),
+    'EXPORT_6DOF_TRAJECTORY': (1, ''),
+    'EXPORT_PROBE_POINTS': (1, ''),
+    'EXPORT_ACOUSTIC_SIGNALS': (1, ''),
+    'EXPORT_ALL_OFF_BODY_STREAMLINES': (1, ''),
+    'EXPORT_ALL_SURFACE_STREAMLINES': (1, ''),
+    'EXPORT_SURFACE_SECTIONAL_LOADS': (1, ''),
+    'EXPORT_ALL_SURFACE_SECTIONS': (1, ''),
+    'EXPORT_VOLUME_SECTION_VTK': (1, ''),
+    'EXPORT_VOLUME_SECTION_2D_VTK': (1, ''),
+    'EXPORT_VOLUME_SECTION_TECPLOT': (1, ''),
+    'CAD_CREATE_CURVE_EXPORT_CCS': (1, ''),
+    'SAVE_PLOT_TO_FILE': (1, ''),
+    'SAVE_SCENE_AS_IMAGE': (1, ''),
+    'UNSTEADY_SOLVER_EXPORT_PLOTS': (1, ''),
+    'STABILITY_TOOLBOX_EXPORT': (1, ''),
+}
+
+# Commands that write a whole folder of files
+OUTPUT_FOLDER_COMMANDS = {
+    'UNSTEADY_SOLVER_ANIMATION ENABLE': (1, 'FOLDER '),
+}
+
+_CHUNK_SIZE = 1024 * 1024
+
+def _lookup(table, tokens):
+    if len(tokens) > 1:
+        key = f"{tokens[0]} {tokens[1]}"
+        if key in table:
+            return table[key]
+    return table.get(tokens[0]) if tokens else None
+
+def _path_at(lines, index, rule):
+    offset, prefix = rule
+    if index + offset >= len(lines):
+        return None
+    line = lines[index + offset]
+    if not line.startswith(prefix):
+        return None
+    return line[len(prefix):].strip()
+
+def script_file_references(script_path):
+    """
+    List the files a FlightStream script reads and writes.
+
+    Sweep results files written by EXECUTE_SOLVER_SWEEPER are outputs; with
+    APPEND_TO_EXISTING_SWEEP ENABLE they are inputs too, since the existing file is extended.
+    Surface data folders of the sweeper and unsteady animation folders are output folders.
+
+    :param script_path: Path to the script file.
+
+    Returns:
+        tuple of (inputs, outputs, output_folders): lists of absolute paths in script order.
+    """
+    with open(script_path, 'r') as file:
+        lines = [line.rstrip('\r\n') for line in file]
+    return lines_file_references(lines)
+
+def lines_file_references(lines):
+    """
+    List the files script lines read and write, as script_file_references does for a file.
+
+    :param lines: List of script lines, as in State.lines.
+
+    Returns:
+        tuple of (inputs, outputs, output_folders): lists of absolute paths in script order.
+    """
+    lines = '\n'.join(lines).split('\n')
+    inputs, outputs, folders = [], [], []
+    for index, line in enumerate(lines):
+        tokens = line.split()
+        if not tokens or line.startswith('#'):
+            continue
+        rule = _lookup(INPUT_FILE_COMMANDS, tokens)
+        if rule is not None:
+            path = _path_at(lines, index, rule)
+            if path:
+                inputs.append(os.path.abspath(path))
+            continue
+        rule = _lookup(OUTPUT_FILE_COMMANDS, tokens)
+        if rule is not None:
+            path = _path_at(lines, index, rule)
+            if path:
+                outputs.append(os.path.abspath(path))
+            continue
+        rule = _lookup(OUTPUT_FOLDER_COMMANDS, tokens)
+        if rule is not None:
+            path = _path_at(lines, index, rule)
+            if path:
+                folders.append(os.path.abspath(path))
+            continue
+
+        if tokens[0] == 'EXPORT_SURFACE_DATA_PER_STEP' and tokens[1:] == ['ENABLE']:
+            following = lines[index + 1].strip() if index + 1 < len(lines) else ''
+            if following and not following.startswith('CLEAR_SOLUTION_AFTER_EACH_RUN'):
+                folders.append(os.path.abspath(following))
+        elif tokens[0] == 'APPEND_TO_EXISTING_SWEEP' and index + 1 < len(lines):
+            results = os.path.abspath(lines[index + 1].strip())
+            outputs.append(results)
+            if tokens[1:] == ['ENABLE']:
+                inputs.append(results)
+    return inputs, outputs, folders
+
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _folder_size(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            size += os.path.getsize(os.path.join(root, name))
+    return size
+
+class ScriptCache:
+    """
+    Content-addressed store of FlightStream run outputs, keyed by script and input file hashes.
+
+    Each entry is a folder under 'cache_dir' holding a copy of every file the run wrote and a
+    manifest with the original paths and captured console output. Content digests of large
+    inputs are remembered by (size, mtime) so unchanged .fsm files are not re-hashed on every
+    lookup. Entries are evicted least-recently-used first when 'max_entries' or 'max_bytes'
+    is exceeded.
+
+    :param cache_dir: Folder holding the cache.
+    :param max_bytes: Maximum total size of the cached files. Defaults to None (no limit).
+    :param max_entries: Maximum number of cached runs. Defaults to None (no limit).
+
+    Example usage:
+    cache = ScriptCache('C:/.../fs_cache', max_bytes=50 * 1024**3)
+    result = cached_execute_fsm_script('script_out.txt', cache=cache)
+    """
+    def __init__(self, cache_dir, max_bytes=None, max_entries=None):
+        if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes <= 0):
+            raise ValueError("`max_bytes` should be an integer value greater than 0.")
+        if max_entries is not None and (not isinstance(max_entries, int) or max_entries <= 0):
+            raise ValueError("`max_entries` should be an integer value greater than 0.")
+
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._digest_index_path = os.path.join(self.cache_dir, 'file_digests.json')
+        self._digests = self._load_json(self._digest_index_path, {})
+
+    @staticmethod
+    def _load_json(path, default):
+        try:
+            with open(path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return default
+
+    @staticmethod
+    def _dump_json(path, data):
+        # Write then rename so a crash never leaves a half-written manifest
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+
+    def _input_digest(self, path):
+        stat = os.stat(path)
+        known = self._digests.get(path)
+        if known is not None and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = _file_digest(path)
+        self._digests[path] = [stat.st_size, stat.st_mtime_ns, digest]
+        self._dump_json(self._digest_index_path, self._digests)
+        return digest
+
+    def key(self, script_path):
+        """
+        Return the cache key of a script: a hash of its text and of every input file it reads.
+
+        :param script_path: Path to the script file.
+        """
+        inputs, _, _ = script_file_references(script_path)
+        digest = hashlib.blake2b(digest_size=20)
+        with open(script_path, 'rb') as file:
+            digest.update(file.read())
+        for path in inputs:
+            digest.update(path.encode())
+            if os.path.exists(path):
+                digest.update(self._input_digest(path).encode())
+            else:
+                digest.update(b'<missing>')
+        return digest.hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _manifest_path(self, key):
+        return os.path.join(self._entry_dir(key), 'manifest.json')
+
+    def lookup(self, key):
+        """
+        Return the manifest of a cached run, or None on a miss.
+        """
+        manifest = self._load_json(self._manifest_path(key), None)
+        if manifest is None:
+            return None
+        manifest['last_used'] = time.time()
+        self._dump_json(self._manifest_path(key), manifest)
+        return manifest
+
+    def restore(self, key):
+        """
+        Copy the cached outputs of a run back to their original paths.
+
+        Returns:
+            dict: The entry manifest, or None on a miss.
+        """
+        manifest = self.lookup(key)
+        if manifest is None:
+            return None
+        entry_dir = self._entry_dir(key)
+        for output in manifest['outputs']:
+            source = os.path.join(entry_dir, output['blob'])
+            destination = output['path']
+            if output['folder']:
+                os.makedirs(destination, exist_ok=True)
+                for name in os.listdir(source):
+                    shutil.copyfile(os.path.join(source, name), os.path.join(destination, name))
+            else:
+                os.makedirs(os.path.dirname(destination), exist_ok=True)
+                shutil.copyfile(source, destination)
+        return manifest
+
+    def store(self, key, script_path, args, returncode, stdout, stderr, since=None):
+        """
+        Save the outputs of a finished run under 'key'.
+
+        :param key: Cache key from key().
+        :param script_path: Path to the script that was run.
+        :param args: Command line of the run.
+        :param returncode: Exit code of the run.
+        :param stdout: Captured standard output.
+        :param stderr: Captured standard error.
+        :param since: Only files of output folders modified after this time stamp are stored.
+                      Defaults to None (whole folders).
+
+        Returns:
+            bool: False if an output file is missing and nothing was stored.
+        """
+        _, outputs, folders = script_file_references(script_path)
+        # Later exports to the same path overwrite earlier ones; keep one copy
+        outputs = list(dict.fromkeys(outputs))
+        folders = list(dict.fromkeys(folders))
+        if not all(os.path.isfile(path) for path in outputs):
+            return False
+
+        entry_dir = self._entry_dir(key)
+        temp_dir = entry_dir + '.partial'
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        os.makedirs(temp_dir)
+
+        entries = []
+        for number, path in enumerate(outputs):
+            blob = str(number)
+            shutil.copyfile(path, os.path.join(temp_dir, blob))
+            entries.append({'path': path, 'blob': blob, 'folder': False})
+        for number, path in enumerate(folders, start=len(outputs)):
+            if not os.path.isdir(path):
+                continue
+            blob = str(number)
+            target = os.path.join(temp_dir, blob)
+            os.makedirs(target)
+            for name in os.listdir(path):
+                source = os.path.join(path, name)
+                if os.path.isfile(source) and (since is None or os.path.getmtime(source) >= since):
+                    shutil.copyfile(source, os.path.join(target, name))
+            entries.append({'path': path, 'blob': blob, 'folder': True})
+
+        now = time.time()
+        manifest = {
+            'script_path': os.path.abspath(script_path),
+            'args': args,
+            'returncode': returncode,
+            'stdout': stdout,
+            'stderr': stderr,
+            'outputs': entries,
+            'size': _folder_size(temp_dir),
+            'created': now,
+            'last_used': now,
+        }
+        self._dump_json(os.path.join(temp_dir, 'manifest.json'), manifest)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(temp_dir, entry_dir)
+        self.evict()
+        return True
+
+    def entries(self):
+        """
+        Return (key, manifest) pairs of all cached runs.
+        """
+        found = []
+        for prefix in os.listdir(self.cache_dir):
+            prefix_dir = os.path.join(self.cache_dir, prefix)
+            if len(prefix) != 2 or not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                if key.endswith('.partial'):
+                    continue
+                manifest = self._load_json(self._manifest_path(key), None)
+                if manifest is not None:
+                    found.append((key, manifest))
+        return found
+
+    def evict(self):
+        """
+        Remove least-recently-used entries until the size and count limits are met.
+        """
+        if self.max_bytes is None and self.max_entries is None:
+            return
+        entries = sorted(self.entries(), key=lambda item: item[1]['last_used'])
+        total = sum(manifest['size'] for _, manifest in entries)
+        while entries and ((self.max_entries is not None and len(entries) > self.max_entries) or
+                           (self.max_bytes is not None and total > self.max_bytes)):
+            key, manifest = entries.pop(0)
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= manifest['size']
+
+    def clear(self):
+        """
+        Remove every cached run.
+        """
+        for key, _ in self.entries():
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+def cached_execute_fsm_script(script_path=r".\script_out.txt", fsexe_path=None, hidden=False,
+                              cache=None, cache_dir=None):
+    """
+    Execute a flightscript script unless an identical run is cached, in which case its
+    output files are restored instead of launching FlightStream.
+
+    A run is identical when the script text and the contents of every file it reads
+    (open_fsm, import_mesh, ccs_import, set_motion_custom_table, ...) are unchanged. Only runs
+    that exit with code 0 and write all their output files are cached.
+
+    :param script_path (str): The path to the FSM script file.
+    :param fsexe_path (str, optional): The path to the FSM executable. Defaults to the FS_EXE
+            environment variable.
+    :param hidden (bool, optional): Run FlightStream without its GUI. Defaults to False.
+    :param cache (ScriptCache, optional): Cache to use.
+    :param cache_dir (str, optional): Folder of the cache to use when 'cache' is not given.
+
+    Returns:
+        subprocess.CompletedProcess: The result of running the FSM script, or the recorded
+            result of the cached run.
+
+    Example usage:
+    cached_execute_fsm_script(fsexe_path=fsexe_path, cache_dir='C:/.../fs_cache')
+    """
+    if cache is None:
+        if cache_dir is None:
+            raise ValueError("Either `cache` or `cache_dir` should be provided.")
+        cache = ScriptCache(cache_dir)
+
+    if not os.path.exists(script_path):
+        raise FileNotFoundError(f"The specified file '{script_path}' does not exist on path.")
+
+    key = cache.key(script_path)
+    manifest = cache.restore(key)
+    if manifest is not None:
+        return subprocess.CompletedProcess(manifest['args'], manifest['returncode'],
+                                           manifest['stdout'], manifest['stderr'])
+
+    command = build_command(resolve_fsexe_path(fsexe_path), script_path, hidden)
+    start = time.time()
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"The file {command[0]} was not found.")
+
+    if result.returncode == 0:
+        # Allow for coarse file system time stamps when picking up folder outputs
+        cache.store(key, script_path, command, result.returncode, result.stdout, result.stderr,
+                    since=start - 2.0)
+    return result
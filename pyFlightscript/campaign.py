@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from .exec_solver import close_flightstream
+from .script import new_script
+
+class Campaign:
+    """
+    A multi-case study run as one FlightStream script per case, resumable after a crash.
+
+    Every finished run is recorded in an append-only JSON lines journal. A case counts as
+    complete, and is skipped by run(), when its output files exist and are valid and either
+    the journal's last record of the same script is a success, or there is no such record
+    and the outputs were written after the script (a run that finished just before a crash
+    kept it from being journaled).
+    Changing a case's commands changes its script, which makes it pending again.
+
+    Output files are the files the case script exports (see script_file_references) plus
+    any given to add_case. The standard output and error of the runs are written to the
+    'logs' sub-folder of the work folder, apart from the case scripts.
+
+    Example usage:
+    campaign = Campaign('C:/.../study/journal.jsonl')
+    for u in range(80, 280, 10):
+        campaign.add_case(f'U{u}', lambda u=u: import_run_export(path, u, 'U'))
+    campaign.run(max_instances=4)   # after a crash, the same call runs the remaining cases
+    """
+    def __init__(self, journal_path, work_dir=None):
+        """
+        :param journal_path: Path of the JSON lines journal. Created on the first run.
+        :param work_dir: Folder of the case scripts and of the 'logs' sub-folder. Defaults to
+                         the journal's folder.
+        """
+        self.journal_path = os.path.abspath(journal_path)
+        self.work_dir = os.path.dirname(self.journal_path) if work_dir is None else os.path.abspath(work_dir)
+        self.cases = {}
+        self._lock = threading.Lock()
+
+    def add_case(self, name, build, outputs=(), validate=None):
+        """
+        Add a case.
+
+        :param name: Unique case name, used in the journal and as the script file name.
+        :param build: Callable emitting the case's commands (open_fsm, solver setup, exports).
+                      It runs in its own script state; close_flightstream is appended.
+        :param outputs: Extra files the case must produce. Defaults to ().
+        :param validate: Callable taking an output path and returning True if the file is
+                         usable (e.g. parses completely). Defaults to None, which only requires
+                         the file to be non-empty.
+        """
+        if not isinstance(name, str) or not name or not all(c.isalnum() or c in '-_.' for c in name):
+            raise ValueError("`name` should be a non-empty string of letters, digits, '-', '_' or '.'.")
+        if name in self.cases:
+            raise ValueError(f"Case `{name}` is already defined.")
+        if not callable(build):
+            raise ValueError("`build` should be a callable.")
+        self.cases[name] = (build, [os.path.abspath(path) for path in outputs], validate)
+
+    def script_path(self, name):
+        return os.path.join(self.work_dir, f'{name}.txt')
+
+    def log_dir(self):
+        # A sub-folder, so that no case name can produce a script named like another case's logs
+        return os.path.join(self.work_dir, 'logs')
+
+    def _write_script(self, name):
+        # The script is only rewritten when its text changes, so that its time stamp keeps
+        # telling whether existing outputs were produced by it
+        build = self.cases[name][0]
+        with new_script() as state:
+            build()
+            close_flightstream()
+        text = '\n'.join(state.lines) + '\n\n'
+        path = self.script_path(name)
+        existing = None
+        if os.path.exists(path):
+            with open(path, 'r') as file:
+                existing = file.read()
+        if existing != text:
+            with open(path, 'w') as file:
+                file.write(text)
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def journal(self):
+        """
+        Read the journal.
+
+        Returns:
+            dict: Case name to its last journal record.
+        """
+        records = {}
+        if not os.path.exists(self.journal_path):
+            return records
+        with open(self.journal_path, 'r') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                records[record.get('case')] = record
+        return records
+
+    def _record(self, record):
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            with open(self.journal_path, 'a') as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _outputs(self, name):
+        from .cache import script_file_references
+        _, outputs, folders = script_file_references(self.script_path(name))
+        extra = self.cases[name][1]
+        return list(dict.fromkeys(outputs + extra)), folders
+
+    def _outputs_valid(self, name, outputs, folders):
+        validate = self.cases[name][2]
+        for path in outputs:
+            if not os.path.isfile(path) or os.path.getsize(path) == 0:
+                return False
+            if validate is not None and not validate(path):
+                return False
+        return all(os.path.isdir(folder) for folder in folders)
+
+    def _complete(self, name, digest, record):
+        outputs, folders = self._outputs(name)
+        if not self._outputs_valid(name, outputs, folders):
+            return False
+        if record is not None and record.get('digest') == digest:
+            return record.get('status') == 'done'
+        # Finished but not journaled: every output is newer than the script
+        script_time = os.path.getmtime(self.script_path(name))
+        return bool(outputs) and all(os.path.getmtime(path) >= script_time for path in outputs)
+
+    def _scan(self):
+        os.makedirs(self.work_dir, exist_ok=True)
+        records = self.journal()
+        scan = []
+        for name in self.cases:
+            digest = self._write_script(name)
+            scan.append((name, digest, self._complete(name, digest, records.get(name))))
+        return scan
+
+    def pending(self):
+        """
+        Write the case scripts and return the cases that still have to run.
+
+        Returns:
+            list of str: Names of the unfinished cases, in the order they were added.
+        """
+        return [name for name, _, complete in self._scan() if not complete]
+
+    def run(self, fsexe_path=None, hidden=True, max_instances=1, max_cores=None):
+        """
+        Run the unfinished cases, journaling each one as soon as it finishes.
+
+        A run that exits with code 0 but leaves an output missing or invalid is journaled as
+        failed and stays pending.
+
+        :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+        :param hidden: Run FlightStream without its GUI. Defaults to True.
+        :param max_instances: Maximum number of concurrent FlightStream processes. Defaults to 1.
+        :param max_cores: Total cores shared by the runs. Defaults to os.cpu_count().
+
+        Returns:
+            dict: Case name to RunResult, for the cases run by this call.
+        """
+        from .runner import run_scripts_parallel
+
+        digests = {name: digest for name, digest, complete in self._scan() if not complete}
+        if not digests:
+            return {}
+        by_path = {self.script_path(name): name for name in digests}
+
+        def finished(result):
+            name = by_path[result.script_path]
+            outputs, folders = self._outputs(name)
+            ok = result.ok and self._outputs_valid(name, outputs, folders)
+            self._record({'case': name, 'status': 'done' if ok else 'failed', 'digest': digests[name],
+                          'returncode': result.returncode, 'wall_time': result.wall_time,
+                          'finished': time.time()})
+
+        results = run_scripts_parallel(list(by_path), fsexe_path=fsexe_path, hidden=hidden,
+                                       max_instances=max_instances, max_cores=max_cores,
+                                       output_dir=self.log_dir(), on_result=finished)
+        return {by_path[result.script_path]: result for result in results}
+
+    def status(self):
+        """
+        Journal status of every case: 'done', 'failed' or 'pending' (never run, or changed
+        since its last run).
+
+        Returns:
+            dict: Case name to status, in the order the cases were added.
+        """
+        records = self.journal()
+        status = {}
+        for name, digest, complete in self._scan():
+            record = records.get(name)
+            if complete:
+                status[name] = 'done'
+            elif record is not None and record.get('digest') == digest:
+                status[name] = 'failed'
+            else:
+                # A failed run of an earlier version of the script says nothing about this one
+                status[name] = 'pending'
+        return status
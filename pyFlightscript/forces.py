@@ -0,0 +1,211 @@
+import re
+from .utils import *
+
+# Header names recognised for each role, compared in lower case without '_', '-' or spaces
+_ROLE_NAMES = {
+    'x': ('x', 'xc', 'xcenter', 'px'), 'y': ('y', 'yc', 'ycenter', 'py'), 'z': ('z', 'zc', 'zcenter', 'pz'),
+    'fx': ('fx', 'forcex', 'xforce'), 'fy': ('fy', 'forcey', 'yforce'), 'fz': ('fz', 'forcez', 'zforce'),
+    'boundary': ('boundary', 'boundaryindex', 'surface', 'surfaceindex', 'bnd'),
+}
+
+# Column order assumed when the header does not name the columns
+_POSITIONAL = {6: ('x', 'y', 'z', 'fx', 'fy', 'fz'), 7: ('boundary', 'x', 'y', 'z', 'fx', 'fy', 'fz')}
+
+def _unit(np, axis):
+    axis = np.asarray(axis, dtype=np.float64).reshape(3)
+    norm = np.linalg.norm(axis)
+    if norm == 0:
+        raise ValueError("`axis` should not be a zero vector.")
+    return axis / norm
+
+def _sums(np, labels, size, values):
+    # Per-label sums of the columns of 'values', one bincount per column
+    return np.stack([np.bincount(labels, weights=values[:, i], minlength=size)
+                     for i in range(values.shape[1])], axis=1)
+
+class ForceDistribution:
+    """
+    Force vectors applied at points, as exported by export_solver_analysis_force_distributions.
+
+    Every aggregation works on whole arrays (bincount and vector products), without Python
+    loops over the rows.
+
+    Attributes:
+        points (numpy array): Application points, shape (rows, 3).
+        forces (numpy array): Force vectors, shape (rows, 3).
+        boundaries (numpy array): Boundary index of each row, or None if unknown.
+        columns (dict): Every column of the file by name.
+
+    Example usage:
+    loads = read_force_distributions('C:/.../forces_case12.txt')
+    force, moment = loads.resultant(point=(0.25, 0., 0.))
+    stations = loads.by_station(axis=(0., 1., 0.), edges=np.linspace(0., 5., 21), point=(0., 0., 0.))
+    """
+    def __init__(self, points, forces, boundaries=None, columns=None):
+        np = require_numpy()
+        self.points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+        self.forces = np.ascontiguousarray(forces, dtype=np.float64).reshape(-1, 3)
+        if self.points.shape != self.forces.shape:
+            raise ValueError("`points` and `forces` should have the same number of rows.")
+        self.boundaries = None if boundaries is None else np.asarray(boundaries).astype(np.int64).reshape(-1)
+        self.columns = {} if columns is None else columns
+
+    def __len__(self):
+        return self.points.shape[0]
+
+    def __repr__(self):
+        return f"ForceDistribution(rows={len(self)}, boundaries={self.boundaries is not None})"
+
+    def moments(self, point=(0., 0., 0.)):
+        """
+        Moment of every force about a point, shape (rows, 3).
+        """
+        np = require_numpy()
+        return np.cross(self.points - np.asarray(point, dtype=np.float64), self.forces)
+
+    def resultant(self, point=(0., 0., 0.), axis=None):
+        """
+        Total force and moment about a point.
+
+        :param point: Moment reference point. Defaults to the origin.
+        :param axis: Direction to project the force and moment on. Defaults to None, the full vectors.
+
+        Returns:
+            tuple of (force, moment): 3-vectors, or scalar components along 'axis'.
+        """
+        force = self.forces.sum(axis=0)
+        moment = self.moments(point).sum(axis=0)
+        if axis is not None:
+            np = require_numpy()
+            unit = _unit(np, axis)
+            return float(force @ unit), float(moment @ unit)
+        return force, moment
+
+    def by_station(self, axis, edges, point=None):
+        """
+        Sum forces and moments in stations along an axis, e.g. spanwise strips.
+
+        :param axis: Direction of the station coordinate, e.g. (0, 1, 0) for the span.
+        :param edges: Increasing station boundaries along 'axis'; rows outside them are ignored.
+        :param point: Moment reference point. Defaults to None, each station's moments are
+                      taken about the point of 'axis' at its inner edge.
+
+        Returns:
+            tuple of (forces, moments): arrays of shape (stations, 3).
+        """
+        np = require_numpy()
+        unit = _unit(np, axis)
+        edges = np.asarray(edges, dtype=np.float64)
+        if edges.ndim != 1 or edges.size < 2 or (np.diff(edges) <= 0).any():
+            raise ValueError("`edges` should be at least two increasing values.")
+        stations = edges.size - 1
+        label = np.searchsorted(edges, self.points @ unit, side='right') - 1
+        # A row on the last edge belongs to the last station
+        label[self.points @ unit == edges[-1]] = stations - 1
+        inside = (label >= 0) & (label < stations)
+        label, points, forces = label[inside], self.points[inside], self.forces[inside]
+
+        if point is None:
+            origins = edges[label, None] * unit
+        else:
+            origins = np.asarray(point, dtype=np.float64)
+        moments = np.cross(points - origins, forces)
+        return _sums(np, label, stations, forces), _sums(np, label, stations, moments)
+
+    def by_boundary(self, point=(0., 0., 0.)):
+        """
+        Sum forces and moments per boundary.
+
+        :param point: Moment reference point. Defaults to the origin.
+
+        Returns:
+            tuple of (boundaries, forces, moments): sorted boundary indices and arrays of shape (boundaries, 3).
+        """
+        np = require_numpy()
+        if self.boundaries is None:
+            raise ValueError("The force distribution has no boundary indices.")
+        boundaries, label = np.unique(self.boundaries, return_inverse=True)
+        return (boundaries, _sums(np, label, boundaries.size, self.forces),
+                _sums(np, label, boundaries.size, self.moments(point)))
+
+def _roles(names, columns):
+    if columns is not None:
+        missing = [role for role in ('x', 'y', 'z', 'fx', 'fy', 'fz') if role not in columns]
+        if missing:
+            raise ValueError(f"`columns` should give the {', '.join(missing)} column(s).")
+        return {role: names.index(column) if isinstance(column, str) else int(column)
+                for role, column in columns.items()}
+    keys = [re.sub(r'[\s_\-]|\(.*\)', '', name.lower()) for name in names]
+    roles = {}
+    for role, aliases in _ROLE_NAMES.items():
+        for i, key in enumerate(keys):
+            if key in aliases:
+                roles[role] = i
+                break
+    if all(role in roles for role in ('x', 'y', 'z', 'fx', 'fy', 'fz')):
+        return roles
+    if len(names) in _POSITIONAL:
+        return {role: i for i, role in enumerate(_POSITIONAL[len(names)])}
+    raise ValueError(f"Cannot tell the point and force columns apart in {names}; give `columns`.")
+
+def read_force_distributions(filename, columns=None, memory_map=None):
+    """
+    Read a force distributions file (see export_solver_analysis_force_distributions).
+
+    Data rows are converted in bulk (see read_sweep_blocks). Point and force columns are found
+    from the header names (X, Y, Z, Fx, Fy, Fz and Boundary, in any case); files without a
+    usable header are read as X Y Z Fx Fy Fz, or Boundary X Y Z Fx Fy Fz with seven columns.
+    When a file holds one block per boundary without a boundary column, rows get the block
+    number, from 1, as their boundary index.
+
+    :param filename: Path of the force distributions file.
+    :param columns: Dict of role ('x', 'y', 'z', 'fx', 'fy', 'fz', optionally 'boundary') to
+                    column name or position, overriding the detection. Defaults to None.
+    :param memory_map: See read_sweep_blocks. Defaults to None.
+
+    Returns:
+        ForceDistribution
+
+    Example usage:
+    loads = read_force_distributions('C:/.../forces_case12.txt')
+    print(loads.by_boundary(point=(0.25, 0., 0.)))
+    """
+    np = require_numpy()
+    from .read_sweep import read_sweep_blocks
+
+    blocks = read_sweep_blocks(filename, memory_map=memory_map)
+    if not blocks:
+        raise ValueError(f"'{filename}' holds no force data.")
+    names = blocks[0][0]
+    if any(len(block_names) != len(names) for block_names, _ in blocks):
+        raise ValueError(f"The blocks of '{filename}' have different column counts.")
+    rows = np.concatenate([block for _, block in blocks]) if len(blocks) > 1 else blocks[0][1]
+    roles = _roles(names, columns)
+
+    if 'boundary' in roles:
+        boundaries = rows[:, roles['boundary']]
+    elif len(blocks) > 1:
+        boundaries = np.repeat(np.arange(1, len(blocks) + 1), [block.shape[0] for _, block in blocks])
+    else:
+        boundaries = None
+    return ForceDistribution(rows[:, [roles['x'], roles['y'], roles['z']]],
+                             rows[:, [roles['fx'], roles['fy'], roles['fz']]], boundaries,
+                             {name: rows[:, i] for i, name in enumerate(names)})
+
+def load_envelope(values):
+    """
+    Minimum and maximum over cases of loads of the same shape, e.g. station loads.
+
+    :param values: Iterable of arrays, one per case, such as the forces of by_station.
+
+    Returns:
+        tuple of (minimum, maximum, case of the minimum, case of the maximum), arrays of the
+        shape of one case.
+
+    Example usage:
+    shears = [read_force_distributions(path).by_station((0, 1, 0), edges)[0] for path in paths]
+    low, high, low_case, high_case = load_envelope(shears)
+    """
+    np = require_numpy()
+    stacked = np.stack([np.asarray(value, dtype=np.float64) for value in values])
+    return stacked.min(axis=0), stacked.max(axis=0), stacked.argmin(axis=0), stacked.argmax(axis=0)
@@ -0,0 +1,222 @@
+import os
+import re
+import time
+
+# A decimal number, or a NaN or infinite value as C and Fortran runtimes print them
+_NUMBER = r'([-+]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|nan\b|inf(?:inity)?\b))'
+
+# Default patterns of LogMonitor; each may be replaced by a regular expression of its own.
+# The residual value is the first number after the word that does not continue a label such
+# as (L2) or L2; convergence messages are ignored when negated ('not converged'). Iteration
+# and residual are read from every line, including those matching 'converged' or 'error'.
+LOG_PATTERNS = {
+    'iteration': re.compile(r'\biter(?:ation)?s?\b\s*(?:[:#=]|no\.?)?\s*(\d+)', re.IGNORECASE),
+    'residual': re.compile(r'\bresidual\w*\b.{0,24}?(?<![\w.(\[])' + _NUMBER, re.IGNORECASE),
+    'converged': re.compile(r"^(?!.*(?:\bnot|\bnever|n't|\bfailed to|\bunable to)\W+(?:\w+\W+){0,2}?converge)"
+                            r".*?(?:\bconverged\b|\bconvergence (?:reached|achieved)\b)", re.IGNORECASE),
+    'error': re.compile(r'\berror\b|\bdiverg|\bnan\b|\bfailed\b', re.IGNORECASE),
+}
+
+class LogEvent:
+    """
+    What LogMonitor recognised in one log or stdout line.
+
+    Attributes:
+        kind (str): 'iteration', 'converged' or 'error'.
+        line (str): The line.
+        iteration (int): Iteration number on the line, or the last one seen before. None if unknown.
+        residual (float): Residual on the line, possibly NaN or infinite, or None.
+    """
+    __slots__ = ('kind', 'line', 'iteration', 'residual')
+
+    def __init__(self, kind, line, iteration=None, residual=None):
+        self.kind = kind
+        self.line = line
+        self.iteration = iteration
+        self.residual = residual
+
+    def __repr__(self):
+        return f"LogEvent({self.kind!r}, iteration={self.iteration}, residual={self.residual})"
+
+class LogMonitor:
+    """
+    Incremental parser of FlightStream solver output: iteration numbers, residuals and
+    convergence or error messages.
+
+    Lines are fed one at a time, from a LogTailer, from the stdout of a running script
+    (e.g. run_script_async(..., on_line=monitor.feed)) or from any iterable. The monitor
+    keeps the solver progress seen so far, for deciding to stop a run early.
+
+    Attributes:
+        iteration (int): Last iteration number seen, or None.
+        residuals (list): (iteration, residual) pairs in the order they were printed.
+        converged (bool): True once a convergence message was seen.
+        errors (list of str): Lines matching the error pattern.
+        lines (int): Number of lines fed.
+
+    Example usage:
+    monitor = LogMonitor(on_event=lambda event: print(event.iteration, event.residual))
+    for event in monitor.feed_lines(tail_lines('C:/.../run.stdout.txt', stop=lambda: done)):
+        if event.residual is not None and event.residual > 1e3:
+            break
+    """
+    def __init__(self, patterns=None, on_event=None):
+        """
+        :param patterns: Dict overriding entries of LOG_PATTERNS ('iteration', 'residual',
+                         'converged', 'error') with regular expressions, compiled or not. The
+                         iteration and residual patterns capture the number in group 1.
+        :param on_event: Callable called with every LogEvent. Defaults to None.
+        """
+        self.patterns = dict(LOG_PATTERNS)
+        for name, pattern in (patterns or {}).items():
+            if name not in LOG_PATTERNS:
+                raise ValueError(f"Unknown log pattern `{name}`; should be one of {list(LOG_PATTERNS)}.")
+            self.patterns[name] = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.on_event = on_event
+        self.iteration = None
+        self.residuals = []
+        self.converged = False
+        self.errors = []
+        self.lines = 0
+
+    def feed(self, line):
+        """
+        Parse one line.
+
+        Returns:
+            LogEvent, or None if the line holds nothing the monitor recognises.
+        """
+        self.lines += 1
+        patterns = self.patterns
+        # A diverging solver prints e.g. 'Iteration 12: residual = NaN', which is also an error
+        iteration = patterns['iteration'].search(line)
+        residual = patterns['residual'].search(line)
+        if iteration:
+            self.iteration = int(iteration.group(1))
+        value = None
+        if residual:
+            value = float(residual.group(1))
+            self.residuals.append((self.iteration, value))
+
+        event = None
+        if patterns['error'].search(line):
+            self.errors.append(line)
+            event = LogEvent('error', line, self.iteration, value)
+        elif patterns['converged'].search(line):
+            self.converged = True
+            event = LogEvent('converged', line, self.iteration, value)
+        elif iteration or residual:
+            event = LogEvent('iteration', line, self.iteration, value)
+
+        if event is not None and self.on_event is not None:
+            self.on_event(event)
+        return event
+
+    def feed_lines(self, lines):
+        """
+        Parse lines as they come and yield the events, e.g. from tail_lines.
+        """
+        for line in lines:
+            event = self.feed(line)
+            if event is not None:
+                yield event
+
+class LogTailer:
+    """
+    Reads the lines appended to a growing text file, without re-reading what was read.
+
+    The read position is kept between calls, a line is only returned once its line end has
+    been written, and a file that does not exist yet or was truncated or replaced (shorter
+    than the read position) is read again from its start.
+    """
+    def __init__(self, path, from_end=False, encoding='utf-8'):
+        """
+        :param path: Path of the file, e.g. an exported log or the stdout file of a run.
+        :param from_end: Skip the content already in the file. Defaults to False.
+        :param encoding: Text encoding of the file. Defaults to 'utf-8'; undecodable bytes are replaced.
+        """
+        self.path = path
+        self.encoding = encoding
+        self.offset = os.path.getsize(path) if from_end and os.path.exists(path) else 0
+        self._partial = b''
+
+    def read_lines(self):
+        """
+        Return the complete lines appended since the last call.
+
+        Returns:
+            list of str: The new lines, without line ends.
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            self.offset = 0
+            self._partial = b''
+        if size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(size - self.offset)
+        self.offset += len(data)
+
+        data = self._partial + data
+        end = data.rfind(b'\n') + 1
+        self._partial = data[end:]
+        if not end:
+            return []
+        return data[:end].decode(self.encoding, errors='replace').splitlines()
+
+    def follow(self, interval=0.5, stop=None, timeout=None):
+        """
+        Yield lines as they are appended, polling every 'interval' seconds.
+
+        :param interval: Seconds between polls when no new line is available. Defaults to 0.5.
+        :param stop: Callable returning True when following should end, e.g. once the run has
+                     exited; the lines written by then are still yielded. Defaults to None.
+        :param timeout: Seconds after which following ends. Defaults to None (no limit).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            done = (stop is not None and stop()) or (deadline is not None and time.monotonic() >= deadline)
+            lines = self.read_lines()
+            yield from lines
+            if done:
+                if self._partial:
+                    yield self._partial.decode(self.encoding, errors='replace')
+                    self._partial = b''
+                return
+            if not lines:
+                time.sleep(interval)
+
+def tail_lines(path, interval=0.5, stop=None, timeout=None, from_end=False):
+    """
+    Yield the lines of a growing file as they are written (see LogTailer.follow).
+
+    Example usage:
+    process = subprocess.Popen(command, stdout=open('run.stdout.txt', 'w'))
+    for line in tail_lines('run.stdout.txt', stop=lambda: process.poll() is not None):
+        print(line)
+    """
+    return LogTailer(path, from_end=from_end).follow(interval=interval, stop=stop, timeout=timeout)
+
+def monitor_log(path, on_event=None, interval=0.5, stop=None, timeout=None, patterns=None):
+    """
+    Yield the solver progress events of a growing log or stdout file as they are written.
+
+    :param path: Path of the file.
+    :param on_event: Callable called with every LogEvent. Defaults to None.
+    :param interval: Seconds between polls. Defaults to 0.5.
+    :param stop: Callable returning True when monitoring should end. Defaults to None.
+    :param timeout: Seconds after which monitoring ends. Defaults to None (no limit).
+    :param patterns: Pattern overrides, see LogMonitor. Defaults to None.
+
+    Example usage:
+    for event in monitor_log('run.stdout.txt', stop=lambda: process.poll() is not None):
+        if event.kind == 'error' or (event.residual or 0) > 1e3:
+            process.kill()
+    """
+    monitor = LogMonitor(patterns=patterns, on_event=on_event)
+    return monitor.feed_lines(tail_lines(path, interval=interval, stop=stop, timeout=timeout))
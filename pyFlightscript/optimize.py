@@ -0,0 +1,218 @@
+import os
+from .cache import INPUT_FILE_COMMANDS, OUTPUT_FILE_COMMANDS, _lookup
+from .parse import Command, parse_script
+from .script import current_script
+
+OPTIMIZER_PASSES = ('duplicate_initializations', 'dead_settings', 'merge_settings', 'overwritten_exports')
+
+# Single-value solver settings and the SOLVER_SETTINGS field each one writes; settings
+# without a SOLVER_SETTINGS field are keyed by their own keyword
+_SETTING_FIELDS = {
+    'SOLVER_SET_AOA': 'ANGLE_OF_ATTACK',
+    'SOLVER_SET_SIDESLIP': 'SIDESLIP_ANGLE',
+    'SOLVER_SET_VELOCITY': 'FREESTREAM_VELOCITY',
+    'SOLVER_SET_ITERATIONS': 'ITERATIONS',
+    'SOLVER_SET_CONVERGENCE': 'CONVERGENCE_LIMIT',
+    'SOLVER_SET_FORCED_ITERATIONS': 'FORCED_RUN',
+    'SOLVER_SET_REF_VELOCITY': 'REFERENCE_VELOCITY',
+    'SOLVER_SET_REF_AREA': 'REFERENCE_AREA',
+    'SOLVER_SET_REF_LENGTH': 'REFERENCE_LENGTH',
+    'SOLVER_SET_MACH_NUMBER': 'SOLVER_SET_MACH_NUMBER',
+    'SOLVER_SET_REF_MACH_NUMBER': 'SOLVER_SET_REF_MACH_NUMBER',
+    'SOLVER_SET_COMPRESSIBILITY': 'SOLVER_SET_COMPRESSIBILITY',
+    'SOLVER_SET_FARFIELD_LAYERS': 'SOLVER_SET_FARFIELD_LAYERS',
+    'SOLVER_SET_MESH_INDUCED_WAKE_VELOCITY': 'SOLVER_SET_MESH_INDUCED_WAKE_VELOCITY',
+    'SOLVER_SET_ADVERSE_GRADIENT_BOUNDARY_LAYER': 'SOLVER_SET_ADVERSE_GRADIENT_BOUNDARY_LAYER',
+}
+
+_SOLVER_SETTINGS_FIELDS = (
+    'ANGLE_OF_ATTACK', 'SIDESLIP_ANGLE', 'FREESTREAM_VELOCITY', 'ITERATIONS', 'CONVERGENCE_LIMIT',
+    'FORCED_RUN', 'REFERENCE_VELOCITY', 'REFERENCE_AREA', 'REFERENCE_LENGTH', 'PROCESSORS', 'WAKE_SIZE')
+
+# Commands between two initializations that leave the solver initialization as it was
+_KEEPS_INITIALIZATION = frozenset(_SETTING_FIELDS) | {'SOLVER_SETTINGS', 'START_SOLVER'}
+
+def _plain(command):
+    """
+    True if the block of a setting or solver command holds only the lines it writes. Other
+    lines are commands the parser did not recognise, so the command must be kept as it is.
+    """
+    allowed = _SOLVER_SETTINGS_FIELDS if command.name == 'SOLVER_SETTINGS' else ()
+    return all(text[0] == '#' or text.partition(' ')[0] in allowed for text in command.body)
+
+def _setting_keys(command):
+    """Settings written by a command, or None if it is not a setting command."""
+    name = command.name
+    if (name not in _SETTING_FIELDS and name != 'SOLVER_SETTINGS') or not _plain(command):
+        return None
+    if name == 'SOLVER_SETTINGS':
+        return [key for key in _SOLVER_SETTINGS_FIELDS if command.field(key) is not None]
+    return [_SETTING_FIELDS[name]]
+
+def _remove_duplicate_initializations(commands):
+    # An uninitialize + initialize pair that rebuilds the initialization in place
+    kept = []
+    removed = 0
+    active = None
+    for command in commands:
+        name = command.name
+        if (name == 'INITIALIZE_SOLVER' and active is not None and kept
+                and kept[-1].name == 'SOLVER_UNINITIALIZE' and _plain(kept[-1])
+                and command.body == active.body):
+            kept.pop()
+            removed += 2
+            continue
+        if name == 'INITIALIZE_SOLVER':
+            active = command
+        elif name is not None and name != 'SOLVER_UNINITIALIZE' and not name.startswith('EXPORT_') \
+                and (name not in _KEEPS_INITIALIZATION or not _plain(command)):
+            active = None
+        kept.append(command)
+    return kept, removed
+
+def _remove_dead_settings(commands):
+    # Backward scan: a setting is dead if every value it writes is written again before the
+    # next command that is not a setting
+    dead = set()
+    written = set()
+    for index in range(len(commands) - 1, -1, -1):
+        command = commands[index]
+        keys = _setting_keys(command)
+        if keys is None:
+            if command.name is not None:
+                written = set()
+            continue
+        if keys and written.issuperset(keys):
+            dead.add(index)
+        written.update(keys)
+    return [command for index, command in enumerate(commands) if index not in dead], len(dead)
+
+def _merge_settings(commands):
+    # Fold single-value settings that directly follow a SOLVER_SETTINGS block into it
+    kept = []
+    removed = 0
+    block = None
+    for command in commands:
+        name = command.name
+        key = _SETTING_FIELDS.get(name) if _plain(command) else None
+        if block is not None and key is not None:
+            for position, text in enumerate(block.body):
+                if text.partition(' ')[0] == key:
+                    block.body[position] = ' '.join([key] + command.args)
+                    removed += 1
+                    break
+            else:
+                kept.append(command)
+                block = None
+            continue
+        if name == 'SOLVER_SETTINGS' and _plain(command):
+            command = block = Command(name, list(command.args), list(command.body), command.comments, command.line)
+        elif name is not None:
+            block = None
+        kept.append(command)
+    return kept, removed
+
+def _output_path(command, table):
+    if command.name is None:
+        return None
+    rule = _lookup(table, [command.name] + command.args)
+    if rule is None:
+        return None
+    offset, prefix = rule
+    if offset > len(command.body) or not command.body[offset - 1].startswith(prefix):
+        return None
+    return os.path.normcase(os.path.normpath(command.body[offset - 1][len(prefix):].strip()))
+
+def _remove_overwritten_exports(commands):
+    # Backward scan: an export is dead if a later command writes the same file before any
+    # command reads it
+    dead = set()
+    overwritten = set()
+    for index in range(len(commands) - 1, -1, -1):
+        command = commands[index]
+        path = _output_path(command, OUTPUT_FILE_COMMANDS)
+        if path is not None:
+            if path in overwritten:
+                dead.add(index)
+            overwritten.add(path)
+            continue
+        path = _output_path(command, INPUT_FILE_COMMANDS)
+        if path is not None:
+            overwritten.discard(path)
+    return [command for index, command in enumerate(commands) if index not in dead], len(dead)
+
+_PASSES = {
+    'duplicate_initializations': _remove_duplicate_initializations,
+    'dead_settings': _remove_dead_settings,
+    'merge_settings': _merge_settings,
+    'overwritten_exports': _remove_overwritten_exports,
+}
+
+def optimize_lines(lines, passes=OPTIMIZER_PASSES):
+    """
+    Remove redundant commands from script lines.
+
+    The passes, run in the order of OPTIMIZER_PASSES:
+
+    - duplicate_initializations: SOLVER_UNINITIALIZE directly followed by an INITIALIZE_SOLVER
+      identical to the active initialization, when only settings, START_SOLVER and exports
+      ran since that initialization.
+    - dead_settings: solver settings (aoa, velocity, solver_settings, ...) whose values are
+      all set again before the next command that is not a setting.
+    - merge_settings: single-value settings directly following a SOLVER_SETTINGS block are
+      written into the block.
+    - overwritten_exports: exports whose file is written again later in the script before
+      any command reads it.
+
+    Blank lines are dropped, comments are kept with their command. A setting whose block holds
+    lines it does not write, such as a command the parser did not recognise, is never removed
+    or merged and stops the passes like any other command.
+
+    :param lines: List of script lines, as in State.lines.
+    :param passes: Names of the passes to run. Defaults to all of OPTIMIZER_PASSES.
+
+    Returns:
+        tuple: The optimized lines and a dict of the number of commands each pass removed.
+
+    Example usage:
+    lines, removed = optimize_lines(pyfs.current_script().lines)
+    """
+    for name in passes:
+        if name not in _PASSES:
+            raise ValueError(f"Unknown optimizer pass `{name}`; should be one of {list(OPTIMIZER_PASSES)}.")
+
+    commands = parse_script('\n'.join(lines).split('\n'))
+    removed = {}
+    for name in OPTIMIZER_PASSES:
+        if name in passes:
+            commands, removed[name] = _PASSES[name](commands)
+
+    optimized = []
+    for command in commands:
+        optimized.extend(command.lines())
+    return optimized, removed
+
+def optimize_script(state=None, passes=OPTIMIZER_PASSES):
+    """
+    Optimize the lines of a script in place (see optimize_lines).
+
+    :param state: State to optimize. Defaults to None, the current script.
+    :param passes: Names of the passes to run. Defaults to all of OPTIMIZER_PASSES.
+
+    Returns:
+        dict: Number of commands each pass removed.
+
+    Example usage:
+    for aoa in range(-5, 16):
+        pyfs.aoa(aoa)
+        pyfs.start_solver()
+    optimize_script()
+    pyfs.write_to_file('script_out.txt')
+    """
+    if state is None:
+        state = current_script()
+    if state.streaming:
+        raise ValueError("A streamed script cannot be optimized; optimize before calling `stream_to_file`.")
+    state.lines, removed = optimize_lines(state.lines, passes)
+    state.line_count = len(state.lines)
+    return removed
@@ -0,0 +1,365 @@
+from .script import current_script
+
+# First keyword of every command pyFlightscript writes, plus CHANGE_SCENE_TO_<scene>;
+# `python -m pyFlightscript.parse` lists emitted keywords missing from it
+SCRIPT_COMMANDS = frozenset('''
+    ACOUSTIC_OBSERVERS_IMPORT ACOUSTIC_SOURCES AIR_ALTITUDE AUTO_DETECT_BASE_REGIONS
+    BOOLEAN_UNITE_GEOMETRY BOOLEAN_UNITE_MESH BOOLEAN_UNITE_PATH CAD_CREATE_AUTO_CROSS_SECTIONS
+    CAD_CREATE_CROSS_SECTION CAD_CREATE_CURVE_ARC CAD_CREATE_CURVE_DELETE_ALL
+    CAD_CREATE_CURVE_DELETE_SELECTED CAD_CREATE_CURVE_DELETE_UNSELECTED CAD_CREATE_CURVE_EXPORT_CCS
+    CAD_CREATE_CURVE_POINT CAD_CREATE_CURVE_REVERSE CAD_CREATE_CURVE_SELECT CAD_CREATE_CURVE_UNSELECT
+    CAD_CREATE_IMPORT_CURVE_CCS CAD_CREATE_IMPORT_CURVE_TXT CAD_CREATE_INITIALIZE CAD_CREATE_NEW_MODEL
+    CCS_IMPORT CHANGE_SCENE_TO_CAD CHANGE_SCENE_TO_GEOMETRY CHANGE_SCENE_TO_PLOTS CHANGE_SCENE_TO_SOLVER
+    CLEAR_LOG CLOSE_FLIGHTSTREAM COMPUTE_ACOUSTIC_SIGNALS COMPUTE_STABILITY_COEFFICIENTS
+    COMPUTE_SURFACE_SECTIONAL_LOADS CONVERT_CAD_TO_MESH CREATE_ACOUSTIC_SECTION CREATE_NEW_6DOF_CUSTOM_FORCE
+    CREATE_NEW_6DOF_EXTERNAL_FORCE CREATE_NEW_6DOF_SPRING_FORCE CREATE_NEW_ACOUSTIC_OBSERVER
+    CREATE_NEW_ACTUATOR CREATE_NEW_BASE_REGION CREATE_NEW_CIRCLE_VOLUME_SECTION CREATE_NEW_COORDINATE_SYSTEM
+    CREATE_NEW_INLET CREATE_NEW_MOTION_6DOF CREATE_NEW_MOTION_CUSTOM CREATE_NEW_MOTION_EUCLIDEAN
+    CREATE_NEW_MOTION_FSI CREATE_NEW_RECTANGLE_VOLUME_SECTION CREATE_NEW_SURFACE_FROM_SELECTION
+    CREATE_NEW_SURFACE_SECTION DELETE_6DOF_EXTERNAL_FORCE DELETE_ACOUSTIC_OBSERVER DELETE_ACTUATOR
+    DELETE_ALL_ACOUSTIC_OBSERVERS DELETE_ALL_OFF_BODY_STREAMLINES DELETE_ALL_SURFACE_SECTIONS
+    DELETE_ALL_SURFACE_STREAMLINES DELETE_ALL_VOLUME_SECTIONS DELETE_AXIAL_SEPARATION_BOUNDARIES
+    DELETE_BASE_REGION DELETE_COORDINATE_SYSTEM DELETE_CROSSFLOW_SEPARATION_BOUNDARIES DELETE_INLET
+    DELETE_MOTION DELETE_PROBE_POINTS DELETE_SELECTED_FACES DELETE_SURFACE_SECTION DELETE_TRANSITION_TRIP
+    DELETE_VISCOUS_EXCLUDED_BOUNDARIES DELETE_VOLUME_SECTION DELETE_VORTICITY_DRAG_BOUNDARIES
+    DETECT_BASE_REGIONS_BY_SURFACE DETECT_TRAILING_EDGES_BY_SURFACE DETECT_WAKE_TERMINATION_NODES_BY_SURFACE
+    DISABLE_ACTUATOR DUPLICATE_COORDINATE_SYSTEM EDIT_ACTUATOR EDIT_COORDINATE_SYSTEM ENABLE_ACTUATOR
+    EXECUTE_SOLVER_SWEEPER EXPORT_6DOF_TRAJECTORY EXPORT_ACOUSTIC_SIGNALS EXPORT_ALL_OFF_BODY_STREAMLINES
+    EXPORT_ALL_SURFACE_SECTIONS EXPORT_ALL_SURFACE_STREAMLINES EXPORT_LOG EXPORT_PROBE_POINTS
+    EXPORT_SOLVER_ANALYSIS_CSV EXPORT_SOLVER_ANALYSIS_FORCE_DISTRIBUTIONS EXPORT_SOLVER_ANALYSIS_PLOAD_BDF
+    EXPORT_SOLVER_ANALYSIS_SPREADSHEET EXPORT_SOLVER_ANALYSIS_TECPLOT EXPORT_SOLVER_ANALYSIS_VTK
+    EXPORT_SURFACE_MESH EXPORT_SURFACE_SECTIONAL_LOADS EXPORT_VOLUME_SECTION_2D_VTK
+    EXPORT_VOLUME_SECTION_TECPLOT EXPORT_VOLUME_SECTION_VTK FLUID_PROPERTIES GENERATE_ALL_OFF_BODY_STREAMLINES
+    GENERATE_ALL_SURFACE_STREAMLINES IMPORT IMPORT_CAD INITIALIZE_SOLVER MIRROR_COORDINATE_SYSTEM
+    NEW_OFF_BODY_STREAMLINE NEW_OFF_BODY_STREAMTUBE NEW_PROBE_LINE NEW_PROBE_POINT NEW_SIMULATION
+    NEW_STREAMLINE_DISTRIBUTION NEW_SURFACE_SECTION_DISTRIBUTION NORMALIZE_COORDINATE_SYSTEM OPEN PHYSICS
+    PRINT PROBE_POINTS_IMPORT REMESH_INLET ROTATE_COORDINATE_SYSTEM SAVEAS SAVE_PLOT_TO_FILE
+    SAVE_SCENE_AS_IMAGE SELECT_GEOMETRY_BY_ID SET_3DOF_MOTION SET_ACOUSTIC_OBSERVER_TIME SET_ACTUATOR_EXHAUST
+    SET_ALL_OFF_BODY_STREAMLINES_DOWNSTREAM SET_ALL_OFF_BODY_STREAMLINES_UPSTREAM SET_ANALYSIS_MOMENTS_MODEL
+    SET_ANALYSIS_SYMMETRY_LOADS SET_AXIAL_SEPARATION_BOUNDARIES SET_BASE_REGION_BENDING_ANGLE
+    SET_BASE_REGION_TRAILING_EDGES SET_BOUNDARY_LAYER_TYPE SET_COORDINATE_SYSTEM_AXIS
+    SET_COORDINATE_SYSTEM_NAME SET_COORDINATE_SYSTEM_ORIGIN SET_CROSSFLOW_SEPARATION_BOUNDARIES
+    SET_CROSSFLOW_SEPARATION_CP SET_FREESTREAM SET_INLET_CUSTOM_PROFILE SET_INVISCID_LOADS
+    SET_LOADS_AND_MOMENTS_UNITS SET_MAX_PARALLEL_THREADS SET_MOTION_6DOF_ACTIVE_VARIABLES
+    SET_MOTION_6DOF_INITIAL_ANGULAR_VELOCITY SET_MOTION_6DOF_INITIAL_VELOCITY SET_MOTION_ACCELERATION
+    SET_MOTION_ANGULAR_ACCELERATION SET_MOTION_ANGULAR_VELOCITY SET_MOTION_BOUNDARIES
+    SET_MOTION_COORDINATE_SYSTEM SET_MOTION_CUSTOM_TABLE SET_MOTION_FSI_EXECUTABLE
+    SET_MOTION_FSI_STRUCTURAL_NODES SET_MOTION_GRAVITY SET_MOTION_IS_ROTOR SET_MOTION_MASS_PROPERTIES
+    SET_MOTION_MOVING_FRAMES SET_MOTION_START_TIME SET_MOTION_VELOCITY SET_OFF_BODY_STREAMLINE_LENGTH
+    SET_PLOT_TYPE SET_PROP_ACTUATOR_PROFILE SET_PROP_ACTUATOR_RPM SET_PROP_ACTUATOR_SWIRL
+    SET_PROP_ACTUATOR_THRUST SET_SCENE_COLORMAP_CUSTOM_MODE SET_SCENE_COLORMAP_POSITION
+    SET_SCENE_COLORMAP_SHADING SET_SCENE_COLORMAP_SIZE SET_SCENE_COLORMAP_TYPE SET_SCENE_CONTOUR
+    SET_SCENE_DEFAULTVIEW SET_SCENE_XY_NEGATIVE SET_SCENE_XY_POSITIVE SET_SCENE_XZ_NEGATIVE
+    SET_SCENE_XZ_POSITIVE SET_SCENE_YZ_NEGATIVE SET_SCENE_YZ_POSITIVE
+    SET_SIGNIFICANT_DIGITS SET_SIMULATION_LENGTH_UNITS SET_SOLVER_ANALYSIS_BOUNDARIES
+    SET_SOLVER_ANALYSIS_LOADS_FRAME SET_SOLVER_CONVERGENCE_ITERATIONS SET_SOLVER_MODEL SET_SOLVER_STEADY
+    SET_SOLVER_UNSTEADY SET_SOLVER_VISCOUS_COUPLING SET_SURFACE_ROUGHNESS SET_TRAILING_EDGE_BLUNTNESS_ANGLE
+    SET_TRAILING_EDGE_SWEEP_ANGLE SET_UNSTEADY_VISCOUS_COUPLING_ITERATION SET_VERTEX_MERGE_TOLERANCE
+    SET_VISCOUS_EXCLUDED_BOUNDARIES SET_VORTICITY_DRAG_BOUNDARIES SET_VORTICITY_LIFT_MODEL
+    SET_VTK_EXPORT_VARIABLES SET_WAKE_RELAXATION SET_WAKE_STREAMWISE_AGGLOMERATION
+    SET_WAKE_TERMINATION_TIME_STEPS SOLVER_CLEAR SOLVER_MINIMUM_CP SOLVER_PROXIMAL_BOUNDARIES SOLVER_SETTINGS
+    SOLVER_SET_ADVERSE_GRADIENT_BOUNDARY_LAYER SOLVER_SET_AOA SOLVER_SET_COMPRESSIBILITY SOLVER_SET_CONVERGENCE
+    SOLVER_SET_FARFIELD_LAYERS SOLVER_SET_FORCED_ITERATIONS SOLVER_SET_ITERATIONS SOLVER_SET_MACH_NUMBER
+    SOLVER_SET_MESH_INDUCED_WAKE_VELOCITY SOLVER_SET_REF_AREA SOLVER_SET_REF_LENGTH SOLVER_SET_REF_MACH_NUMBER
+    SOLVER_SET_REF_VELOCITY SOLVER_SET_SIDESLIP SOLVER_SET_VELOCITY SOLVER_UNINITIALIZE
+    SOLVER_UNSTEADY_PRESSURE_AND_KUTTA SOLVER_VORTEX_RING_NORMALIZATION STABILITY_TOOLBOX_DELETE_ALL
+    STABILITY_TOOLBOX_EXPORT STABILITY_TOOLBOX_NEW_COEFFICIENT STABILITY_TOOLBOX_SETTINGS START_SOLVER STOP
+    SURFACE_AUTO_HOLE_FILL SURFACE_CIRCULAR_PATTERN SURFACE_CLEARALL SURFACE_COMBINE SURFACE_COPY_PASTE
+    SURFACE_CUT_BY_PLANE SURFACE_DELETE SURFACE_INVERT SURFACE_MIRROR SURFACE_RENAME SURFACE_ROTATE
+    SURFACE_SCALE SURFACE_SELECT_BY_THRESHOLD TRAILING_EDGES_IMPORT TRANSLATE_COORDINATE_SYSTEM
+    TRANSLATE_SURFACE_BY_FRAME TRANSLATE_SURFACE_IN_FRAME UNSTEADY_SOLVER_ANIMATION
+    UNSTEADY_SOLVER_DELETE_ALL_PLOTS UNSTEADY_SOLVER_EXPORT_PLOTS UNSTEADY_SOLVER_NEW_FLUID_PLOT
+    UNSTEADY_SOLVER_NEW_FORCE_PLOT UPDATE_ALL_SURFACE_SECTIONS UPDATE_ALL_VOLUME_SECTIONS UPDATE_PROBE_POINTS
+    VIEW_RESIZE VOLUME_SECTION_BOUNDARY_LAYER VOLUME_SECTION_WIREFRAME WRAPPER_CREATE_LOCAL_CONTROL
+    WRAPPER_DELETE_ALL_LOCAL_CONTROLS WRAPPER_DELETE_ALL_VOLUME_CONTROLS WRAPPER_EDIT_LOCAL_CONTROL
+    WRAPPER_EXECUTE WRAPPER_NEW_VOLUME_CONTROL WRAPPER_SET_ANISOTROPY WRAPPER_SET_GLOBAL_SIZE WRAPPER_SET_INPUT
+    WRAPPER_SET_VERTEX_PROJECTION WRAPPER_TRANSFER
+'''.split())
+
+# Keywords that only appear on lines inside a command block (SURFACES 2, FRAME 1, ...)
+BLOCK_KEYWORDS = frozenset('''
+    ACTUATOR ADAPTIVE_MESH ANGLE ANGLE_OF_ATTACK ANGLE_OF_ATTACK_DELTA ANGLE_OF_ATTACK_START
+    ANGLE_OF_ATTACK_STOP APPEND_TO_EXISTING_SWEEP AUTO_TRAIL_EDGES AUTO_WAKE_NODES AXIS AZIMUTH_OBSERVERS
+    AZIMUTH_SUBDIVISIONS BODIES BOUNDARIES CLEAR CLEAR_EXISTING CLEAR_SOLUTION_AFTER_EACH_RUN
+    CLOSE_COMPONENT_ENDS COLORMAP CONSTANT CONVERGENCE_LIMIT CUSTOM_RANGE CUT_OFF_MODE DELTA_TIME DENOMINATOR
+    DENSITY DETACH_NORMAL_TO_AXIS DISABLE ELEMENTS ENABLE EXPORT_SURFACE_DATA_PER_STEP FAST_MULTIPOLE FILE
+    FILETYPE FILE_TYPE FOLDER FORCED_RUN FORMAT FRAME FREESTREAM_VELOCITY FREQUENCY GROWTH_RATE GROWTH_SCHEME
+    HEIGHT INLET INNER_RADIUS ITERATIONS LOAD_FRAME LOAD_SOLVER_INITIALIZATION MAXIMUM MAX_VALUE MINIMUM
+    MIN_VALUE NAME NUMERATOR NUM_SECTIONS OFFSET OPENVSP_PATH ORIGIN_X ORIGIN_Y ORIGIN_Z OUTER_RADIUS
+    PARAMETER PLANE PLOT_DIRECTION POSITION_1_X POSITION_1_Y POSITION_1_Z POSITION_2_X POSITION_2_Y
+    POSITION_2_Z POSITION_X POSITION_Y POSITION_Z PRESSURE PROCESSORS PROXIMITY_AVOIDANCE RADIAL_OBSERVERS
+    RADIAL_SUBDIVISIONS RADIUS RANGE REFERENCE_AREA REFERENCE_LENGTH REFERENCE_VELOCITY
+    REFERENCE_VELOCITY_EQUALS_FREESTREAM RESET_PARALLEL_CORES REVERSE ROTATION_AXIS ROTATION_FRAME SET_LENGTH
+    SET_UNRESTRICTED_LENGTH SIDESLIP_ANGLE SIDE_SLIP_ANGLE SIDE_SLIP_ANGLE_DELTA SIDE_SLIP_ANGLE_START
+    SIDE_SLIP_ANGLE_STOP SMOOTH SONIC_VELOCITY SPLIT_VERTICES STABILIZATION STABILIZATION_STRENGTH
+    STORAGE_PATH SUBDIVISIONS SUBSET SURFACE SURFACES SWIRL_VELOCITY SYMMETRY_PERIODICITY SYMMETRY_TYPE
+    TARGET_SIZE TEMPERATURE THICKNESS THRESHOLD TIME_ITERATIONS TYPE UNITS UPDATE_PROPERTIES UPSTREAM
+    VARIABLE VECTOR_X_X VECTOR_X_Y VECTOR_X_Z VECTOR_Y_X VECTOR_Y_Y VECTOR_Y_Z VECTOR_Z_X VECTOR_Z_Y
+    VECTOR_Z_Z VELOCITY VELOCITY_DELTA VELOCITY_START VELOCITY_STOP VERTEX VERTEX_1 VERTEX_2 VISCOSITY
+    VOLUME_SECTIONS WAKE_SIZE WAKE_TERMINATION_X
+'''.split())
+
+class Command:
+    """
+    One command of a FlightStream script, as read back by parse_script.
+
+    Attributes:
+        name (str): Command keyword, e.g. 'INITIALIZE_SOLVER'. None for comments or data
+            that do not belong to any command (e.g. comments at the end of the script).
+        args (list of str): Tokens following the keyword on the command line.
+        body (list of str): Lines of the command block after the command line, stripped.
+        comments (list of str): Comment lines directly above the command (its banner).
+        line (int): 1-based line number of the command line in the source.
+    """
+    __slots__ = ('name', 'args', 'body', 'comments', 'line')
+
+    def __init__(self, name, args=None, body=None, comments=None, line=None):
+        self.name = name
+        self.args = [] if args is None else args
+        self.body = [] if body is None else body
+        self.comments = [] if comments is None else comments
+        self.line = line
+
+    def field(self, keyword, default=None):
+        """
+        Value of the first 'KEYWORD value' line of the block, e.g. field('LOAD_FRAME') -> '1'.
+        """
+        for text in self.body:
+            key, _, value = text.partition(' ')
+            if key == keyword:
+                return value.strip()
+        return default
+
+    def table(self, keyword=None):
+        """
+        Rows of a counted list, split on commas and whitespace.
+
+        With a keyword, the list follows a 'KEYWORD n' block line (SURFACES 2 in
+        INITIALIZE_SOLVER); without, it follows the command line. A list of n entries is
+        either n rows, one per entry, or a single row holding all of them. -1 (all) gives
+        no rows.
+
+        Example usage:
+        command.table('SURFACES')  # [['1', '0', 'ENABLE'], ['2', '0', 'DISABLE']]
+        """
+        start = 0
+        count = None
+        if keyword is None:
+            for token in reversed(self.args):
+                if token.lstrip('-').isdigit():
+                    count = int(token)
+                    break
+        else:
+            for start, text in enumerate(self.body, 1):
+                key, _, value = text.partition(' ')
+                if key == keyword:
+                    value = value.strip()
+                    count = int(value) if value.lstrip('-').isdigit() else None
+                    break
+            else:
+                return []
+        if not count or count < 0:
+            return []
+
+        rows = []
+        for text in self.body[start:]:
+            if len(rows) == count:
+                break
+            if text[0] != '#':
+                rows.append(text.replace(',', ' ').split())
+        first = rows[0] if rows else []
+        if count > 1 and len(first) == count and all(token.lstrip('-').isdigit() for token in first):
+            return [first]
+        return rows
+
+    def lines(self, comments=True):
+        """
+        Script lines of the command: its banner, the command line and the block.
+        """
+        lines = list(self.comments) if comments else []
+        if self.name is not None:
+            lines.append(' '.join([self.name] + self.args))
+        lines.extend(self.body)
+        return lines
+
+    def emit(self, state=None, comments=True):
+        """
+        Append the command to a State, by default the current script.
+        """
+        (current_script() if state is None else state).append_lines(self.lines(comments))
+        return
+
+    def __eq__(self, other):
+        if not isinstance(other, Command):
+            return NotImplemented
+        return (self.name, self.args, self.body) == (other.name, other.args, other.body)
+
+    def __repr__(self):
+        return f"Command({self.name!r}, args={self.args!r}, body={self.body!r}, line={self.line!r})"
+
+def parse_script(lines):
+    """
+    Parse FlightStream script lines into Command objects in one pass.
+
+    A line starts a new command if its keyword is a known command (SCRIPT_COMMANDS), or if it
+    directly follows a comment and is not a known block keyword, which is how commands this
+    package does not know yet are picked up from pyFlightscript output. Every other line is
+    part of the block of the command above it: 'KEY value' lines, SURFACES n tables and
+    their rows, file paths. Blank lines are dropped; comment lines are kept as the banner of
+    the next command, or in the block if more block lines follow them.
+
+    :param lines: Iterable of script lines, with or without line endings.
+
+    Returns:
+        list of Command: The commands in script order.
+
+    Example usage:
+    commands = parse_script(template.render(aoa=5.0).splitlines())
+    """
+    commands = []
+    append = commands.append
+    known = SCRIPT_COMMANDS
+    block_keywords = BLOCK_KEYWORDS
+    comments = []
+    current = None
+    after_comment = True
+    line_number = 0
+    for line_number, line in enumerate(lines, 1):
+        text = line.rstrip('\r\n')
+        stripped = text.strip()
+        if not stripped:
+            continue
+        if stripped[0] == '#':
+            comments.append(text)
+            after_comment = True
+            continue
+
+        tokens = stripped.split()
+        keyword = tokens[0]
+        if keyword in known or (after_comment and keyword not in block_keywords
+                                and keyword.isupper() and keyword.replace('_', '').isalnum()):
+            current = Command(keyword, tokens[1:], [], comments, line_number)
+            append(current)
+            comments = []
+        else:
+            if current is None:
+                # Data before the first command
+                current = Command(None, line=line_number)
+                append(current)
+            if comments:
+                # Comments inside a block stay in place
+                current.body.extend(comments)
+                comments = []
+            current.body.append(stripped)
+        after_comment = False
+
+    if comments:
+        append(Command(None, comments=comments, line=line_number))
+    return commands
+
+def read_script(filename):
+    """
+    Read a FlightStream script file into Command objects (see parse_script).
+
+    :param filename: Path of the script file.
+
+    Returns:
+        list of Command: The commands in script order.
+
+    Example usage:
+    for command in read_script('legacy_case.txt'):
+        if command.name == 'INITIALIZE_SOLVER':
+            print(command.field('LOAD_FRAME'), command.table('SURFACES'))
+    """
+    with open(filename, 'r') as file:
+        return parse_script(file)
+
+def emit_commands(commands, state=None, comments=True):
+    """
+    Append parsed commands to a State, by default the current script.
+
+    :param commands: Iterable of Command objects.
+    :param state: State to append to. Defaults to None, the current script.
+    :param comments: Also emit the comment banners. Defaults to True.
+    """
+    if state is None:
+        state = current_script()
+    lines = []
+    for command in commands:
+        lines.extend(command.lines(comments))
+    state.append_lines(lines)
+    return
+
+def _emitted_keywords():
+    # (keyword, 'module:function') of the command line written after the banner of every
+    # command in the package source, found by reading the source rather than running it
+    import ast
+    import os
+
+    def keywords(node, tables):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value.split()[:1]
+        if isinstance(node, ast.JoinedStr):
+            first = node.values[0]
+            if not isinstance(first, ast.Constant) or not first.value.strip():
+                return []
+            token = first.value.split()[0]
+            # 'CHANGE_SCENE_TO_{scene}': only the prefix is known
+            return [token + '*' if len(node.values) > 1 and first.value == token else token]
+        if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id in tables:
+            return [keyword for value in tables[node.value.id] for keyword in keywords(value, tables)]
+        return []
+
+    folder = os.path.dirname(os.path.abspath(__file__))
+    found = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith('.py'):
+            continue
+        with open(os.path.join(folder, filename), 'r') as file:
+            tree = ast.parse(file.read())
+        for function in ast.walk(tree):
+            if not isinstance(function, ast.FunctionDef):
+                continue
+            where = f"{filename[:-3]}:{function.name}"
+            # Dicts of command lines, e.g. the view commands of set_scene_view
+            tables = {node.targets[0].id: node.value.values for node in ast.walk(function)
+                      if isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                      and isinstance(node.targets[0], ast.Name)}
+            for node in ast.walk(function):
+                if not isinstance(node, ast.List):
+                    continue
+                banner = [i for i, item in enumerate(node.elts) if isinstance(item, ast.Constant) and item.value == '#']
+                if not banner:
+                    continue
+                if banner[-1] + 1 < len(node.elts):
+                    lines = [node.elts[banner[-1] + 1]]
+                else:
+                    # The command line is appended after the banner list
+                    lines = [call.args[0] for call in ast.walk(function)
+                             if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                             and call.func.attr == 'append' and len(call.args) == 1]
+                for line in lines:
+                    for keyword in keywords(line, tables):
+                        if keyword[:1].isalpha() and keyword.rstrip('*').isupper():
+                            found.append((keyword, where))
+    return found
+
+def _unlisted_keywords():
+    # Emitted keywords missing from SCRIPT_COMMANDS, which parse_script would fold into the
+    # body of the previous command in scripts without comment banners
+    unlisted = []
+    for keyword, where in _emitted_keywords():
+        if keyword.endswith('*'):
+            known = any(command.startswith(keyword[:-1]) for command in SCRIPT_COMMANDS)
+        else:
+            known = keyword in SCRIPT_COMMANDS
+        if not known:
+            unlisted.append((keyword, where))
+    return unlisted
+
+if __name__ == '__main__':
+    import sys
+    unlisted = _unlisted_keywords()
+    for keyword, where in unlisted:
+        print(f"{keyword} ({where}) is not in SCRIPT_COMMANDS")
+    sys.exit(1 if unlisted else 0)
@@ -0,0 +1,136 @@
+import io
+import re
+from .utils import *
+
+_DATA_START = b'0123456789+-.'
+_BLANK = b' \t'
+
+def _column_names(header, num_columns):
+    tokens = [token for token in re.split(r'[,;\s]+', header.strip()) if token]
+    if len(tokens) != num_columns:
+        return [f"col{i}" for i in range(num_columns)]
+    names = []
+    for token in tokens:
+        name = re.sub(r'\W', '_', token)
+        while name in names:
+            name += '_'
+        names.append(name)
+    return names
+
+def _classify_lines(np, data):
+    # Byte offset of every line start and of its first non-blank character
+    starts = np.concatenate(([0], np.flatnonzero(data == ord('\n')) + 1))
+    starts = starts[starts < data.size]
+    blank = np.frombuffer(_BLANK, np.uint8)
+    first = starts.copy()
+    # Only lines still on a blank character advance; a line running into the end of the data is blank
+    active = np.arange(first.size)
+    while active.size:
+        active = active[np.isin(data[first[active]], blank)]
+        first[active] += 1
+        active = active[first[active] < data.size]
+    chars = np.full(first.size, ord('\n'), dtype=np.uint8)
+    inside = first < data.size
+    chars[inside] = data[first[inside]]
+    is_data = np.isin(chars, np.frombuffer(_DATA_START, np.uint8))
+    is_blank = (chars == ord('\n')) | (chars == ord('\r')) | np.isin(chars, blank)
+    return starts, is_data, is_blank
+
+def _parse_block(np, data):
+    text = data.tobytes()
+    delimiter = ',' if b',' in text else None
+    return np.loadtxt(io.BytesIO(text), delimiter=delimiter, dtype=np.float64, ndmin=2)
+
+def read_sweep_blocks(filename, memory_map=None):
+    """
+    Read each data block of a solver sweeper results file.
+
+    A file written with APPEND_TO_EXISTING_SWEEP ENABLE holds one block per sweep, each
+    after its own header. Lines are classified with array operations and every block is
+    converted by one bulk np.loadtxt call instead of line by line.
+
+    :param filename: Path of the sweep results file.
+    :param memory_map: Memory-map the file instead of reading it. Defaults to None, which
+                       maps files larger than 64 MiB.
+
+    Returns:
+        list of (column names, 2D float array) tuples, one per block in file order.
+
+    Example usage:
+    for names, rows in read_sweep_blocks('C:/.../sweep_results/sweep.txt'):
+        print(names, rows.shape)
+    """
+    np = require_numpy()
+    check_file_existence(filename)
+
+    size = os.path.getsize(filename)
+    if size == 0:
+        return []
+    if memory_map is None:
+        memory_map = size > 64 * 1024 * 1024
+    if memory_map:
+        data = np.memmap(filename, dtype=np.uint8, mode='r')
+    else:
+        with open(filename, 'rb') as file:
+            data = np.frombuffer(file.read(), dtype=np.uint8)
+
+    starts, is_data, is_blank = _classify_lines(np, data)
+    ends = np.append(starts[1:], data.size)
+
+    # Data blocks are runs of data lines between title/header lines
+    blocks = []
+    header = ''
+    block_start = 0
+    for line in np.flatnonzero(~is_data & ~is_blank).tolist() + [starts.size]:
+        data_lines = np.flatnonzero(is_data[block_start:line])
+        if data_lines.size:
+            first, last = block_start + data_lines[0], block_start + data_lines[-1]
+            rows = _parse_block(np, data[starts[first]:ends[last]])
+            blocks.append((_column_names(header, rows.shape[1]), rows))
+        if line < starts.size:
+            header = data[starts[line]:ends[line]].tobytes().decode('ascii', errors='replace')
+        block_start = line + 1
+    return blocks
+
+def read_sweep_results(filename, as_dict=False, memory_map=None):
+    """
+    Read a solver sweeper results file (see execute_solver_sweeper) into NumPy.
+
+    The blocks of an appended sweep file are concatenated in file order, matching columns by
+    name; blocks with different columns raise a ValueError. Column names come
+    from the header line above the data; non-identifier characters are replaced by '_' and
+    columns are named col0, col1, ... when the header does not match the data.
+
+    :param filename: Path of the sweep results file.
+    :param as_dict: Return a dict of column arrays instead of a structured array. Defaults to False.
+    :param memory_map: Memory-map the file instead of reading it. Defaults to None, which
+                       maps files larger than 64 MiB.
+
+    Returns:
+        numpy structured array with one float field per column, or dict of column name to array.
+
+    Example usage:
+    sweep = read_sweep_results('C:/.../sweep_results/sweep.txt')
+    cl_max = sweep['CL'].max()
+    """
+    np = require_numpy()
+    blocks = read_sweep_blocks(filename, memory_map=memory_map)
+    if not blocks:
+        return {} if as_dict else np.zeros(0, dtype=[])
+
+    names = blocks[0][0]
+    parts = [blocks[0][1]]
+    for block_names, rows in blocks[1:]:
+        if block_names != names:
+            if sorted(block_names) != sorted(names) or len(set(names)) != len(names):
+                raise ValueError(f"Sweep blocks in '{filename}' have different columns: "
+                                 f"{names} and {block_names}.")
+            # Same columns in another order
+            rows = rows[:, [block_names.index(name) for name in names]]
+        parts.append(rows)
+    rows = np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    if as_dict:
+        return {name: rows[:, i] for i, name in enumerate(names)}
+    dtype = np.dtype([(name, np.float64) for name in names])
+    return np.ascontiguousarray(rows).view(dtype).reshape(-1)
@@ -0,0 +1,457 @@
+import asyncio
+import inspect
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_PROCESSORS_PATTERN = re.compile(r'^\s*(?:PROCESSORS|SET_MAX_PARALLEL_THREADS)\s+(\d+)\s*$')
+
+class RunResult:
+    """
+    Outcome of one FlightStream script run.
+
+    Attributes:
+        script_path (str): Path of the script that was run.
+        returncode (int): Exit code of the FlightStream process.
+        wall_time (float): Wall-clock run time in seconds.
+        stdout_path (str): File holding the captured standard output, or None if not saved.
+        stderr_path (str): File holding the captured standard error, or None if not saved.
+        processors (int): Number of cores reserved for the run.
+        killed (str): Why a Watchdog killed the run, or None.
+    """
+    def __init__(self, script_path, returncode, wall_time, stdout_path, stderr_path, processors, killed=None):
+        self.script_path = script_path
+        self.returncode = returncode
+        self.wall_time = wall_time
+        self.stdout_path = stdout_path
+        self.stderr_path = stderr_path
+        self.processors = processors
+        self.killed = killed
+
+    @property
+    def ok(self):
+        """
+        True if the process exited with code 0.
+        """
+        return self.returncode == 0
+
+    def __repr__(self):
+        killed = f", killed={self.killed!r}" if self.killed is not None else ''
+        return (f"RunResult(script_path={self.script_path!r}, returncode={self.returncode}, "
+                f"wall_time={self.wall_time:.3f}, processors={self.processors}{killed})")
+
+def resolve_fsexe_path(fsexe_path=None):
+    """
+    Return the FlightStream executable to launch, falling back to the FS_EXE environment variable.
+
+    :param fsexe_path: Path to the FlightStream executable, or a list holding a full command
+                       prefix (e.g. an interpreter and a stand-in script). Defaults to None.
+
+    Raises:
+        ValueError: If neither fsexe_path argument nor FS_EXE environment variable is set.
+    """
+    if fsexe_path is None:
+        fsexe_path = os.environ.get('FS_EXE')
+        if fsexe_path is None:
+            raise ValueError("Neither fsexe_path argument nor FS_EXE environment variable is set.")
+    return fsexe_path
+
+def build_command(fsexe_path, script_path, hidden=False):
+    """
+    Build the command line that runs a script in FlightStream.
+
+    :param fsexe_path: Path to the FlightStream executable, or a list holding a command prefix.
+    :param script_path: Path to the script file.
+    :param hidden: Run FlightStream without its GUI. Defaults to False.
+    """
+    if isinstance(fsexe_path, (list, tuple)):
+        command = list(fsexe_path)
+    else:
+        command = [fsexe_path]
+    if hidden:
+        command.append('-hidden')
+    command.extend(['-script', script_path])
+    return command
+
+def script_processors(script_path, default=1):
+    """
+    Return the number of solver cores a script requests.
+
+    The last PROCESSORS line (from solver_settings) or SET_MAX_PARALLEL_THREADS command in the
+    script wins, as it does in FlightStream.
+
+    :param script_path: Path to the script file.
+    :param default: Value returned when the script does not set the core count. Defaults to 1.
+    """
+    processors = default
+    with open(script_path, 'r') as file:
+        for line in file:
+            match = _PROCESSORS_PATTERN.match(line)
+            if match:
+                processors = int(match.group(1))
+    return processors
+
+class _CoreBudget:
+    # Counting semaphore where each run takes as many units as it has cores
+    def __init__(self, total):
+        self.total = total
+        self.free = total
+        self._condition = threading.Condition()
+
+    def acquire(self, count):
+        with self._condition:
+            self._condition.wait_for(lambda: self.free >= count)
+            self.free -= count
+
+    def release(self, count):
+        with self._condition:
+            self.free += count
+            self._condition.notify_all()
+
+def _run_one(command, script_path, stdout_path, stderr_path, processors, budget, on_result=None,
+             watchdog=None, log_path=None):
+    watched = []
+    if watchdog is not None:
+        # Read before launching, so that a failure here cannot leave a process behind
+        from .cache import script_file_references
+        _, outputs, folders = script_file_references(script_path)
+        watched = outputs + folders
+    budget.acquire(processors)
+    killed = None
+    try:
+        start = time.perf_counter()
+        with open(stdout_path, 'w') as stdout, open(stderr_path, 'w') as stderr:
+            try:
+                process = subprocess.Popen(command, stdout=stdout, stderr=stderr)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"The file {command[0]} was not found.")
+            try:
+                if watchdog is not None:
+                    killed = watchdog.watch(process, stdout_path, log_path, watched)
+                returncode = process.wait()
+            except BaseException:
+                # Never leave an unwatched FlightStream process holding its license and cores
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+                raise
+        wall_time = time.perf_counter() - start
+    finally:
+        budget.release(processors)
+    result = RunResult(script_path, returncode, wall_time, stdout_path, stderr_path, processors, killed)
+    if on_result is not None:
+        on_result(result)
+    return result
+
+def _output_paths(script_paths, output_dir):
+    # (stdout, stderr) file of every script; names shared by several scripts get their list index
+    stems = []
+    for script_path in script_paths:
+        folder = output_dir if output_dir is not None else os.path.dirname(os.path.abspath(script_path))
+        stems.append(os.path.join(folder, os.path.splitext(os.path.basename(script_path))[0]))
+    keys = [os.path.normcase(os.path.abspath(stem)) for stem in stems]
+    paths = []
+    for index, stem in enumerate(stems):
+        if keys.count(keys[index]) > 1:
+            stem = f'{stem}_{index}'
+        paths.append((stem + '.stdout.txt', stem + '.stderr.txt'))
+    return paths
+
+def run_scripts_parallel(script_paths, fsexe_path=None, hidden=True, max_instances=None,
+                         max_cores=None, output_dir=None, default_processors=1, on_result=None,
+                         watchdog=None, log_paths=None):
+    """
+    Run several FlightStream scripts at once with a bounded pool of FlightStream instances.
+
+    A case only starts once enough cores are free for the processor count its script sets
+    (see script_processors), so concurrent runs never oversubscribe 'max_cores'. Standard
+    output and error of each run are written to '<script name>.stdout.txt' and
+    '<script name>.stderr.txt', or '<script name>_<index>.stdout.txt' and
+    '<script name>_<index>.stderr.txt' when several scripts would share the same file.
+    Every script path is checked before any run starts.
+
+    :param script_paths: List of script file paths.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param max_instances: Maximum number of concurrent FlightStream processes. Defaults to the
+                          number of scripts.
+    :param max_cores: Total cores shared by the runs. Defaults to os.cpu_count().
+    :param output_dir: Folder for the stdout/stderr files. Defaults to each script's folder.
+    :param default_processors: Cores assumed for scripts that do not set them. Defaults to 1.
+    :param on_result: Callable called with each RunResult as soon as its run finishes, from
+                      the thread that waited for it. Defaults to None.
+    :param watchdog: Watchdog killing diverging, stalled or overlong runs. Defaults to None.
+    :param log_paths: Log files the scripts export while running, watched by 'watchdog' along
+                      with the standard output: a list with one path or None per script, or a
+                      callable taking a script path and returning its log path or None.
+                      Defaults to None.
+
+    Returns:
+        list of RunResult, in the order of 'script_paths'.
+
+    Example usage:
+    results = run_scripts_parallel(['case1.txt', 'case2.txt'], max_instances=4, max_cores=64)
+    results = run_scripts_parallel(scripts, watchdog=Watchdog(residual_growth=1e4),
+                                   log_paths=lambda path: path.replace('.txt', '_log.txt'))
+    """
+    fsexe_path = resolve_fsexe_path(fsexe_path)
+    script_paths = list(script_paths)
+    if not script_paths:
+        return []
+    # Every script is checked before the first run starts
+    for script_path in script_paths:
+        if not os.path.exists(script_path):
+            raise FileNotFoundError(f"The specified file '{script_path}' does not exist on path.")
+
+    if max_instances is None:
+        max_instances = len(script_paths)
+    if not isinstance(max_instances, int) or max_instances <= 0:
+        raise ValueError("`max_instances` should be an integer value greater than 0.")
+
+    if max_cores is None:
+        max_cores = os.cpu_count() or 1
+    if not isinstance(max_cores, int) or max_cores <= 0:
+        raise ValueError("`max_cores` should be an integer value greater than 0.")
+
+    if log_paths is None:
+        log_paths = [None] * len(script_paths)
+    elif callable(log_paths):
+        log_paths = [log_paths(script_path) for script_path in script_paths]
+    else:
+        log_paths = list(log_paths)
+        if len(log_paths) != len(script_paths):
+            raise ValueError("`log_paths` should hold one path or None per script.")
+
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # A script asking for more cores than exist gets the whole machine
+    processors = [min(script_processors(script_path, default_processors), max_cores) for script_path in script_paths]
+    outputs = _output_paths(script_paths, output_dir)
+
+    budget = _CoreBudget(max_cores)
+    with ThreadPoolExecutor(max_workers=max_instances) as pool:
+        futures = []
+        for script_path, count, (stdout_path, stderr_path), log_path in zip(script_paths, processors,
+                                                                            outputs, log_paths):
+            command = build_command(fsexe_path, script_path, hidden)
+            futures.append(pool.submit(_run_one, command, script_path, stdout_path, stderr_path,
+                                       count, budget, on_result, watchdog, log_path))
+        return [future.result() for future in futures]
+
+class ScriptProcess:
+    """
+    Handle on a FlightStream script running under asyncio, as returned by start_script_async.
+
+    Standard output is read line by line as FlightStream prints it, either by iterating
+    iter_lines() or through the 'on_line' callback of wait(). Use one or the other: the
+    output stream has a single reader. Standard error is drained in the background and is
+    available in the 'stderr' attribute once the process has exited.
+    """
+    def __init__(self, process, script_path, processors=1, stdout_path=None, stderr_path=None):
+        self.process = process
+        self.script_path = script_path
+        self.processors = processors
+        self.stdout_path = stdout_path
+        self.stderr_path = stderr_path
+        self.stderr = ''
+        self._start = time.perf_counter()
+        self._stdout_file = open(stdout_path, 'w') if stdout_path is not None else None
+        self._stderr_task = asyncio.ensure_future(self._drain_stderr())
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    @property
+    def returncode(self):
+        return self.process.returncode
+
+    async def _drain_stderr(self):
+        data = await self.process.stderr.read()
+        self.stderr = data.decode(errors='replace')
+        if self.stderr_path is not None:
+            with open(self.stderr_path, 'w') as file:
+                file.write(self.stderr)
+
+    def _close_stdout(self):
+        if self._stdout_file is not None:
+            self._stdout_file.close()
+            self._stdout_file = None
+
+    def __del__(self):
+        if getattr(self, '_stdout_file', None) is not None:
+            self._close_stdout()
+
+    async def iter_lines(self):
+        """
+        Asynchronously yield the lines FlightStream writes to standard output.
+
+        The stdout file, if any, is closed once the output ends.
+        """
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                self._close_stdout()
+                break
+            text = line.decode(errors='replace').rstrip('\r\n')
+            if self._stdout_file is not None:
+                self._stdout_file.write(text + '\n')
+            yield text
+
+    async def _finish(self, on_line):
+        async for line in self.iter_lines():
+            if on_line is not None:
+                result = on_line(line)
+                if inspect.isawaitable(result):
+                    await result
+        await self._stderr_task
+        return await self.process.wait()
+
+    async def wait(self, timeout=None, on_line=None):
+        """
+        Wait for the run to finish and return its RunResult.
+
+        If the timeout expires or the waiting task is cancelled, the FlightStream process is
+        killed before the exception propagates, so a stuck run never outlives its caller.
+
+        :param timeout: Maximum time in seconds to wait. Defaults to None (no limit).
+        :param on_line: Callable (plain or async) called with each remaining stdout line.
+
+        Raises:
+            asyncio.TimeoutError: If the run did not finish within 'timeout'.
+        """
+        try:
+            returncode = await asyncio.wait_for(self._finish(on_line), timeout)
+        except BaseException:
+            await self.kill()
+            raise
+        finally:
+            self._close_stdout()
+        wall_time = time.perf_counter() - self._start
+        return RunResult(self.script_path, returncode, wall_time, self.stdout_path,
+                         self.stderr_path, self.processors)
+
+    async def kill(self):
+        """
+        Kill the FlightStream process, if still running, and reap it.
+        """
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+            await self.process.wait()
+        if not self._stderr_task.done():
+            self._stderr_task.cancel()
+
+async def start_script_async(script_path, fsexe_path=None, hidden=True, stdout_path=None,
+                             stderr_path=None):
+    """
+    Launch a FlightStream script from an asyncio event loop without blocking it.
+
+    :param script_path: Path to the script file.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param stdout_path: File the stdout lines are also written to. Defaults to None.
+    :param stderr_path: File the stderr output is written to. Defaults to None.
+
+    Returns:
+        ScriptProcess: Handle used to stream output, wait for, or kill the run.
+
+    Example usage:
+    run = await start_script_async('case1.txt')
+    async for line in run.iter_lines():
+        print(line)
+    result = await run.wait()
+    """
+    fsexe_path = resolve_fsexe_path(fsexe_path)
+    if not os.path.exists(script_path):
+        raise FileNotFoundError(f"The specified file '{script_path}' does not exist on path.")
+
+    command = build_command(fsexe_path, script_path, hidden)
+    try:
+        process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.PIPE)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"The file {command[0]} was not found.")
+    try:
+        return ScriptProcess(process, script_path, script_processors(script_path),
+                             stdout_path, stderr_path)
+    except BaseException:
+        process.kill()
+        await process.wait()
+        raise
+
+async def run_script_async(script_path, fsexe_path=None, hidden=True, timeout=None, on_line=None,
+                           stdout_path=None, stderr_path=None):
+    """
+    Asynchronous counterpart of execute_fsm_script: run one script and await its RunResult.
+
+    :param script_path: Path to the script file.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param timeout: Seconds after which the run is killed and asyncio.TimeoutError raised.
+    :param on_line: Callable (plain or async) called with each stdout line as it is printed.
+    :param stdout_path: File the stdout lines are also written to. Defaults to None.
+    :param stderr_path: File the stderr output is written to. Defaults to None.
+
+    Example usage:
+    result = await run_script_async('case1.txt', timeout=3600, on_line=print)
+    """
+    run = await start_script_async(script_path, fsexe_path, hidden, stdout_path, stderr_path)
+    return await run.wait(timeout=timeout, on_line=on_line)
+
+async def run_scripts_async(script_paths, fsexe_path=None, hidden=True, max_instances=None,
+                            timeout=None, output_dir=None):
+    """
+    Run many scripts from one event loop, at most 'max_instances' at a time.
+
+    A run that times out is killed and its entry in the returned list is the
+    asyncio.TimeoutError instead of a RunResult; a run that fails in any other way has the
+    exception as its entry. Either way the other runs carry on. Cancelling the call kills
+    every run still going.
+
+    :param script_paths: List of script file paths.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param max_instances: Maximum number of concurrent FlightStream processes. Defaults to no limit.
+    :param timeout: Per-run timeout in seconds. Defaults to None (no limit).
+    :param output_dir: Folder for '<script name>.stdout.txt'/'.stderr.txt' files, named as in
+                       run_scripts_parallel. Defaults to None (output is not saved).
+
+    Returns:
+        list of RunResult or exception, in the order of 'script_paths'.
+    """
+    script_paths = list(script_paths)
+    for script_path in script_paths:
+        if not os.path.exists(script_path):
+            raise FileNotFoundError(f"The specified file '{script_path}' does not exist on path.")
+    if max_instances is None:
+        max_instances = max(len(script_paths), 1)
+    if not isinstance(max_instances, int) or max_instances <= 0:
+        raise ValueError("`max_instances` should be an integer value greater than 0.")
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+
+    semaphore = asyncio.Semaphore(max_instances)
+
+    if output_dir is not None:
+        outputs = _output_paths(script_paths, output_dir)
+    else:
+        outputs = [(None, None)] * len(script_paths)
+
+    async def run_one(script_path, stdout_path, stderr_path):
+        async with semaphore:
+            try:
+                return await run_script_async(script_path, fsexe_path, hidden, timeout,
+                                              stdout_path=stdout_path, stderr_path=stderr_path)
+            except Exception as error:
+                # A failed run is killed by wait() and reported in place of its result
+                return error
+
+    return await asyncio.gather(*(run_one(script_path, stdout_path, stderr_path)
+                                  for script_path, (stdout_path, stderr_path) in zip(script_paths, outputs)))
@@ -1,11 +1,123 @@
+import contextlib
+import contextvars
+import os
+
 class State:
-    def __init__(self):
+    def __init__(self, filename=None, buffering=1024*1024, encoding=None):
+        """
+        Holds the lines of a FlightStream script.
+
+        By default lines are accumulated in memory in the 'lines' attribute. If 'filename'
+        is given the state streams instead: every appended block is written straight to a
+        buffered file sink and 'lines' stays empty (see open_stream).
+
+        Parameters:
+            filename (str, optional): Path of the file to stream the script into. Defaults to None.
+            buffering (int, optional): Buffer size in bytes of the streaming sink. Defaults to 1 MiB.
+            encoding (str, optional): Encoding of the streaming sink. Defaults to the locale encoding,
+                the same as write_to_file.
+        """
         self.lines = []
+        self.filename = None
+        self.line_count = 0
+        self.byte_offset = 0
+        self._sink = None
+        self._encoding = None
+        self._finished = False
+        self.compact = False
+        self.index_comments = False
+        self.command_index = 0
+        if filename is not None:
+            self.open_stream(filename, buffering=buffering, encoding=encoding)
+
+    @property
+    def streaming(self):
+        """
+        True if appended lines are written to a file sink instead of kept in memory.
+        """
+        return self.filename is not None
+
+    def open_stream(self, filename, buffering=1024*1024, encoding=None):
+        """
+        Switch the object to streaming mode, writing appended lines to 'filename'.
+
+        Lines already held in memory are written to the sink first, so the stream always
+        contains the complete script. The file is truncated when opened.
+
+        Parameters:
+            filename (str): Path of the file to stream the script into.
+            buffering (int, optional): Buffer size in bytes of the sink. Defaults to 1 MiB.
+            encoding (str, optional): Encoding of the sink. Defaults to the locale encoding.
+
+        Returns:
+            None
+        """
+        if self.streaming:
+            raise ValueError(f"Script is already streaming to '{self.filename}'.")
+        if not isinstance(buffering, int) or buffering <= 0:
+            raise ValueError("`buffering` should be a positive integer value.")
+
+        if encoding is None:
+            import locale
+            encoding = locale.getpreferredencoding(False)
+        self._encoding = encoding
+        self._sink = open(filename, 'wb', buffering=buffering)
+        self.filename = filename
+        self.line_count = 0
+        self.byte_offset = 0
+        self._finished = False
+
+        pending, self.lines = self.lines, []
+        if pending:
+            self._write_block(pending)
+
+    def set_compact(self, compact=True, index_comments=False):
+        """
+        Switch compact emission on or off for the lines appended from now on.
+
+        In compact mode the leading and trailing comment lines of every appended block, the
+        banner written before each command, are dropped. FlightStream ignores them, and for
+        short commands they are most of the script's bytes. Comment lines between commands
+        of one block are kept.
+
+        Parameters:
+            compact (bool, optional): Drop comment lines. Defaults to True.
+            index_comments (bool, optional): In compact mode, write a single '# <n>' comment
+                before each command instead, n counting the commands appended. Defaults to False.
+
+        Returns:
+            None
+        """
+        self.compact = bool(compact)
+        self.index_comments = bool(index_comments)
+
+    def close_stream(self):
+        """
+        Flush and close the streaming sink. Further appends raise a ValueError.
+
+        Returns:
+            None
+        """
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def _write_block(self, lines):
+        # One encode and one write per appended block, whatever its length
+        if self._sink is None:
+            raise ValueError(f"The streaming sink '{self.filename}' is closed.")
+        data = (os.linesep.join(lines) + os.linesep).encode(self._encoding)
+        self._sink.write(data)
+        self.line_count += len(lines)
+        self.byte_offset += len(data)
 
     def append_lines(self, lines):
         """
         Append lines to the existing lines array in the object.
 
+        In streaming mode the lines are written to the file sink immediately. In compact mode
+        the comment lines around the block are dropped first (see set_compact).
+
         Parameters:
             lines (str or list): The lines to be appended. It can be either a string or a list of strings.
 
@@ -13,35 +125,102 @@ class State:
             None
         """
         if isinstance(lines, str):
-            self.lines.append(lines)
-        elif isinstance(lines, list):
+            lines = [lines]
+        elif not isinstance(lines, list):
+            return
+
+        if self.compact:
+            # Commands open with a three-line banner closed by a lone '#'; the block is sliced
+            # past its leading and trailing comment lines instead of filtering every line
+            if (len(lines) > 4 and lines[3] == '#' and lines[4][:1] != '#' and lines[0][:1] == '#'
+                    and lines[1][:1] == '#' and lines[2][:1] == '#'):
+                start = 4
+            else:
+                start = 0
+                for line in lines:
+                    if line[:1] != '#':
+                        break
+                    start += 1
+                else:
+                    return
+            end = len(lines)
+            while lines[end - 1][:1] == '#':
+                end -= 1
+            if self.index_comments:
+                self.command_index += 1
+                lines = [f"# {self.command_index}", *lines[start:end]]
+            else:
+                lines = lines[start:end]
+        if self.filename is not None:
+            self._write_block(lines)
+        else:
             self.lines.extend(lines)
+            self.line_count += len(lines)
+
+    def iter_lines(self):
+        """
+        Iterate over the stored lines, re-reading them from the sink in streaming mode.
+        """
+        if not self.streaming:
+            yield from self.lines
+            return
+
+        if self._sink is not None:
+            self._sink.flush()
+        with open(self.filename, 'r', encoding=self._encoding) as file:
+            for _ in range(self.line_count):
+                yield file.readline().rstrip('\n')
 
     def display_lines(self):
         """
         Print each line stored in lines array.
         """
-        for line in self.lines:
+        for line in self.iter_lines():
             print(line)
 
     def write_to_file(self, filename="script_out.txt"):
         """
         Writes the contents of the 'lines' attribute to a script file for use in FlightStream.
 
+        In streaming mode, writing to the sink's own path finishes the script and closes the
+        sink; any other path receives a copy of the streamed script. Writing again after the
+        script is finished leaves it as it is, or copies it as finished.
+
         Args:
             filename (str, optional): The name of the file to write to. Defaults to "script_out.txt".
 
         Returns:
             None
         """
+        if self.streaming:
+            if self._sink is not None:
+                self._sink.flush()
+            if os.path.abspath(filename) == os.path.abspath(self.filename):
+                if not self._finished:
+                    # The closing blank line that write_to_file writes in memory mode
+                    if self._sink is None:
+                        with open(self.filename, 'ab') as file:
+                            file.write(os.linesep.encode(self._encoding))
+                    else:
+                        self._write_block([''])
+                        self.line_count -= 1
+                    self._finished = True
+                self.close_stream()
+            else:
+                import shutil
+                shutil.copyfile(self.filename, filename)
+                if not self._finished:
+                    with open(filename, 'a') as file:
+                        file.write('\n')
+            return
+
         with open(filename, 'w') as file:
-            for line in self.lines:
-                file.write(line + '\n')
-            file.write('\n')
+            file.write('\n'.join(self.lines))
+            file.write('\n' if not self.lines else '\n\n')
 
     def clear_lines(self):
         """
-        Clear the lines arrray of the object.
+        Clear the lines arrray of the object. In streaming mode the sink is truncated.
 
         Parameters:
             None
@@ -50,9 +229,87 @@ class State:
             None
         """
         self.lines = []
+        self.line_count = 0
+        self.byte_offset = 0
+        self.command_index = 0
+        if self._sink is not None:
+            self._sink.seek(0)
+            self._sink.truncate()
 
-# create an instance of State to hold lines
-script = State()
+class ScriptProxy:
+    """
+    Stand-in for the State of the current context, bound as the module-level 'script'.
+
+    Every command module appends to 'script', which forwards to the State made current by
+    new_script in this thread or asyncio task, or to the shared default State outside of
+    any new_script block. Attribute reads and writes are forwarded as well.
+    """
+    __slots__ = ()
+
+    def append_lines(self, lines):
+        # Spelled out instead of left to __getattr__: this is the hot path of every command
+        _current.get().append_lines(lines)
+
+    def __getattr__(self, name):
+        return getattr(_current.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(_current.get(), name, value)
+
+    def __repr__(self):
+        return f"<script proxy for {_current.get()!r}>"
+
+# the State used outside of any new_script block, shared by all threads
+_default = State()
+_current = contextvars.ContextVar('pyFlightscript.script', default=_default)
+
+# commands append to the State of the current context through this proxy
+script = ScriptProxy()
+
+def current_script():
+    """
+    Return the State that commands append to in the current thread or asyncio task.
+
+    Returns:
+        State: The State of the innermost new_script block, or the shared default State.
+    """
+    return _current.get()
+
+@contextlib.contextmanager
+def new_script(filename=None, buffering=1024*1024, encoding=None):
+    """
+    Build a script in its own State, isolated from other threads and asyncio tasks.
+
+    Inside the block every command, and the module functions such as write_to_file and
+    hard_reset, act on the new State. Blocks nest, and a thread or task started inside a
+    block does not inherit it (threads) or gets its own copy of the binding (tasks), so
+    concurrent builders never share lines. A streaming sink is closed when the block exits.
+
+    Parameters:
+        filename (str, optional): Stream the script into this file, see State. Defaults to None.
+        buffering (int, optional): Buffer size in bytes of the streaming sink. Defaults to 1 MiB.
+        encoding (str, optional): Encoding of the streaming sink. Defaults to the locale encoding.
+
+    Returns:
+        State: The new State, as the target of the with statement.
+
+    Example usage:
+    def build_case(aoa):
+        with pyfs.new_script() as s:
+            pyfs.aoa(aoa)
+            pyfs.start_solver()
+            s.write_to_file(f'case_{aoa}.txt')
+
+    with ThreadPoolExecutor() as pool:
+        list(pool.map(build_case, range(-5, 16)))
+    """
+    state = State(filename, buffering=buffering, encoding=encoding)
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+        state.close_stream()
 
 def display_lines():
     """
@@ -71,6 +328,36 @@ def clear_lines():
     print("pyscript lines cleared")
     return
 
+def compact_mode(compact=True, index_comments=False):
+    """
+    Drop the comment banners of all subsequently appended commands, see State.set_compact.
+
+    Parameters:
+        compact (bool): Drop comment lines. Defaults to True.
+        index_comments (bool): Write a single '# <n>' command index comment instead. Defaults to False.
+
+    Returns:
+        None
+    """
+    script.set_compact(compact, index_comments)
+    return
+
+def stream_to_file(filename="script_out.txt", buffering=1024*1024):
+    """
+    Stream all subsequently appended script lines straight to a file instead of holding
+    them in memory. Lines appended so far are written first.
+
+    Parameters:
+        filename (str): The name of the output file. Defaults to "script_out.txt".
+        buffering (int): Buffer size in bytes of the file sink. Defaults to 1 MiB.
+
+    Returns:
+        None
+    """
+    script.open_stream(filename, buffering=buffering)
+    print("pyscript lines streaming to: "+ filename)
+    return
+
 def hard_reset(filename="script_out.txt"):
     """
     Resets the script lines and deletes the specified output file.
@@ -83,6 +370,10 @@ def hard_reset(filename="script_out.txt"):
     """
     import os
     script.clear_lines()
+    # A hard reset also leaves streaming mode
+    if script.streaming:
+        script.close_stream()
+        script.filename = None
     # Check if file exists and then delete
     if os.path.exists(filename):
         try:
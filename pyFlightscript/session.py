@@ -0,0 +1,156 @@
+import math
+import os
+import time
+from .exec_solver import close_flightstream, solver_clear
+from .fsinit import open_fsm
+from .script import new_script
+
+class Session:
+    """
+    Many solver cases run by a few FlightStream launches that each load the simulation file once.
+
+    Launching FlightStream and loading a large .fsm often costs more than solving one case.
+    A session chains its cases into batch scripts: each opens the simulation file, runs
+    'setup' once, then the block of every case of the batch (solver settings, start_solver,
+    exports), each followed by solver_clear so the next case starts from a clean solution.
+    Startup and model load are paid once per batch instead of once per case.
+
+    A case is done when every file its block exports exists, is non-empty and was written
+    during run(); a case without exported files is done when its batch exits successfully.
+    When a launch crashes halfway, the cases it finished are kept and the others are batched
+    again, up to 'retries' times.
+
+    Example usage:
+    session = Session('C:/.../wing.fsm', setup=setup, batch_size=25, work_dir='C:/.../runs')
+    for aoa in range(-4, 16):
+        def case(aoa=aoa):
+            pyfs.solver_settings(angle_of_attack=aoa)
+            pyfs.start_solver()
+            pyfs.export_solver_analysis_spreadsheet(f'C:/.../loads_{aoa}.txt')
+        session.add_case(case, name=f'aoa{aoa}')
+    status = session.run(max_instances=2)
+    """
+    def __init__(self, fsm_filepath, setup=None, batch_size=20, work_dir='.', name='session', clear_between=True):
+        """
+        :param fsm_filepath: Path of the simulation file every batch opens.
+        :param setup: Callable adding the commands to run once after open_fsm. Defaults to None.
+        :param batch_size: Maximum number of cases per FlightStream launch. Defaults to 20.
+        :param work_dir: Folder of the batch scripts and logs. Defaults to the current folder.
+        :param name: Prefix of the batch script names. Defaults to 'session'.
+        :param clear_between: Append solver_clear after every case block. Defaults to True.
+        """
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("`batch_size` should be an integer value greater than 0.")
+        if setup is not None and not callable(setup):
+            raise ValueError("`setup` should be a callable.")
+        self.fsm_filepath = fsm_filepath
+        self.setup = setup
+        self.batch_size = batch_size
+        self.work_dir = os.path.abspath(work_dir)
+        self.name = name
+        self.clear_between = clear_between
+        self.cases = {}
+        self.runs = []
+
+    def add_case(self, build, name=None, outputs=()):
+        """
+        Add a case.
+
+        :param build: Callable emitting the case's commands, without open_fsm or close_flightstream.
+        :param name: Unique case name. Defaults to None, 'case<n>' in the order cases are added.
+        :param outputs: Extra files the case must produce. Defaults to ().
+
+        Returns:
+            str: The case name.
+        """
+        if not callable(build):
+            raise ValueError("`build` should be a callable.")
+        if name is None:
+            name = f'case{len(self.cases)}'
+        if name in self.cases:
+            raise ValueError(f"Case `{name}` is already defined.")
+        with new_script() as state:
+            build()
+        lines = list(state.lines)
+        from .cache import lines_file_references
+        _, exported, folders = lines_file_references(lines)
+        outputs = list(dict.fromkeys(exported + [os.path.abspath(path) for path in outputs]))
+        self.cases[name] = (lines, outputs, folders)
+        return name
+
+    def write_batches(self, names=None, label=''):
+        """
+        Write the batch scripts of some cases.
+
+        :param names: Case names, in run order. Defaults to None, all the cases.
+        :param label: Text added to the script names, e.g. to keep retries apart. Defaults to ''.
+
+        Returns:
+            list of (script path, list of case names) tuples.
+        """
+        names = list(self.cases) if names is None else list(names)
+        os.makedirs(self.work_dir, exist_ok=True)
+        batches = []
+        for index, first in enumerate(range(0, len(names), self.batch_size)):
+            batch = names[first:first + self.batch_size]
+            script_path = os.path.join(self.work_dir, f'{self.name}{label}_batch{index}_script.txt')
+            with new_script() as state:
+                open_fsm(self.fsm_filepath)
+                if self.setup is not None:
+                    self.setup()
+                for case in batch:
+                    state.append_lines(['#', f'# Case {case}'] + self.cases[case][0])
+                    if self.clear_between:
+                        solver_clear()
+                close_flightstream()
+                state.write_to_file(script_path)
+            batches.append((script_path, batch))
+        return batches
+
+    def _case_done(self, name, started, batch_ok):
+        _, outputs, folders = self.cases[name]
+        if not outputs and not folders:
+            return batch_ok
+        for path in outputs:
+            if not os.path.isfile(path) or os.path.getsize(path) == 0 or os.path.getmtime(path) < started:
+                return False
+        return all(os.path.isdir(folder) for folder in folders)
+
+    def run(self, fsexe_path=None, hidden=True, max_instances=1, max_cores=None, watchdog=None, retries=1):
+        """
+        Run every case in batches, batching the unfinished cases again after a failed launch.
+
+        :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+        :param hidden: Run FlightStream without its GUI. Defaults to True.
+        :param max_instances: Maximum number of concurrent FlightStream processes. Defaults to 1.
+        :param max_cores: Total cores shared by the runs. Defaults to os.cpu_count().
+        :param watchdog: Watchdog killing diverging, stalled or overlong launches. Defaults to None.
+        :param retries: Number of times unfinished cases are run again. Defaults to 1.
+
+        Returns:
+            dict: Case name to 'done' or 'failed', in the order the cases were added. The
+            RunResult of every launch is kept in 'runs'.
+        """
+        from .runner import run_scripts_parallel
+
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError("`retries` should be a non-negative integer value.")
+        # Whole seconds, for file systems with coarse time stamps
+        started = math.floor(time.time())
+        status = {name: 'failed' for name in self.cases}
+        pending = list(self.cases)
+        self.runs = []
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            batches = self.write_batches(pending, label=f'_try{attempt}' if attempt else '')
+            results = run_scripts_parallel([script_path for script_path, _ in batches], fsexe_path=fsexe_path,
+                                           hidden=hidden, max_instances=max_instances, max_cores=max_cores,
+                                           watchdog=watchdog)
+            self.runs.extend(results)
+            for (_, batch), result in zip(batches, results):
+                for name in batch:
+                    if self._case_done(name, started, result.ok):
+                        status[name] = 'done'
+            pending = [name for name in pending if status[name] != 'done']
+        return status
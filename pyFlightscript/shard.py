@@ -0,0 +1,210 @@
+import math
+import os
+from .exec_solver import close_flightstream
+from .fsinit import open_fsm
+from .script import new_script
+from .tools import execute_solver_sweeper
+
+# Sweeper variables, each with its ENABLE/DISABLE flag and _start/_stop/_delta arguments
+SWEEP_AXES = ('angle_of_attack', 'side_slip_angle', 'velocity')
+
+def _is_data(line):
+    token = line.replace(',', ' ').split(None, 1)
+    if not token:
+        return False
+    try:
+        float(token[0])
+    except ValueError:
+        return False
+    return True
+
+def _sweeper_defaults():
+    import inspect
+    return {name: parameter.default
+            for name, parameter in inspect.signature(execute_solver_sweeper).parameters.items()
+            if parameter.default is not inspect.Parameter.empty}
+
+def _axis_size(args, axis):
+    start, stop, delta = args[f'{axis}_start'], args[f'{axis}_stop'], args[f'{axis}_delta']
+    if delta == 0:
+        raise ValueError(f"`{axis}_delta` should not be zero.")
+    steps = (stop - start) / delta
+    if steps < -1e-9:
+        raise ValueError(f"`{axis}_delta` does not lead from `{axis}_start` to `{axis}_stop`.")
+    return int(math.floor(steps + 1e-9)) + 1
+
+def split_sweep(shards, split_axis=None, **sweeper_args):
+    """
+    Split a solver sweep into contiguous sub-sweeps along one of its variables.
+
+    :param shards: Number of sub-sweeps. Lowered to the number of values of the split variable.
+    :param split_axis: Variable to split, one of SWEEP_AXES. Defaults to None, the only
+                       enabled variable. Required when several variables are enabled: the
+                       merged rows keep the order of a single sweep only when the split is
+                       along the sweeper's outermost variable.
+    :param sweeper_args: Arguments of execute_solver_sweeper, without results_filename.
+
+    Returns:
+        list of dict: execute_solver_sweeper arguments of each sub-sweep, in sweep order.
+
+    Example usage:
+    split_sweep(4, angle_of_attack_start=-10., angle_of_attack_stop=20., angle_of_attack_delta=0.5)
+    """
+    if not isinstance(shards, int) or shards <= 0:
+        raise ValueError("`shards` should be an integer value greater than 0.")
+    args = _sweeper_defaults()
+    args.pop('results_filename', None)
+    unknown = set(sweeper_args) - set(args)
+    if unknown:
+        raise ValueError(f"Unknown execute_solver_sweeper argument(s): {', '.join(sorted(unknown))}.")
+    args.update(sweeper_args)
+
+    sizes = {axis: _axis_size(args, axis) for axis in SWEEP_AXES if args[axis] == 'ENABLE'}
+    if split_axis is None:
+        if not sizes:
+            raise ValueError("At least one sweep variable should be 'ENABLE'.")
+        if len(sizes) > 1:
+            raise ValueError(f"`split_axis` should be given when several sweep variables are enabled "
+                             f"({', '.join(sizes)}): the outermost one keeps the merged rows in sweep order.")
+        split_axis, = sizes
+    elif split_axis not in sizes:
+        raise ValueError(f"`split_axis` should be one of the enabled sweep variables {list(sizes)}.")
+
+    count = sizes[split_axis]
+    shards = min(shards, count)
+    start, delta = args[f'{split_axis}_start'], args[f'{split_axis}_delta']
+    bounds = [count * k // shards for k in range(shards + 1)]
+
+    pieces = []
+    for first, end in zip(bounds[:-1], bounds[1:]):
+        piece = dict(args)
+        # Rounded so that e.g. 0.1 * 3 is written as 0.3, not 0.30000000000000004
+        piece[f'{split_axis}_start'] = round(start + first * delta, 12)
+        piece[f'{split_axis}_stop'] = round(start + (end - 1) * delta, 12)
+        pieces.append(piece)
+    return pieces
+
+def write_sweep_shards(fsm_filepath, results_filename, shards, setup=None, split_axis=None,
+                       work_dir=None, **sweeper_args):
+    """
+    Write one FlightStream script per sub-sweep of a solver sweep (see split_sweep).
+
+    Each script opens the simulation file, runs 'setup' to add the solver setup commands,
+    executes its sub-sweep into its own results file and closes FlightStream. With surface
+    data exported per step, each shard exports into its own 'shard_<k>' sub-folder of
+    'surface_results_path' so that the shards do not overwrite each other's files.
+
+    :param fsm_filepath: Path of the simulation file every shard opens.
+    :param results_filename: Path of the merged sweep results file. Shard scripts and results
+                             are named after it, e.g. 'sweep_shard0_script.txt' and 'sweep_shard0.txt'.
+    :param shards: Number of shards.
+    :param setup: Callable adding the commands to run between open_fsm and the sweep. Defaults to None.
+    :param split_axis: Variable to split, see split_sweep. Defaults to None.
+    :param work_dir: Folder of the shard scripts and results. Defaults to the folder of 'results_filename'.
+    :param sweeper_args: Arguments of execute_solver_sweeper, without results_filename.
+
+    Returns:
+        list of (script path, shard results path) tuples, in sweep order.
+    """
+    pieces = split_sweep(shards, split_axis, **sweeper_args)
+    if work_dir is None:
+        work_dir = os.path.dirname(os.path.abspath(results_filename))
+    os.makedirs(work_dir, exist_ok=True)
+    stem, extension = os.path.splitext(os.path.basename(results_filename))
+
+    paths = []
+    for index, piece in enumerate(pieces):
+        script_path = os.path.join(work_dir, f'{stem}_shard{index}_script.txt')
+        shard_results = os.path.join(work_dir, f'{stem}_shard{index}{extension or ".txt"}')
+        piece['append_to_existing_sweep'] = 'DISABLE'
+        if piece['export_surface_data_per_step'] == 'ENABLE' and piece['surface_results_path']:
+            piece['surface_results_path'] = os.path.join(piece['surface_results_path'], f'shard_{index}')
+        with new_script() as state:
+            open_fsm(fsm_filepath)
+            if setup is not None:
+                setup()
+            execute_solver_sweeper(shard_results, **piece)
+            close_flightstream()
+            state.write_to_file(script_path)
+        paths.append((script_path, shard_results))
+    return paths
+
+def merge_sweep_files(shard_files, results_filename, append=False):
+    """
+    Merge sweep results files into one, keeping the header of the first file.
+
+    Lines starting with a number are data rows; the title and header lines of the first file
+    are written once, followed by the data rows of every file in order. When appending to a
+    results file that is not empty, only the data rows are written.
+
+    :param shard_files: Paths of the sweep results files, in sweep order.
+    :param results_filename: Path of the merged file.
+    :param append: Append to an existing results file, as APPEND_TO_EXISTING_SWEEP does. Defaults to False.
+    """
+    # An existing results file already has its header
+    write_header = not (append and os.path.exists(results_filename) and os.path.getsize(results_filename) > 0)
+    with open(results_filename, 'a' if append else 'w') as merged:
+        for index, shard_file in enumerate(shard_files):
+            with open(shard_file, 'r') as file:
+                in_header = write_header and index == 0
+                for line in file:
+                    if _is_data(line):
+                        in_header = False
+                        merged.write(line if line.endswith('\n') else line + '\n')
+                    elif in_header and line.strip():
+                        merged.write(line)
+    return
+
+def run_sharded_sweep(fsm_filepath, results_filename, shards=None, setup=None, split_axis=None,
+                      fsexe_path=None, hidden=True, max_cores=None, work_dir=None, **sweeper_args):
+    """
+    Run one solver sweep as several FlightStream instances and merge their results.
+
+    The sweep is split into contiguous sub-sweeps (see split_sweep), one script is written per
+    shard (see write_sweep_shards) and the scripts run through run_scripts_parallel, so a run
+    only starts once the cores its solver settings ask for are free. The shard results are
+    then merged into 'results_filename' in sweep order. When several variables are enabled,
+    'split_axis' must be given; split along the sweeper's outermost one to keep the merged
+    rows in the order of a single sweep.
+
+    :param fsm_filepath: Path of the simulation file every shard opens.
+    :param results_filename: Path of the merged sweep results file.
+    :param shards: Number of FlightStream instances. Defaults to None, os.cpu_count().
+    :param setup: Callable adding the commands to run between open_fsm and the sweep. Defaults to None.
+    :param split_axis: Variable to split, see split_sweep. Defaults to None.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param max_cores: Total cores shared by the runs. Defaults to os.cpu_count().
+    :param work_dir: Folder of the shard scripts, results and logs. Defaults to the folder of 'results_filename'.
+    :param sweeper_args: Arguments of execute_solver_sweeper, without results_filename.
+
+    Returns:
+        list of RunResult, one per shard in sweep order.
+
+    Raises:
+        RuntimeError: If a shard run fails; the merged file is not written.
+
+    Example usage:
+    def setup():
+        pyfs.solver_settings(processors=4)
+        pyfs.initialize_solver(surfaces=-1, load_frame=1)
+
+    run_sharded_sweep('C:/.../wing.fsm', 'C:/.../sweep.txt', shards=8, setup=setup,
+                      angle_of_attack_start=-10., angle_of_attack_stop=20., angle_of_attack_delta=0.15)
+    """
+    from .runner import run_scripts_parallel
+
+    if shards is None:
+        shards = os.cpu_count() or 1
+    paths = write_sweep_shards(fsm_filepath, results_filename, shards, setup, split_axis, work_dir, **sweeper_args)
+    results = run_scripts_parallel([script_path for script_path, _ in paths], fsexe_path=fsexe_path,
+                                   hidden=hidden, max_instances=len(paths), max_cores=max_cores)
+    failed = [result for result in results if not result.ok]
+    if failed:
+        details = ', '.join(f"{result.script_path} (exit code {result.returncode}, see {result.stderr_path})"
+                            for result in failed)
+        raise RuntimeError(f"{len(failed)} of {len(results)} sweep shard(s) failed: {details}")
+
+    merge_sweep_files([shard_results for _, shard_results in paths], results_filename,
+                      append=sweeper_args.get('append_to_existing_sweep') == 'ENABLE')
+    return results
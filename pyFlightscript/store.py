@@ -0,0 +1,300 @@
+import json
+import numbers
+from .utils import *
+
+_INDEX = 'store.json'
+
+def _read_table(path):
+    # Columns of a results file, the blocks of an appended file concatenated
+    np = require_numpy()
+    from .read_sweep import read_sweep_blocks
+    blocks = read_sweep_blocks(path)
+    columns = {}
+    for names, rows in blocks:
+        for i, name in enumerate(names):
+            columns.setdefault(name, []).append(rows[:, i])
+    if any(len(parts) != len(blocks) for parts in columns.values()):
+        raise ValueError(f"The blocks of '{path}' have different columns.")
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+def _param_array(np, values):
+    values = list(values)
+    if all(value is None or (isinstance(value, numbers.Real) and not isinstance(value, str)) for value in values):
+        return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+    return np.array(['' if value is None else str(value) for value in values])
+
+def _match(np, values, condition):
+    if callable(condition):
+        return np.asarray(condition(values), dtype=bool)
+    if isinstance(condition, tuple):
+        if len(condition) != 2:
+            raise ValueError("A range condition should be a (low, high) tuple.")
+        low, high = condition
+        mask = np.ones(values.shape, dtype=bool)
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+        return mask
+    if isinstance(condition, (list, set, frozenset)):
+        return np.isin(values, list(condition))
+    if values.dtype.kind == 'f' and isinstance(condition, numbers.Real):
+        return np.isclose(values, condition, rtol=1e-9, atol=1e-12)
+    return values == condition
+
+class ResultStore:
+    """
+    Columnar on-disk store of the results files of many cases, indexed by case parameters.
+
+    ingest parses results files once (sweep results, solver analysis spreadsheets, FEM CSV
+    exports or anything read_sweep_blocks reads) and appends them to a table as a new segment:
+    a folder with one .npy file per column and per case parameter. Reads memory-map the
+    columns they need and gather the rows of the matching cases, so a query never re-parses
+    a text file. A case ingested again supersedes its earlier rows; compact rewrites a table
+    as a single segment without them.
+
+    Example usage:
+    store = ResultStore('C:/.../study/store')
+    store.ingest([(f'U{u}_a{a}', f'C:/.../loads_U{u}_a{a}.txt', {'velocity': u, 'aoa': a})
+                  for u in speeds for a in angles], table='loads')
+    rows = store.select('loads', where={'aoa': (4, 8), 'velocity': 80.}, columns=['CL', 'CDi'])
+    """
+    def __init__(self, path):
+        """
+        :param path: Folder of the store. Created on the first ingest.
+        """
+        self.path = os.path.abspath(path)
+        self._segments = {}
+
+    def _load_index(self):
+        index_path = os.path.join(self.path, _INDEX)
+        if not os.path.exists(index_path):
+            return {'version': 1, 'tables': {}}
+        with open(index_path, 'r') as file:
+            return json.load(file)
+
+    def _save_index(self, index):
+        os.makedirs(self.path, exist_ok=True)
+        temporary = os.path.join(self.path, _INDEX + '.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(index, file, indent=1)
+        os.replace(temporary, os.path.join(self.path, _INDEX))
+
+    def tables(self):
+        """
+        Returns:
+            list of str: Names of the tables.
+        """
+        return list(self._load_index()['tables'])
+
+    def ingest(self, cases, table='results', reader=None):
+        """
+        Parse results files and append them to a table as one segment.
+
+        :param cases: Iterable of (case name, results file path, parameter dict) tuples. The
+                      parameters, e.g. {'aoa': 4., 'mach': 0.3}, are what queries filter on.
+        :param table: Table name, e.g. 'sweep', 'loads' or 'fem'. Defaults to 'results'.
+        :param reader: Callable taking a path and returning a dict of column name to 1D array.
+                       Defaults to None, read_sweep_blocks with the blocks concatenated.
+
+        Returns:
+            int: Number of rows added.
+        """
+        np = require_numpy()
+        if not table or not all(c.isalnum() or c in '-_' for c in table):
+            raise ValueError("`table` should be a non-empty string of letters, digits, '-' or '_'.")
+        read = _read_table if reader is None else reader
+
+        names, params, parts, counts = [], [], [], []
+        for name, path, case_params in cases:
+            columns = {key: np.asarray(value).reshape(-1) for key, value in read(path).items()}
+            lengths = {column.size for column in columns.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"The columns of '{path}' have different lengths.")
+            names.append(str(name))
+            params.append(dict(case_params or {}))
+            parts.append(columns)
+            counts.append(lengths.pop() if lengths else 0)
+        if not names:
+            return 0
+
+        column_names = list(dict.fromkeys(key for columns in parts for key in columns))
+        param_names = list(dict.fromkeys(key for case_params in params for key in case_params))
+        index = self._load_index()
+        entry = index['tables'].setdefault(table, {'segments': [], 'next': 0})
+        segment = f"{table}_{entry['next']:06d}"
+        folder = os.path.join(self.path, segment)
+        os.makedirs(folder, exist_ok=True)
+
+        for i, column in enumerate(column_names):
+            # Cases without the column get NaN rows
+            values = np.concatenate([columns[column].astype(np.float64, copy=False) if column in columns
+                                     else np.full(count, np.nan) for columns, count in zip(parts, counts)])
+            np.save(os.path.join(folder, f'c{i}.npy'), values)
+        for i, param in enumerate(param_names):
+            np.save(os.path.join(folder, f'p{i}.npy'), _param_array(np, (case.get(param) for case in params)))
+        np.save(os.path.join(folder, 'offsets.npy'), np.concatenate(([0], np.cumsum(counts))).astype(np.int64))
+        with open(os.path.join(folder, 'segment.json'), 'w') as file:
+            json.dump({'cases': names, 'columns': column_names, 'params': param_names}, file)
+
+        # The index is only updated once the segment is complete
+        entry['segments'].append(segment)
+        entry['next'] += 1
+        self._save_index(index)
+        return int(sum(counts))
+
+    def _segment(self, segment):
+        if segment not in self._segments:
+            np = require_numpy()
+            folder = os.path.join(self.path, segment)
+            with open(os.path.join(folder, 'segment.json'), 'r') as file:
+                meta = json.load(file)
+            meta['offsets'] = np.load(os.path.join(folder, 'offsets.npy'))
+            meta['names'] = np.array(meta['cases'])
+            self._segments[segment] = meta
+        return self._segments[segment]
+
+    def _array(self, segment, kind, position):
+        np = require_numpy()
+        return np.load(os.path.join(self.path, segment, f'{kind}{position}.npy'), mmap_mode='r')
+
+    def _matches(self, table, where):
+        # (segment, case mask) pairs; a case's latest segment supersedes the earlier ones
+        np = require_numpy()
+        index = self._load_index()
+        if table not in index['tables']:
+            raise ValueError(f"No table `{table}` in '{self.path}'; the tables are {list(index['tables'])}.")
+        segments = index['tables'][table]['segments']
+        latest = {}
+        for segment in segments:
+            for name in self._segment(segment)['cases']:
+                latest[name] = segment
+
+        matches = []
+        for segment in segments:
+            meta = self._segment(segment)
+            mask = np.array([latest[name] == segment for name in meta['cases']], dtype=bool)
+            for param, condition in (where or {}).items():
+                if param in meta['params']:
+                    mask &= _match(np, np.asarray(self._array(segment, 'p', meta['params'].index(param))), condition)
+                else:
+                    mask[:] = False
+            matches.append((segment, mask))
+        return matches
+
+    def cases(self, table='results', where=None):
+        """
+        The case index of a table: case names and parameters of the matching cases.
+
+        :param table: Table name. Defaults to 'results'.
+        :param where: Dict of parameter name to condition. A condition is a value (floats
+                      compare with a relative tolerance of 1e-9), a (low, high) tuple for an
+                      inclusive range with None for an open end, a list of accepted values or
+                      a callable taking the parameter array and returning a boolean mask.
+                      Defaults to None, every case.
+
+        Returns:
+            dict: 'case' and each parameter name to an array with one entry per case.
+        """
+        np = require_numpy()
+        selected = []
+        for segment, mask in self._matches(table, where):
+            meta = self._segment(segment)
+            chosen = np.flatnonzero(mask)
+            part = {'case': meta['names'][chosen]}
+            for i, param in enumerate(meta['params']):
+                part[param] = np.asarray(self._array(segment, 'p', i))[chosen]
+            selected.append((part, chosen.size))
+        return _concatenate(np, selected)
+
+    def select(self, table='results', where=None, columns=None, params=False):
+        """
+        Rows of the matching cases, reading only the requested columns.
+
+        :param table: Table name. Defaults to 'results'.
+        :param where: Dict of parameter name to condition, see cases. Defaults to None, every case.
+        :param columns: Column names to read. Defaults to None, every column.
+        :param params: Also return the case parameters, repeated on every row. Defaults to False.
+
+        Returns:
+            dict: 'case' and each column name, and parameter name with 'params', to an array
+            with one entry per row.
+
+        Example usage:
+        rows = store.select('sweep', where={'aoa': (4, 8), 'mach': 0.3}, columns=['CL'])
+        """
+        np = require_numpy()
+        selected = []
+        for segment, mask in self._matches(table, where):
+            meta = self._segment(segment)
+            offsets = meta['offsets']
+            # Runs of consecutive matching cases are contiguous rows, read as single slices
+            edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+            runs = list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+            chosen = np.flatnonzero(mask)
+            counts = offsets[chosen + 1] - offsets[chosen]
+            rows = int(counts.sum())
+            part = {'case': np.repeat(meta['names'][chosen], counts)}
+            for column in (meta['columns'] if columns is None else columns):
+                if column in meta['columns']:
+                    values = self._array(segment, 'c', meta['columns'].index(column))
+                    part[column] = np.concatenate([values[offsets[first]:offsets[end]] for first, end in runs]
+                                                  or [np.zeros(0)])
+                else:
+                    part[column] = np.full(rows, np.nan)
+            if params:
+                for i, param in enumerate(meta['params']):
+                    part.setdefault(param, np.repeat(np.asarray(self._array(segment, 'p', i))[chosen], counts))
+            selected.append((part, rows))
+        return _concatenate(np, selected)
+
+    def compact(self, table='results'):
+        """
+        Rewrite a table as one segment, without the rows of superseded cases.
+
+        Returns:
+            int: Number of rows kept.
+        """
+        import shutil
+
+        old = self._load_index()['tables'].get(table, {}).get('segments', [])
+        if len(old) < 2:
+            return int(sum(self._segment(segment)['offsets'][-1] for segment in old))
+        cases = self.cases(table)
+        data = self.select(table)
+        names = data.pop('case')
+        bounds = {}
+        for i, name in enumerate(names.tolist()):
+            bounds.setdefault(name, [i, i])[1] = i + 1
+        params = [name for name in cases if name != 'case']
+
+        def reader(name):
+            first, end = bounds.get(name, (0, 0))
+            return {column: values[first:end] for column, values in data.items()}
+
+        rows = self.ingest(((name, name, {param: cases[param][i] for param in params})
+                            for i, name in enumerate(cases['case'].tolist())), table=table, reader=reader)
+        # The new segment holds every case, so the old ones are dropped only once it is indexed
+        index = self._load_index()
+        index['tables'][table]['segments'] = [segment for segment in index['tables'][table]['segments']
+                                              if segment not in old]
+        self._save_index(index)
+        for segment in old:
+            self._segments.pop(segment, None)
+            shutil.rmtree(os.path.join(self.path, segment), ignore_errors=True)
+        return rows
+
+def _concatenate(np, parts):
+    # Merges per-segment dicts of arrays; keys missing from a segment are filled with NaN or ''
+    keys = list(dict.fromkeys(key for part, _ in parts for key in part))
+    merged = {}
+    for key in keys:
+        pieces = []
+        for part, size in parts:
+            if key in part:
+                pieces.append(part[key])
+            else:
+                kinds = [other[key].dtype.kind for other, _ in parts if key in other]
+                pieces.append(np.full(size, '' if 'U' in kinds else np.nan, dtype=None if 'U' in kinds else np.float64))
+        merged[key] = np.concatenate(pieces) if pieces else np.zeros(0)
+    return merged
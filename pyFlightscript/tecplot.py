@@ -0,0 +1,266 @@
+import re
+from .utils import *
+
+# Nodes per element of the finite element zone types
+_NODES_PER_ELEMENT = {'FELINESEG': 2, 'FETRIANGLE': 3, 'FEQUADRILATERAL': 4, 'FETETRAHEDRON': 4, 'FEBRICK': 8}
+# Element type names of the older ZONE ... F=FEPOINT, ET=... records
+_ELEMENT_TYPES = {'LINESEG': 'FELINESEG', 'TRIANGLE': 'FETRIANGLE', 'QUADRILATERAL': 'FEQUADRILATERAL',
+                  'TETRAHEDRON': 'FETETRAHEDRON', 'BRICK': 'FEBRICK'}
+_RECORDS = ('TITLE', 'VARIABLES', 'ZONE', 'AUXDATA', 'DATASETAUXDATA', 'TEXT', 'GEOMETRY', 'CUSTOMLABELS')
+
+_PAIR = re.compile(r'(\w+)\s*=\s*("[^"]*"|\([^)]*\)|[^,\s]+)')
+_NAME = re.compile(r'"([^"]*)"|([^\s,"=]+)')
+_RANGE = re.compile(r'\[([\d\s,\-]+)\]\s*=\s*(\w+)')
+
+class TecplotZone:
+    """
+    One zone of a Tecplot ASCII file.
+
+    Attributes:
+        index (int): Position of the zone in the file, from 0.
+        title (str): Zone title (T=).
+        zone_type (str): 'ORDERED' or a finite element type such as 'FEQUADRILATERAL'.
+        packing (str): 'POINT' or 'BLOCK'.
+        shape (tuple): (I, J, K) of an ordered zone, else None.
+        nodes (int): Number of nodes.
+        elements (int): Number of cells or elements.
+        locations (list of str): 'NODAL' or 'CELLCENTERED' for every variable of the file.
+        header (dict): Every key=value of the ZONE record, keys in upper case.
+        values (dict): Arrays read by TecplotFile.read, variable name to 1D array.
+        connectivity (numpy array): Element node indices from 0, shape (elements, nodes per
+                                    element), once read; None for ordered zones.
+    """
+    def __init__(self, index, header, variables, start, end):
+        self.index = index
+        self.header = header
+        self.title = header.get('T', '').strip('"')
+        packing = header.get('DATAPACKING', header.get('F', 'POINT')).upper()
+        zone_type = header.get('ZONETYPE', '').upper()
+        if packing in ('FEPOINT', 'FEBLOCK'):
+            zone_type = zone_type or _ELEMENT_TYPES.get(header.get('ET', '').upper(), '')
+            packing = packing[2:]
+        if packing not in ('POINT', 'BLOCK'):
+            raise ValueError(f"Unknown Tecplot data packing '{packing}' of zone '{self.title}'.")
+        self.packing = packing
+        self.zone_type = zone_type or 'ORDERED'
+        if 'VARSHARELIST' in header or 'PASSIVEVARLIST' in header or 'CONNECTIVITYSHAREZONE' in header:
+            raise ValueError(f"Zone '{self.title}' shares or omits variables, which is not supported.")
+
+        if self.zone_type == 'ORDERED':
+            self.shape = tuple(int(header.get(key, 1)) for key in ('I', 'J', 'K'))
+            self.nodes = self.shape[0] * self.shape[1] * self.shape[2]
+            self.elements = 1
+            for size in self.shape:
+                self.elements *= max(size - 1, 1)
+        elif self.zone_type in _NODES_PER_ELEMENT:
+            self.shape = None
+            self.nodes = int(header.get('N', header.get('NODES', 0)))
+            self.elements = int(header.get('E', header.get('ELEMENTS', 0)))
+        else:
+            raise ValueError(f"Unsupported Tecplot zone type '{self.zone_type}' of zone '{self.title}'.")
+
+        self.locations = ['NODAL'] * len(variables)
+        for ranges, location in _RANGE.findall(header.get('VARLOCATION', '')):
+            for part in ranges.split(','):
+                first, _, last = part.strip().partition('-')
+                for position in range(int(first), int(last or first) + 1):
+                    self.locations[position - 1] = location.upper()
+        if self.packing == 'POINT' and 'CELLCENTERED' in self.locations:
+            raise ValueError(f"Zone '{self.title}' has cell centered variables with POINT packing.")
+        self._start = start
+        self._end = end
+        self.values = {}
+        self.connectivity = None
+
+    def counts(self):
+        """
+        Number of values of every variable.
+        """
+        return [self.nodes if location == 'NODAL' else self.elements for location in self.locations]
+
+    def __repr__(self):
+        return f"TecplotZone({self.title!r}, {self.zone_type}, {self.packing}, nodes={self.nodes})"
+
+def _records(text):
+    # Splits header text into (keyword, text) records; lines not starting a record continue the last one
+    records = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        keyword = re.match(r'[A-Za-z]*', stripped).group(0).upper()
+        if keyword in _RECORDS:
+            records.append([keyword, stripped[len(keyword):]])
+        elif records:
+            records[-1][1] += ' ' + stripped
+        else:
+            records.append(['', stripped])
+    return records
+
+def _convert(np, data, dtype=None):
+    text = data.tobytes()
+    if b',' in text:
+        text = text.replace(b',', b' ')
+    if b'D' in text or b'd' in text:
+        text = text.replace(b'D', b'E').replace(b'd', b'E')
+    dtype = np.float64 if dtype is None else dtype
+    return np.fromstring(text, dtype=dtype, sep=' ')
+
+class TecplotFile:
+    """
+    Reader of Tecplot ASCII files, such as those of export_solver_analysis_tecplot and
+    export_volume_section_tecplot.
+
+    Opening the file classifies its lines with array operations and parses only the header
+    records (TITLE, VARIABLES, ZONE); zone data stays unread. read converts the selected zones
+    and variables with one bulk NumPy call per variable block, so large files load at close to
+    disk speed and unselected data is never converted.
+
+    Attributes:
+        title (str): Dataset title.
+        variables (list of str): Variable names.
+        zones (list of TecplotZone): Zones in file order.
+
+    Example usage:
+    tecplot = TecplotFile('C:/.../volume_section.dat')
+    zone, = tecplot.read(zones=[0], variables=['X', 'Y', 'Z', 'Cp'])
+    print(zone.values['Cp'].min())
+    """
+    def __init__(self, filename, memory_map=None):
+        """
+        :param filename: Path of the Tecplot ASCII file.
+        :param memory_map: Memory-map the file instead of reading it. Defaults to None, which
+                           maps files larger than 64 MiB.
+        """
+        np = require_numpy()
+        from .read_sweep import _classify_lines
+        check_file_existence(filename)
+        self.filename = filename
+        if memory_map is None:
+            memory_map = os.path.getsize(filename) > 64 * 1024 * 1024
+        if os.path.getsize(filename) == 0:
+            raise ValueError(f"'{filename}' is empty.")
+        if memory_map:
+            self._data = np.memmap(filename, dtype=np.uint8, mode='r')
+        else:
+            with open(filename, 'rb') as file:
+                self._data = np.frombuffer(file.read(), dtype=np.uint8)
+
+        data = self._data
+        starts, is_data, is_blank = _classify_lines(np, data)
+        ends = np.append(starts[1:], data.size)
+        headers = np.flatnonzero(~is_data & ~is_blank)
+        self.title = ''
+        self.variables = []
+        self.zones = []
+
+        # Runs of header lines with no data line between them, each followed by the data up to the next run
+        data_lines = np.cumsum(is_data)
+        groups = [group for group in np.split(headers, np.flatnonzero(np.diff(data_lines[headers]) > 0) + 1)
+                  if group.size]
+        for position, group in enumerate(groups):
+            text = data[starts[group[0]]:ends[group[-1]]].tobytes().decode('ascii', errors='replace')
+            start = int(ends[group[-1]])
+            end = int(starts[groups[position + 1][0]]) if position + 1 < len(groups) else int(data.size)
+            for keyword, body in _records(text):
+                if keyword == 'TITLE':
+                    self.title = body.split('=', 1)[-1].strip().strip('"')
+                elif keyword == 'VARIABLES':
+                    self.variables = [quoted or bare for quoted, bare in _NAME.findall(body.split('=', 1)[-1])]
+                elif keyword == 'ZONE':
+                    if not self.variables:
+                        raise ValueError(f"'{filename}' has a ZONE before its VARIABLES.")
+                    header = {key.upper(): value for key, value in _PAIR.findall(body)}
+                    self.zones.append(TecplotZone(len(self.zones), header, self.variables, start, end))
+
+    def zone(self, key):
+        """
+        A zone by position or title.
+        """
+        if isinstance(key, int):
+            return self.zones[key]
+        for zone in self.zones:
+            if zone.title == key:
+                return zone
+        raise ValueError(f"No zone '{key}' in '{self.filename}'; the zones are {[zone.title for zone in self.zones]}.")
+
+    def _variable_positions(self, variables):
+        if variables is None:
+            return list(range(len(self.variables)))
+        positions = []
+        for name in variables:
+            if name in self.variables:
+                positions.append(self.variables.index(name))
+            else:
+                lower = [variable.lower() for variable in self.variables]
+                if name.lower() not in lower:
+                    raise ValueError(f"No variable '{name}' in '{self.filename}'; the variables are {self.variables}.")
+                positions.append(lower.index(name.lower()))
+        return positions
+
+    def read(self, zones=None, variables=None, connectivity=True):
+        """
+        Convert the data of some zones.
+
+        :param zones: Zone positions or titles. Defaults to None, every zone.
+        :param variables: Variable names (exact, else ignoring case). Defaults to None, every variable.
+        :param connectivity: Also read the connectivity of finite element zones. Defaults to True.
+
+        Returns:
+            list of TecplotZone, with 'values' (and 'connectivity') filled in. Values of ordered
+            zones are flat, I varying fastest; reshape with zone.shape[::-1] for a (K, J, I) array.
+        """
+        np = require_numpy()
+        from .vtk_file import _token_starts
+
+        positions = self._variable_positions(variables)
+        selected = self.zones if zones is None else [self.zone(key) for key in zones]
+        for zone in selected:
+            region = self._data[zone._start:zone._end]
+            tokens = _token_starts(np, region)
+            counts = zone.counts()
+            total = sum(counts)
+            cells = zone.elements * _NODES_PER_ELEMENT.get(zone.zone_type, 0)
+            if tokens.size < total + cells:
+                raise ValueError(f"Zone '{zone.title}' of '{self.filename}' holds {tokens.size} values "
+                                 f"instead of {total + cells}.")
+
+            def span(first, last):
+                end = tokens[last] if last < tokens.size else region.size
+                return region[tokens[first]:end]
+
+            if zone.packing == 'POINT':
+                table = _convert(np, span(0, total)).reshape(zone.nodes, len(self.variables))
+                for position in positions:
+                    zone.values[self.variables[position]] = np.ascontiguousarray(table[:, position])
+            else:
+                offsets = np.concatenate(([0], np.cumsum(counts))).tolist()
+                for position in positions:
+                    values = _convert(np, span(offsets[position], offsets[position + 1]))
+                    if values.size != counts[position]:
+                        raise ValueError(f"Variable '{self.variables[position]}' of zone '{zone.title}' "
+                                         f"has unreadable values.")
+                    zone.values[self.variables[position]] = values
+            if connectivity and cells:
+                nodes = _convert(np, span(total, total + cells), np.int64)
+                zone.connectivity = nodes.reshape(zone.elements, -1) - 1
+        return selected
+
+def read_tecplot(filename, zones=None, variables=None, connectivity=True, memory_map=None):
+    """
+    Read the zones of a Tecplot ASCII file, see TecplotFile.
+
+    :param filename: Path of the Tecplot ASCII file.
+    :param zones: Zone positions or titles. Defaults to None, every zone.
+    :param variables: Variable names. Defaults to None, every variable.
+    :param connectivity: Also read the connectivity of finite element zones. Defaults to True.
+    :param memory_map: See TecplotFile. Defaults to None.
+
+    Returns:
+        list of TecplotZone with 'values' and 'connectivity' filled in.
+
+    Example usage:
+    for zone in read_tecplot('C:/.../surface.dat', variables=['Cp']):
+        print(zone.title, zone.values['Cp'].min())
+    """
+    return TecplotFile(filename, memory_map=memory_map).read(zones, variables, connectivity)
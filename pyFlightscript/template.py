@@ -0,0 +1,200 @@
+import contextlib
+import re
+from .script import new_script
+
+# Placeholders are written into the recorded lines as \x00<index>\x01<format spec>\x00
+_FIELD = re.compile('\x00(\\d+)\x01([^\x00]*)\x00')
+
+def _placeholder(index, spec=''):
+    return f"\x00{index}\x01{spec}\x00"
+
+class _FloatParam(float):
+    def __format__(self, spec):
+        return _placeholder(self.index, spec)
+
+    def __str__(self):
+        return _placeholder(self.index)
+
+class _IntParam(int):
+    def __format__(self, spec):
+        return _placeholder(self.index, spec)
+
+    def __str__(self):
+        return _placeholder(self.index)
+
+class _StrParam(str):
+    def __format__(self, spec):
+        return _placeholder(self.index, spec)
+
+    def __str__(self):
+        return _placeholder(self.index)
+
+class ScriptTemplate:
+    """
+    A script recorded once with placeholders for chosen arguments and rendered per case.
+
+    Commands called inside record() run once, with each placeholder standing in for its
+    sample value, so all argument validation happens at record time. The recorded lines
+    are then compiled into a single format string; rendering a case is one str.format
+    call, without running any command function again.
+
+    Placeholders must reach the script unchanged: an argument that a command converts or
+    computes with (e.g. float(x), x * 2, path manipulation) loses its placeholder and
+    record() raises a ValueError. Rendered values are not validated.
+
+    Example usage:
+    template = ScriptTemplate()
+    with template.record():
+        pyfs.ccs_import(template.param('ccs', 'C:/.../AnalysisU80.csv'))
+        pyfs.aoa(template.param('aoa', 0.0))
+        pyfs.start_solver()
+    template.write('case_5.txt', ccs='C:/.../AnalysisU90.csv', aoa=5.0)
+    template.write_batch('case_{index}.txt', {'ccs': paths, 'aoa': np.linspace(0, 15, 50000)})
+    """
+    def __init__(self):
+        self.params = []
+        self._format = None
+
+    def param(self, name, sample):
+        """
+        Declare a placeholder to pass to a command in place of a literal argument.
+
+        :param name: Name of the parameter, used as keyword when rendering.
+        :param sample: Value the commands validate against while recording. Its type
+                       (int, float or str) is the type of the placeholder.
+
+        Returns:
+            The placeholder, a subclass of the sample's type.
+        """
+        if not isinstance(name, str) or not name.isidentifier():
+            raise ValueError("`name` should be a valid identifier string.")
+        if name in self.params:
+            raise ValueError(f"Parameter `{name}` is already declared.")
+        if self._format is not None:
+            raise ValueError("The template is already compiled.")
+
+        if isinstance(sample, bool):
+            raise ValueError("`sample` should be an integer, float or string value.")
+        elif isinstance(sample, int):
+            placeholder = _IntParam(sample)
+        elif isinstance(sample, float):
+            placeholder = _FloatParam(sample)
+        elif isinstance(sample, str):
+            placeholder = _StrParam(sample)
+        else:
+            raise ValueError("`sample` should be an integer, float or string value.")
+
+        placeholder.index = len(self.params)
+        self.params.append(name)
+        return placeholder
+
+    @contextlib.contextmanager
+    def record(self):
+        """
+        Record the commands called inside the block into the template and compile it.
+
+        The block builds into its own script state (see new_script), so the current script
+        is left untouched.
+        """
+        if self._format is not None:
+            raise ValueError("The template is already compiled.")
+        with new_script() as state:
+            yield self
+        self.compile(state.lines)
+
+    def compile(self, lines):
+        """
+        Compile recorded script lines containing placeholders into the template.
+
+        :param lines: List of script lines, as in State.lines.
+        """
+        # Same layout as State.write_to_file
+        text = '\n'.join(lines) + ('\n' if not lines else '\n\n')
+
+        parts = []
+        used = set()
+        position = 0
+        for match in _FIELD.finditer(text):
+            parts.append(text[position:match.start()].replace('{', '{{').replace('}', '}}'))
+            index, spec = int(match.group(1)), match.group(2)
+            parts.append(f"{{{index}:{spec}}}" if spec else f"{{{index}}}")
+            used.add(index)
+            position = match.end()
+        parts.append(text[position:].replace('{', '{{').replace('}', '}}'))
+
+        for index, name in enumerate(self.params):
+            if index not in used:
+                raise ValueError(f"Parameter `{name}` does not reach the script unchanged; "
+                                 "pass the placeholder directly as a command argument.")
+        if any('\x00' in part for part in parts):
+            raise ValueError("A placeholder was modified before reaching the script.")
+        self._format = ''.join(parts)
+
+    def _values(self, values):
+        if self._format is None:
+            raise ValueError("The template is not compiled; call record() or compile() first.")
+        unknown = set(values) - set(self.params)
+        if unknown:
+            raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}.")
+        missing = [name for name in self.params if name not in values]
+        if missing:
+            raise ValueError(f"Missing value(s) for parameter(s): {', '.join(missing)}.")
+        return [values[name] for name in self.params]
+
+    def render(self, **values):
+        """
+        Return the script text of one case.
+
+        :param values: Value of every parameter, by name.
+
+        Returns:
+            str: The script, as write_to_file would write it.
+        """
+        return self._format.format(*self._values(values))
+
+    def write(self, filename, **values):
+        """
+        Write the script of one case to a file.
+
+        :param filename: Path of the script file.
+        :param values: Value of every parameter, by name.
+        """
+        text = self._format.format(*self._values(values))
+        with open(filename, 'w') as file:
+            file.write(text)
+
+    def write_batch(self, filenames, columns):
+        """
+        Write the scripts of many cases, one file per row of parameter values.
+
+        :param filenames: List of paths, one per case, or a pattern formatted with the case
+                          'index' and the parameter values, e.g. 'case_{index}_{aoa}.txt'.
+        :param columns: Mapping of parameter name to a sequence of values (lists or NumPy
+                        arrays), or a NumPy structured array with one field per parameter.
+
+        Returns:
+            list of str: The paths written.
+        """
+        names = getattr(getattr(columns, 'dtype', None), 'names', None)
+        if names is not None:
+            columns = {name: columns[name] for name in names}
+        ordered = self._values(columns)
+        # NumPy columns convert to Python scalars, which format exactly like the commands do
+        ordered = [column.tolist() if hasattr(column, 'tolist') else list(column) for column in ordered]
+
+        count = len(ordered[0]) if ordered else 0
+        if any(len(column) != count for column in ordered):
+            raise ValueError("All parameter columns should have the same length.")
+
+        if isinstance(filenames, str):
+            pattern = filenames
+            filenames = [pattern.format(index=index, **dict(zip(self.params, row)))
+                         for index, row in enumerate(zip(*ordered))]
+        elif len(filenames) != count:
+            raise ValueError("`filenames` should have one path per row of `columns`.")
+
+        template = self._format
+        for filename, row in zip(filenames, zip(*ordered)):
+            with open(filename, 'w') as file:
+                file.write(template.format(*row))
+        return list(filenames)
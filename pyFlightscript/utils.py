@@ -24,4 +24,14 @@ def check_file_existence(file):
     # Validate file existence
     if not os.path.exists(file):
         raise FileNotFoundError(f"The specified file '{file}' does not exist on path.")
-    return
\ No newline at end of file
+    return
+
+def require_numpy():
+    """
+    Import and return numpy, which only the result readers need.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("This function requires numpy. Install it with 'pip install numpy'.")
+    return numpy
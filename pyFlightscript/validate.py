@@ -0,0 +1,417 @@
+from .parse import SCRIPT_COMMANDS
+from .script import State, current_script
+
+# Object counts of a FlightStream session with nothing loaded: only the reference frame
+DEFAULT_COUNTS = {
+    'frames': 1,
+    'surfaces': 0,
+    'motions': 0,
+    'actuators': 0,
+    'surface_sections': 0,
+    'volume_sections': 0,
+    'probes': 0,
+    'observers': 0,
+}
+
+# Commands adding one object
+_CREATES = {
+    'CREATE_NEW_COORDINATE_SYSTEM': 'frames',
+    'DUPLICATE_COORDINATE_SYSTEM': 'frames',
+    'CREATE_NEW_MOTION_EUCLIDEAN': 'motions',
+    'CREATE_NEW_MOTION_CUSTOM': 'motions',
+    'CREATE_NEW_MOTION_6DOF': 'motions',
+    'CREATE_NEW_MOTION_FSI': 'motions',
+    'CREATE_NEW_ACTUATOR': 'actuators',
+    'CREATE_NEW_SURFACE_SECTION': 'surface_sections',
+    'CREATE_NEW_RECTANGLE_VOLUME_SECTION': 'volume_sections',
+    'CREATE_NEW_CIRCLE_VOLUME_SECTION': 'volume_sections',
+    'NEW_PROBE_POINT': 'probes',
+    'NEW_PROBE_LINE': 'probes',
+    'CREATE_NEW_ACOUSTIC_OBSERVER': 'observers',
+}
+
+# Commands adding as many objects as the inline token at this position
+_CREATE_COUNTS = {
+    'NEW_PROBE_LINE': 1,
+}
+
+# Commands adding objects through a keyword line of their block: (command, keyword) -> category
+_BLOCK_CREATES = {
+    ('NEW_SURFACE_SECTION_DISTRIBUTION', 'NUM_SECTIONS'): 'surface_sections',
+}
+
+# Commands removing the object they reference
+_DELETES = {
+    'DELETE_COORDINATE_SYSTEM': 'frames',
+    'DELETE_MOTION': 'motions',
+    'DELETE_ACTUATOR': 'actuators',
+    'DELETE_SURFACE_SECTION': 'surface_sections',
+    'DELETE_VOLUME_SECTION': 'volume_sections',
+    'DELETE_ACOUSTIC_OBSERVER': 'observers',
+}
+
+# Commands removing every object of a category
+_CLEARS = {
+    'SURFACE_CLEARALL': 'surfaces',
+    'DELETE_ALL_SURFACE_SECTIONS': 'surface_sections',
+    'DELETE_ALL_VOLUME_SECTIONS': 'volume_sections',
+    'DELETE_PROBE_POINTS': 'probes',
+    'DELETE_ALL_ACOUSTIC_OBSERVERS': 'observers',
+}
+
+# Commands after which the count of a category cannot be known without the model
+_UNKNOWN_AFTER = {
+    'IMPORT': 'surfaces',
+    'CCS_IMPORT': 'surfaces',
+    'IMPORT_CAD': 'surfaces',
+    'CONVERT_CAD_TO_MESH': 'surfaces',
+    'BOOLEAN_UNITE_GEOMETRY': 'surfaces',
+    'BOOLEAN_UNITE_MESH': 'surfaces',
+    'WRAPPER_EXECUTE': 'surfaces',
+    'CREATE_NEW_SURFACE_FROM_SELECTION': 'surfaces',
+    'DELETE_SELECTED_FACES': 'surfaces',
+    'SURFACE_DELETE': 'surfaces',
+    'SURFACE_COMBINE': 'surfaces',
+    'SURFACE_COPY_PASTE': 'surfaces',
+    'SURFACE_CUT_BY_PLANE': 'surfaces',
+    'SURFACE_MIRROR': 'surfaces',
+    'SURFACE_CIRCULAR_PATTERN': 'surfaces',
+    'PROBE_POINTS_IMPORT': 'probes',
+    'ACOUSTIC_OBSERVERS_IMPORT': 'observers',
+    'CREATE_ACOUSTIC_SECTION': 'observers',
+}
+
+# Object indices given on the command line itself: command -> ((token position, category), ...)
+_INLINE_REFS = {
+    'SET_COORDINATE_SYSTEM_NAME': ((1, 'frames'),),
+    'SET_COORDINATE_SYSTEM_ORIGIN': ((1, 'frames'),),
+    'SET_COORDINATE_SYSTEM_AXIS': ((1, 'frames'),),
+    'NORMALIZE_COORDINATE_SYSTEM': ((1, 'frames'),),
+    'TRANSLATE_COORDINATE_SYSTEM': ((1, 'frames'),),
+    'DUPLICATE_COORDINATE_SYSTEM': ((1, 'frames'),),
+    'MIRROR_COORDINATE_SYSTEM': ((1, 'frames'),),
+    'DELETE_COORDINATE_SYSTEM': ((1, 'frames'),),
+    'SET_SOLVER_ANALYSIS_LOADS_FRAME': ((1, 'frames'),),
+    'CAD_CREATE_AUTO_CROSS_SECTIONS': ((1, 'frames'),),
+    'CAD_CREATE_CROSS_SECTION': ((1, 'frames'),),
+    'CAD_CREATE_IMPORT_CURVE_TXT': ((3, 'frames'),),
+    'SET_FREESTREAM': ((2, 'frames'),),  # SET_FREESTREAM ROTATION <frame> ...
+    'CREATE_NEW_SURFACE_SECTION': ((1, 'frames'),),
+    'CREATE_NEW_RECTANGLE_VOLUME_SECTION': ((1, 'frames'),),
+    'CREATE_NEW_CIRCLE_VOLUME_SECTION': ((1, 'frames'),),
+    'SET_MOTION_COORDINATE_SYSTEM': ((1, 'motions'), (2, 'frames')),
+    'SET_MOTION_BOUNDARIES': ((1, 'motions'),),
+    'SET_MOTION_MOVING_FRAMES': ((1, 'motions'),),
+    'SET_MOTION_START_TIME': ((1, 'motions'),),
+    'SET_MOTION_VELOCITY': ((1, 'motions'),),
+    'SET_MOTION_ACCELERATION': ((1, 'motions'),),
+    'SET_MOTION_ANGULAR_VELOCITY': ((1, 'motions'),),
+    'SET_MOTION_ANGULAR_ACCELERATION': ((1, 'motions'),),
+    'SET_MOTION_IS_ROTOR': ((1, 'motions'),),
+    'SET_MOTION_CUSTOM_TABLE': ((2, 'motions'),),
+    'SET_MOTION_MASS_PROPERTIES': ((1, 'motions'),),
+    'SET_MOTION_GRAVITY': ((1, 'motions'),),
+    'SET_MOTION_6DOF_INITIAL_VELOCITY': ((1, 'motions'),),
+    'SET_MOTION_6DOF_INITIAL_ANGULAR_VELOCITY': ((1, 'motions'),),
+    'SET_MOTION_6DOF_ACTIVE_VARIABLES': ((1, 'motions'),),
+    'SET_3DOF_MOTION': ((1, 'motions'),),
+    'CREATE_NEW_6DOF_EXTERNAL_FORCE': ((1, 'motions'),),
+    'CREATE_NEW_6DOF_CUSTOM_FORCE': ((1, 'motions'),),
+    'CREATE_NEW_6DOF_SPRING_FORCE': ((1, 'motions'),),
+    'DELETE_6DOF_EXTERNAL_FORCE': ((1, 'motions'),),
+    'EXPORT_6DOF_TRAJECTORY': ((1, 'motions'),),
+    'DELETE_MOTION': ((1, 'motions'),),
+    'SET_PROP_ACTUATOR_RPM': ((1, 'actuators'),),
+    'SET_PROP_ACTUATOR_PROFILE': ((1, 'actuators'),),
+    'SET_PROP_ACTUATOR_THRUST': ((1, 'actuators'),),
+    'SET_PROP_ACTUATOR_SWIRL': ((1, 'actuators'),),
+    'SET_ACTUATOR_EXHAUST': ((1, 'actuators'),),
+    'ENABLE_ACTUATOR': ((1, 'actuators'),),
+    'DISABLE_ACTUATOR': ((1, 'actuators'),),
+    'DELETE_SURFACE_SECTION': ((1, 'surface_sections'),),
+    'VOLUME_SECTION_BOUNDARY_LAYER': ((1, 'volume_sections'),),
+    'VOLUME_SECTION_WIREFRAME': ((1, 'volume_sections'),),
+    'EXPORT_VOLUME_SECTION_VTK': ((1, 'volume_sections'),),
+    'EXPORT_VOLUME_SECTION_2D_VTK': ((1, 'volume_sections'),),
+    'EXPORT_VOLUME_SECTION_TECPLOT': ((1, 'volume_sections'),),
+    'DELETE_VOLUME_SECTION': ((1, 'volume_sections'),),
+    'SURFACE_INVERT': ((1, 'surfaces'),),
+    'SURFACE_RENAME': ((1, 'surfaces'),),
+    'SURFACE_COPY_PASTE': ((1, 'surfaces'),),
+    'SURFACE_SCALE': ((1, 'frames'), (5, 'surfaces')),
+    'SURFACE_MIRROR': ((1, 'surfaces'), (2, 'frames')),
+    'SURFACE_CIRCULAR_PATTERN': ((1, 'surfaces'), (2, 'frames')),
+    'TRANSLATE_SURFACE_IN_FRAME': ((1, 'frames'), (6, 'surfaces')),
+    'TRANSLATE_SURFACE_BY_FRAME': ((1, 'frames'), (2, 'frames'), (3, 'surfaces')),
+    'EXPORT_SURFACE_MESH': ((2, 'surfaces'),),
+    'SELECT_GEOMETRY_BY_ID': ((1, 'surfaces'),),
+    'CREATE_NEW_INLET': ((1, 'surfaces'),),
+    'CREATE_NEW_BASE_REGION': ((1, 'surfaces'),),
+    'DETECT_BASE_REGIONS_BY_SURFACE': ((1, 'surfaces'),),
+    'DETECT_TRAILING_EDGES_BY_SURFACE': ((1, 'surfaces'),),
+    'DETECT_WAKE_TERMINATION_NODES_BY_SURFACE': ((1, 'surfaces'),),
+}
+
+# Object index given alone on the first line after the command
+_NEXT_LINE_REFS = {
+    'DELETE_ACOUSTIC_OBSERVER': 'observers',
+    'SET_MOTION_FSI_EXECUTABLE': 'motions',
+    'SET_MOTION_FSI_STRUCTURAL_NODES': 'motions',
+}
+
+# Keyword lines of command blocks holding an object index, e.g. FRAME 2
+_BLOCK_REFS = {
+    'FRAME': 'frames',
+    'ROTATION_FRAME': 'frames',
+    'LOAD_FRAME': 'frames',
+    'ACTUATOR': 'actuators',
+}
+
+# Commands followed by a list of indices whose length is the inline token at this position;
+# SURFACES <n> block lines introduce a surface list in any command
+_LISTS = {
+    'SET_MOTION_BOUNDARIES': (2, 'surfaces'),
+    'SET_MOTION_MOVING_FRAMES': (2, 'frames'),
+    'SET_VORTICITY_DRAG_BOUNDARIES': (1, 'surfaces'),
+    'SET_SOLVER_ANALYSIS_BOUNDARIES': (1, 'surfaces'),
+    'SET_VISCOUS_EXCLUDED_BOUNDARIES': (1, 'surfaces'),
+    'SET_AXIAL_SEPARATION_BOUNDARIES': (1, 'surfaces'),
+    'SET_CROSSFLOW_SEPARATION_BOUNDARIES': (1, 'surfaces'),
+    'SOLVER_PROXIMAL_BOUNDARIES': (1, 'surfaces'),
+    'CREATE_NEW_SURFACE_SECTION': (6, 'surfaces'),
+}
+
+# Further object indices in the rows of a command's index list, where 0 stands for none:
+# command -> ((field position, category), ...), e.g. the motion of INITIALIZE_SOLVER surface rows
+_ROW_REFS = {
+    'INITIALIZE_SOLVER': ((1, 'motions'),),
+}
+
+# Commands operating on all objects of a category, which must not be empty
+_REQUIRES = {
+    'UPDATE_PROBE_POINTS': 'probes',
+    'EXPORT_PROBE_POINTS': 'probes',
+    'UPDATE_ALL_SURFACE_SECTIONS': 'surface_sections',
+    'EXPORT_ALL_SURFACE_SECTIONS': 'surface_sections',
+    'COMPUTE_SURFACE_SECTIONAL_LOADS': 'surface_sections',
+    'EXPORT_SURFACE_SECTIONAL_LOADS': 'surface_sections',
+    'UPDATE_ALL_VOLUME_SECTIONS': 'volume_sections',
+    'COMPUTE_ACOUSTIC_SIGNALS': 'observers',
+}
+
+_COMMANDS = (set(_CREATES) | set(_DELETES) | set(_CLEARS) | set(_UNKNOWN_AFTER) | set(_INLINE_REFS)
+             | set(_NEXT_LINE_REFS) | set(_LISTS) | set(_REQUIRES) | {'OPEN', 'NEW_SIMULATION'}
+             | SCRIPT_COMMANDS)
+
+# Categories where -1 stands for all objects
+_ALLOW_ALL = {'surfaces'}
+
+_NAMES = {
+    'frames': 'coordinate system',
+    'surfaces': 'surface',
+    'motions': 'motion',
+    'actuators': 'actuator',
+    'surface_sections': 'surface section',
+    'volume_sections': 'volume section',
+    'probes': 'probe point',
+    'observers': 'acoustic observer',
+}
+
+class ScriptIssue:
+    """
+    An invalid object reference found by validate_script.
+
+    Attributes:
+        line (int): 1-based line number in the script.
+        command (str): Command the line belongs to.
+        message (str): Description of the problem.
+    """
+    __slots__ = ('line', 'command', 'message')
+
+    def __init__(self, line, command, message):
+        self.line = line
+        self.command = command
+        self.message = message
+
+    def __str__(self):
+        return f"line {self.line}: {self.command}: {self.message}"
+
+    def __repr__(self):
+        return f"ScriptIssue({self.line!r}, {self.command!r}, {self.message!r})"
+
+def _script_lines(script):
+    if script is None:
+        return current_script().iter_lines()
+    if isinstance(script, State):
+        return script.iter_lines()
+    if isinstance(script, str):
+        with open(script, 'r') as file:
+            return file.read().splitlines()
+    return script
+
+def _counts(base, overrides, category_default):
+    counts = dict.fromkeys(DEFAULT_COUNTS, category_default) if base is None else dict(base)
+    if overrides:
+        unknown = set(overrides) - set(DEFAULT_COUNTS)
+        if unknown:
+            raise ValueError(f"Unknown object categories: {', '.join(sorted(unknown))}. "
+                             f"Must be among {', '.join(DEFAULT_COUNTS)}.")
+        counts.update(overrides)
+    return counts
+
+def validate_script(script=None, initial_counts=None, fsm_counts=None):
+    """
+    Check the object references of a script without running FlightStream.
+
+    The script is walked line by line while the number of coordinate systems, surfaces,
+    motions, actuators, surface and volume sections, probe points and acoustic observers is
+    tracked as each command creates or deletes them. Every index a command refers to is
+    checked against the current count. Counts that cannot be known offline (surfaces after
+    a geometry import, anything after OPEN of an .fsm without fsm_counts) are not checked
+    until a command makes them known again.
+
+    :param script: Lines to check: a list of lines, a State, or the path of a script file.
+                   Defaults to None, the current script.
+    :param initial_counts: Object counts of the session the script starts in, by category
+                           (see DEFAULT_COUNTS). Defaults to a fresh session.
+    :param fsm_counts: Object counts of the .fsm file(s) the script opens with open_fsm,
+                       by category. Categories left out are unknown after OPEN.
+
+    Returns:
+        list of ScriptIssue: Invalid references in script order, empty if none were found.
+
+    Example usage:
+    issues = validate_script(fsm_counts={'surfaces': 12, 'frames': 3})
+    for issue in issues:
+        print(issue)
+    """
+    counts = _counts(DEFAULT_COUNTS, initial_counts, None)
+    _counts(None, fsm_counts, None)  # validates the categories
+    issues = []
+
+    def check(line_number, command, category, token):
+        try:
+            index = int(token)
+        except ValueError:
+            issues.append(ScriptIssue(line_number, command, f"'{token}' is not a valid {_NAMES[category]} index."))
+            return None
+        count = counts[category]
+        if index == -1 and category in _ALLOW_ALL:
+            return index
+        if index < 1 or (count is not None and index > count):
+            if count == 0:
+                available = f"no {_NAMES[category]} exists"
+            elif count is None:
+                available = "indices start at 1"
+            else:
+                available = f"valid indices are 1 to {count}"
+            issues.append(ScriptIssue(line_number, command, f"{_NAMES[category]} {index} does not exist ({available})."))
+            return None
+        return index
+
+    def referenced(line_number, command, category, token):
+        index = check(line_number, command, category, token)
+        if index is not None and _DELETES.get(command) == category and counts[category] is not None:
+            counts[category] -= 1
+
+    command = None
+    after_comment = True     # pyFlightscript writes every command right after its comment banner
+    pending_next = None      # category of an index expected alone on the next line
+    pending_list = None      # (category, indices still expected, one index per line)
+    for line_number, line in enumerate(_script_lines(script), 1):
+        text = line.strip()
+        if not text:
+            continue
+        if text.startswith('#'):
+            after_comment = True
+            continue
+        tokens = text.split()
+        keyword = tokens[0]
+        is_command, after_comment = after_comment or keyword in _COMMANDS, False
+
+        if is_command:
+            command = keyword
+            pending_next = _NEXT_LINE_REFS.get(keyword)
+            pending_list = None
+
+            if keyword == 'OPEN':
+                counts = _counts(None, fsm_counts, None)
+            elif keyword == 'NEW_SIMULATION':
+                counts = dict(DEFAULT_COUNTS)
+
+            for position, category in _INLINE_REFS.get(keyword, ()):
+                if position < len(tokens):
+                    referenced(line_number, command, category, tokens[position])
+
+            if keyword in _LISTS:
+                position, category = _LISTS[keyword]
+                if position < len(tokens) and tokens[position].isdigit() and int(tokens[position]) > 0:
+                    pending_list = (category, int(tokens[position]), None)
+
+            category = _REQUIRES.get(keyword)
+            if category is not None and counts[category] == 0:
+                issues.append(ScriptIssue(line_number, command, f"no {_NAMES[category]} exists."))
+
+            if keyword in _CREATES:
+                category = _CREATES[keyword]
+                number = 1
+                if keyword in _CREATE_COUNTS:
+                    position = _CREATE_COUNTS[keyword]
+                    number = int(tokens[position]) if position < len(tokens) and tokens[position].isdigit() else None
+                if counts[category] is not None:
+                    counts[category] = None if number is None else counts[category] + number
+            if keyword in _CLEARS:
+                counts[_CLEARS[keyword]] = 0
+            if keyword in _UNKNOWN_AFTER:
+                counts[_UNKNOWN_AFTER[keyword]] = None
+            continue
+
+        if command is None:
+            continue
+
+        if pending_next is not None:
+            referenced(line_number, command, pending_next, keyword)
+            pending_next = None
+            continue
+
+        if pending_list is not None:
+            category, remaining, per_line = pending_list
+            fields = [field for field in text.replace(',', ' ').split()]
+            if per_line is None:
+                # Either all indices on this line, or one row per index with the index first
+                per_line = not (len(fields) >= remaining and all(f.lstrip('-').isdigit() for f in fields))
+            taken = fields[:1] if per_line else fields[:remaining]
+            for field in taken:
+                check(line_number, command, category, field)
+            if per_line:
+                for position, row_category in _ROW_REFS.get(command, ()):
+                    if position < len(fields) and fields[position] != '0':
+                        check(line_number, command, row_category, fields[position])
+            remaining -= len(taken)
+            pending_list = (category, remaining, per_line) if remaining > 0 else None
+            continue
+
+        if keyword == 'SURFACES' and len(tokens) > 1 and tokens[1].isdigit() and int(tokens[1]) > 0:
+            pending_list = ('surfaces', int(tokens[1]), None)
+        elif keyword in _BLOCK_REFS and len(tokens) > 1:
+            referenced(line_number, command, _BLOCK_REFS[keyword], tokens[1])
+        elif (command, keyword) in _BLOCK_CREATES and len(tokens) > 1:
+            category = _BLOCK_CREATES[(command, keyword)]
+            if counts[category] is not None:
+                counts[category] = counts[category] + int(tokens[1]) if tokens[1].isdigit() else None
+    return issues
+
+def check_script(script=None, initial_counts=None, fsm_counts=None):
+    """
+    Raise a ValueError listing every invalid object reference of a script.
+
+    Takes the same arguments as validate_script; meant as a guard before launching a run.
+
+    Example usage:
+    check_script('case_12.txt', fsm_counts={'surfaces': 12})
+    execute_fsm_script('case_12.txt')
+    """
+    issues = validate_script(script, initial_counts=initial_counts, fsm_counts=fsm_counts)
+    if issues:
+        raise ValueError(f"Script has {len(issues)} invalid reference(s):\n" + "\n".join(str(issue) for issue in issues))
+    return
@@ -0,0 +1,368 @@
+from .utils import *
+
+# Legacy VTK data type names to NumPy types; binary sections are big-endian
+_VTK_TYPES = {
+    'unsigned_char': 'u1', 'char': 'i1', 'unsigned_short': 'u2', 'short': 'i2',
+    'unsigned_int': 'u4', 'int': 'i4', 'unsigned_long': 'u8', 'long': 'i8',
+    'float': 'f4', 'double': 'f8', 'vtktypeint64': 'i8', 'vtktypeuint64': 'u8', 'vtkidtype': 'i4',
+}
+
+_CELL_SECTIONS = ('VERTICES', 'LINES', 'POLYGONS', 'TRIANGLE_STRIPS', 'CELLS')
+_WHITESPACE = b' \t\r\n'
+
+class VTKArray:
+    """
+    Location of one array of a legacy VTK file; its values are only read by VTKFile.array.
+
+    Attributes:
+        name (str): Array name, or the section keyword for points, cells and coordinates.
+        association (str): 'POINT_DATA', 'CELL_DATA', 'FIELD' or 'GEOMETRY'.
+        kind (str): Section keyword, e.g. 'SCALARS', 'VECTORS' or 'FIELD'.
+        dtype (str): NumPy type of the values.
+        components (int): Values per tuple.
+        tuples (int): Number of tuples.
+        start (int): Byte offset of the first value.
+        end (int): Byte offset after the values.
+    """
+    __slots__ = ('name', 'association', 'kind', 'dtype', 'components', 'tuples', 'start', 'end')
+
+    def __init__(self, name, association, kind, dtype, components, tuples, start, end):
+        self.name = name
+        self.association = association
+        self.kind = kind
+        self.dtype = dtype
+        self.components = components
+        self.tuples = tuples
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return (f"VTKArray({self.name!r}, {self.association}, {self.kind}, {self.dtype}, "
+                f"{self.tuples}x{self.components})")
+
+class VTKFile:
+    """
+    Lazy reader of the legacy VTK files exported by export_solver_analysis_vtk.
+
+    Opening the file only reads its section headers and records where each array is stored;
+    an array is converted when it is first asked for. Binary sections are mapped straight
+    from the file with np.memmap, ASCII sections are converted by one bulk NumPy call. Only
+    the token positions of an ASCII file are scanned, with array operations, to find where
+    its sections end.
+
+    Attributes:
+        title (str): Title line of the file.
+        binary (bool): True for a BINARY file.
+        dataset (str): Dataset type, e.g. 'POLYDATA' or 'UNSTRUCTURED_GRID'.
+        arrays (list of VTKArray): Every array of the file, in file order.
+        header (dict): DIMENSIONS, ORIGIN and SPACING values and the cell count of each cell section.
+
+    Example usage:
+    vtk = VTKFile('C:/.../case12.vtk')
+    print(vtk.variables('CELL_DATA'))
+    peak_cp = vtk.array('Cp').min()
+    """
+    def __init__(self, filename, memory_map=None):
+        """
+        :param filename: Path of the VTK file.
+        :param memory_map: Memory-map the file instead of reading it. Defaults to None, which
+                           maps binary files and files larger than 64 MiB.
+        """
+        np = require_numpy()
+        check_file_existence(filename)
+        self.filename = filename
+        with open(filename, 'rb') as file:
+            head = file.read(4096)
+        lines = head.split(b'\n', 3)
+        if len(lines) < 4 or not lines[0].lower().startswith(b'# vtk datafile'):
+            raise ValueError(f"'{filename}' is not a legacy VTK file.")
+        self.title = lines[1].decode('ascii', errors='replace').strip()
+        file_format = lines[2].strip().upper()
+        if file_format not in (b'ASCII', b'BINARY'):
+            raise ValueError(f"'{filename}' has an unknown VTK file format '{file_format.decode(errors='replace')}'.")
+        self.binary = file_format == b'BINARY'
+
+        if memory_map is None:
+            memory_map = self.binary or os.path.getsize(filename) > 64 * 1024 * 1024
+        if memory_map:
+            self._data = np.memmap(filename, dtype=np.uint8, mode='r')
+        else:
+            with open(filename, 'rb') as file:
+                self._data = np.frombuffer(file.read(), dtype=np.uint8)
+
+        self.dataset = None
+        self.arrays = []
+        self.header = {}
+        self._cache = {}
+        self._tokens = None if self.binary else _token_starts(np, self._data)
+        self._index(len(lines[0]) + len(lines[1]) + len(lines[2]) + 3)
+
+    def _line(self, position):
+        # One header line at a byte offset, and the offset after it
+        data = self._data
+        chunk = data[position:position + 4096].tobytes()
+        end = chunk.find(b'\n')
+        if end < 0:
+            end = len(chunk)
+        return chunk[:end].decode('ascii', errors='replace').split(), position + end + 1
+
+    def _next(self, position):
+        # Offset of the next header line, skipping whitespace
+        data = self._data
+        size = data.size
+        while position < size:
+            chunk = data[position:position + 4096].tobytes()
+            stripped = chunk.lstrip(_WHITESPACE)
+            if stripped:
+                return position + len(chunk) - len(stripped)
+            position += len(chunk)
+        return size
+
+    def _skip(self, position, count, dtype):
+        # Byte range of 'count' values starting at 'position'
+        if self.binary:
+            end = position + count * int(dtype[1:])
+            if end > self._data.size:
+                raise ValueError(f"'{self.filename}' ends inside a data section.")
+            return position, end
+        np = require_numpy()
+        tokens = self._tokens
+        first = int(np.searchsorted(tokens, position))
+        if first + count > tokens.size:
+            raise ValueError(f"'{self.filename}' ends inside a data section.")
+        end = int(tokens[first + count]) if first + count < tokens.size else self._data.size
+        return (int(tokens[first]) if count else position), end
+
+    def _add(self, name, association, kind, type_name, components, tuples, position):
+        type_name = type_name.lower()
+        if type_name not in _VTK_TYPES:
+            raise ValueError(f"Unsupported VTK data type '{type_name}' of '{name}' in '{self.filename}'.")
+        dtype = _VTK_TYPES[type_name]
+        start, end = self._skip(position, components * tuples, dtype)
+        self.arrays.append(VTKArray(name, association, kind, dtype, components, tuples, start, end))
+        return end
+
+    def _index(self, position):
+        association = 'FIELD'
+        counts = {'POINT_DATA': 0, 'CELL_DATA': 0}
+        size = self._data.size
+        position = self._next(position)
+        while position < size:
+            words, after = self._line(position)
+            if not words:
+                position = self._next(after)
+                continue
+            keyword = words[0].upper()
+            if keyword == 'DATASET':
+                self.dataset = words[1].upper()
+                position = after
+            elif keyword in ('DIMENSIONS', 'ORIGIN', 'SPACING', 'ASPECT_RATIO'):
+                self.header[keyword] = [float(word) for word in words[1:]]
+                position = after
+            elif keyword == 'POINTS':
+                position = self._add('POINTS', 'GEOMETRY', keyword, words[2], 3, int(words[1]), after)
+            elif keyword in ('X_COORDINATES', 'Y_COORDINATES', 'Z_COORDINATES'):
+                position = self._add(keyword, 'GEOMETRY', keyword, words[2], 1, int(words[1]), after)
+            elif keyword in _CELL_SECTIONS:
+                cells, total = int(words[1]), int(words[2])
+                words, offsets_after = self._line(self._next(after))
+                if words[:1] == ['OFFSETS']:
+                    # VTK 5 layout: OFFSETS and CONNECTIVITY arrays instead of counted cells
+                    position = self._add(keyword + '_OFFSETS', 'GEOMETRY', 'OFFSETS', words[1], 1, cells,
+                                         offsets_after)
+                    words, after = self._line(self._next(position))
+                    position = self._add(keyword, 'GEOMETRY', 'CONNECTIVITY', words[1], 1, total, after)
+                else:
+                    position = self._add(keyword, 'GEOMETRY', keyword, 'int', 1, total, after)
+                self.header[keyword] = cells
+            elif keyword == 'CELL_TYPES':
+                position = self._add(keyword, 'GEOMETRY', keyword, 'int', 1, int(words[1]), after)
+            elif keyword in counts:
+                association = keyword
+                counts[keyword] = int(words[1])
+                position = after
+            elif keyword == 'SCALARS':
+                name, type_name = words[1], words[2]
+                components = int(words[3]) if len(words) > 3 else 1
+                words, table_after = self._line(self._next(after))
+                if words[:1] == ['LOOKUP_TABLE']:
+                    after = table_after
+                position = self._add(name, association, keyword, type_name, components, counts[association], after)
+            elif keyword in ('VECTORS', 'NORMALS', 'TENSORS'):
+                components = 9 if keyword == 'TENSORS' else 3
+                position = self._add(words[1], association, keyword, words[2], components, counts[association], after)
+            elif keyword == 'TEXTURE_COORDINATES':
+                position = self._add(words[1], association, keyword, words[3], int(words[2]),
+                                     counts[association], after)
+            elif keyword == 'COLOR_SCALARS':
+                type_name = 'unsigned_char' if self.binary else 'float'
+                position = self._add(words[1], association, keyword, type_name, int(words[2]),
+                                     counts[association], after)
+            elif keyword == 'LOOKUP_TABLE':
+                type_name = 'unsigned_char' if self.binary else 'float'
+                position = self._add(words[1], association, keyword, type_name, 4, int(words[2]), after)
+            elif keyword == 'FIELD':
+                position = after
+                for _ in range(int(words[2])):
+                    words, after = self._line(self._next(position))
+                    name, components, tuples, type_name = words[0], int(words[1]), int(words[2]), words[3]
+                    position = self._add(name, association, keyword, type_name, components, tuples, after)
+                    words, after = self._line(self._next(position))
+                    if words[:1] == ['METADATA']:
+                        position = self._skip_metadata(after)
+            elif keyword == 'METADATA':
+                position = self._skip_metadata(after)
+            else:
+                raise ValueError(f"Unknown VTK section '{words[0]}' in '{self.filename}'.")
+            position = self._next(position)
+
+    def _skip_metadata(self, position):
+        # METADATA blocks end with a blank line
+        while position < self._data.size:
+            words, after = self._line(position)
+            if not words:
+                return after
+            position = after
+        return position
+
+    def variables(self, association=None):
+        """
+        Names of the data arrays.
+
+        :param association: 'POINT_DATA', 'CELL_DATA' or 'FIELD'. Defaults to None, all of them.
+
+        Returns:
+            list of str: Array names in file order.
+        """
+        return [array.name for array in self.arrays if array.association != 'GEOMETRY'
+                and (association is None or array.association == association)]
+
+    def find(self, name, association=None):
+        """
+        Look up an array by name, exactly or else ignoring case.
+
+        :param name: Array name, or 'POINTS', 'CELL_TYPES', 'POLYGONS', ... for the geometry.
+        :param association: 'POINT_DATA', 'CELL_DATA', 'FIELD' or 'GEOMETRY'. Defaults to None, any.
+
+        Returns:
+            VTKArray
+        """
+        candidates = [array for array in self.arrays if association is None or array.association == association]
+        for match in ([array for array in candidates if array.name == name],
+                      [array for array in candidates if array.name.lower() == name.lower()]):
+            if len(match) == 1:
+                return match[0]
+            if len(match) > 1:
+                raise ValueError(f"`name` '{name}' is ambiguous in '{self.filename}'; give its `association` "
+                                 f"({', '.join(array.association for array in match)}).")
+        raise ValueError(f"No array '{name}' in '{self.filename}'; the arrays are {self.variables(association)}.")
+
+    def array(self, name, association=None):
+        """
+        Values of an array, converted on the first call and kept for later ones.
+
+        :param name: Array name, see find.
+        :param association: 'POINT_DATA', 'CELL_DATA', 'FIELD' or 'GEOMETRY'. Defaults to None, any.
+
+        Returns:
+            numpy array of shape (tuples,) for one component, else (tuples, components). Binary
+            arrays are read-only big-endian views of the mapped file.
+        """
+        np = require_numpy()
+        entry = self.find(name, association)
+        key = (entry.name, entry.association)
+        if key in self._cache:
+            return self._cache[key]
+        count = entry.components * entry.tuples
+        if self.binary:
+            values = np.frombuffer(self._data, dtype='>' + entry.dtype, count=count, offset=entry.start)
+        else:
+            dtype = np.float64 if entry.dtype[0] == 'f' else np.int64
+            text = self._data[entry.start:entry.end].tobytes()
+            values = np.fromstring(text, dtype=dtype, sep=' ') if count else np.zeros(0, dtype)
+            if values.size != count:
+                raise ValueError(f"'{entry.name}' in '{self.filename}' has unreadable values.")
+        if entry.components > 1:
+            values = values.reshape(entry.tuples, entry.components)
+        self._cache[key] = values
+        return values
+
+    @property
+    def points(self):
+        """Point coordinates, shape (points, 3)."""
+        return self.array('POINTS', 'GEOMETRY')
+
+    def cells(self, section=None):
+        """
+        Cells of a geometry section as offsets into a connectivity array.
+
+        :param section: 'POLYGONS', 'LINES', 'VERTICES', 'TRIANGLE_STRIPS' or 'CELLS'. Defaults to
+                        None, the first of these in the file.
+
+        Returns:
+            tuple of (offsets, connectivity): the point indices of cell i are
+            connectivity[offsets[i]:offsets[i + 1]].
+        """
+        np = require_numpy()
+        if section is None:
+            names = [array.name for array in self.arrays if array.kind in _CELL_SECTIONS + ('CONNECTIVITY',)]
+            if not names:
+                raise ValueError(f"'{self.filename}' has no cells.")
+            section = names[0]
+        section = section.upper()
+        flat = np.asarray(self.array(section, 'GEOMETRY'), dtype=np.int64)
+        if any(array.name == section + '_OFFSETS' for array in self.arrays):
+            return np.asarray(self.array(section + '_OFFSETS', 'GEOMETRY'), dtype=np.int64), flat
+
+        cells = self.header[section]
+        if cells and flat.size % cells == 0 and (flat[::flat.size // cells] == flat.size // cells - 1).all():
+            # Cells of one size, e.g. all triangles, without a Python loop
+            width = flat.size // cells
+            connectivity = flat.reshape(cells, width)[:, 1:].reshape(-1)
+            return np.arange(0, cells * (width - 1) + 1, width - 1, dtype=np.int64), connectivity
+        heads = np.empty(cells, dtype=np.int64)
+        values = flat.tolist()
+        position = 0
+        for i in range(cells):
+            heads[i] = position
+            position += values[position] + 1
+        sizes = flat[heads]
+        keep = np.ones(flat.size, dtype=bool)
+        keep[heads] = False
+        return np.concatenate(([0], np.cumsum(sizes))), flat[keep]
+
+def _token_starts(np, data, chunk=64 * 1024 * 1024):
+    # Byte offset of every whitespace-separated token, computed in chunks to bound memory.
+    # Space, tab, CR and LF are all <= 32, and one comparison is faster than a table lookup.
+    starts = []
+    previous = True
+    for first in range(0, data.size, chunk):
+        blank = data[first:first + chunk] <= 32
+        head = [first] if previous and not blank[0] else []
+        starts.append(np.concatenate((np.asarray(head, dtype=np.int64),
+                                      np.flatnonzero(blank[:-1] > blank[1:]) + (first + 1))))
+        previous = bool(blank[-1])
+    return np.concatenate(starts) if starts else np.zeros(0, dtype=np.int64)
+
+def read_vtk(filename, variables=None, association=None, memory_map=None):
+    """
+    Read data arrays of a legacy VTK file exported by export_solver_analysis_vtk.
+
+    Only the requested arrays are converted (see VTKFile), so scanning many case files for
+    one variable reads little more than that variable.
+
+    :param filename: Path of the VTK file.
+    :param variables: Array names to read. Defaults to None, every data array.
+    :param association: 'POINT_DATA', 'CELL_DATA' or 'FIELD'. Defaults to None, any.
+    :param memory_map: See VTKFile. Defaults to None.
+
+    Returns:
+        dict: Array name to numpy array, in the order of 'variables' or of the file.
+
+    Example usage:
+    peak = {path: read_vtk(path, ['Cp'])['Cp'].min() for path in glob.glob('C:/.../cases/*.vtk')}
+    """
+    vtk = VTKFile(filename, memory_map=memory_map)
+    if variables is None:
+        variables = vtk.variables(association)
+    return {name: vtk.array(name, association) for name in variables}
@@ -0,0 +1,177 @@
+import math
+import os
+import time
+from .monitor import LogMonitor, LogTailer
+
+class Watchdog:
+    """
+    Kill policy for a running FlightStream process.
+
+    While the process runs, the watchdog polls its stdout file and optional log file (new
+    lines parsed by a LogMonitor) and the size of the files the script writes, and kills the
+    process as soon as one policy fires:
+
+    - timeout: the run took longer than 'timeout' seconds.
+    - stall: no new output line and no output file growth for 'stall_timeout' seconds.
+    - residual blow-up: a residual is NaN or infinite, above 'max_residual', or more than
+      'residual_growth' times the lowest residual seen so far.
+    - error: an error message was printed, with 'kill_on_error'.
+
+    Killing a stuck run frees its FlightStream license and cores for the next case.
+
+    Example usage:
+    watchdog = Watchdog(timeout=4 * 3600, stall_timeout=900, residual_growth=1e4)
+    results = run_scripts_parallel(scripts, max_instances=8, watchdog=watchdog)
+    killed = [result for result in results if result.killed]
+    """
+    def __init__(self, timeout=None, stall_timeout=None, residual_growth=None, max_residual=None,
+                 kill_on_error=False, interval=1.0, patterns=None):
+        """
+        :param timeout: Maximum wall time in seconds. Defaults to None (no limit).
+        :param stall_timeout: Maximum seconds without any sign of progress. Defaults to None (no limit).
+        :param residual_growth: Factor over the lowest residual that counts as a blow-up. Defaults to None.
+        :param max_residual: Residual value that counts as a blow-up. Defaults to None.
+        :param kill_on_error: Kill the run on the first error message. Defaults to False.
+        :param interval: Seconds between polls. Defaults to 1.0.
+        :param patterns: Log pattern overrides, see LogMonitor. Defaults to None.
+        """
+        for name, value in (('timeout', timeout), ('stall_timeout', stall_timeout),
+                            ('max_residual', max_residual)):
+            if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+                raise ValueError(f"`{name}` should be a positive number.")
+        if residual_growth is not None and (not isinstance(residual_growth, (int, float)) or residual_growth <= 1):
+            raise ValueError("`residual_growth` should be a number greater than 1.")
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError("`interval` should be a positive number.")
+        self.timeout = timeout
+        self.stall_timeout = stall_timeout
+        self.residual_growth = residual_growth
+        self.max_residual = max_residual
+        self.kill_on_error = kill_on_error
+        self.interval = interval
+        self.patterns = patterns
+
+    def _residual_verdict(self, residuals, lowest):
+        # Checks the new residuals; returns the verdict and the lowest residual so far
+        for _, residual in residuals:
+            value = abs(residual)
+            if math.isnan(value) or math.isinf(value):
+                return f"residual blow-up ({residual})", lowest
+            if self.max_residual is not None and value > self.max_residual:
+                return f"residual blow-up ({residual:g} > {self.max_residual:g})", lowest
+            if self.residual_growth is not None and lowest is not None and value > lowest * self.residual_growth:
+                return f"residual blow-up ({residual:g} > {self.residual_growth:g} x {lowest:g})", lowest
+            lowest = value if lowest is None else min(lowest, value)
+        return None, lowest
+
+    def watch(self, process, stdout_path=None, log_path=None, output_paths=()):
+        """
+        Poll a running process until it exits or a policy kills it.
+
+        :param process: The subprocess.Popen of the FlightStream run.
+        :param stdout_path: File the run's standard output is written to. Defaults to None.
+        :param log_path: Log file the script exports while running. Defaults to None.
+        :param output_paths: Files or folders whose growth counts as progress. Defaults to ().
+
+        Returns:
+            str: Why the process was killed, or None if it exited on its own.
+        """
+        tailers = [LogTailer(path) for path in (stdout_path, log_path) if path is not None]
+        monitor = LogMonitor(patterns=self.patterns)
+        sizes = {path: _size(path) for path in output_paths}
+        checked = 0
+        lowest = None
+        start = last_progress = time.monotonic()
+        while process.poll() is None:
+            now = time.monotonic()
+            for tailer in tailers:
+                lines = tailer.read_lines()
+                if lines:
+                    last_progress = now
+                for line in lines:
+                    monitor.feed(line)
+            for path, size in sizes.items():
+                current = _size(path)
+                if current != size:
+                    sizes[path] = current
+                    last_progress = now
+
+            reason = None
+            if self.timeout is not None and now - start > self.timeout:
+                reason = f"timeout ({self.timeout:g} s)"
+            elif self.stall_timeout is not None and now - last_progress > self.stall_timeout:
+                reason = f"stalled (no progress for {self.stall_timeout:g} s)"
+            elif self.kill_on_error and monitor.errors:
+                reason = f"error: {monitor.errors[0].strip()}"
+            else:
+                reason, lowest = self._residual_verdict(monitor.residuals[checked:], lowest)
+                checked = len(monitor.residuals)
+            if reason is not None:
+                _kill(process)
+                return reason
+            time.sleep(self.interval)
+        return None
+
+def _size(path):
+    try:
+        if os.path.isdir(path):
+            return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+def _kill(process):
+    try:
+        process.kill()
+    except OSError:
+        pass
+    process.wait()
+
+def run_script_watched(script_path, watchdog, fsexe_path=None, hidden=True, log_path=None,
+                       stdout_path=None, stderr_path=None):
+    """
+    Run one FlightStream script under a Watchdog.
+
+    :param script_path: Path to the script file.
+    :param watchdog: The Watchdog policy.
+    :param fsexe_path: Path to the FlightStream executable. Defaults to the FS_EXE environment variable.
+    :param hidden: Run FlightStream without its GUI. Defaults to True.
+    :param log_path: Log file the script exports while running, also watched. Defaults to None.
+    :param stdout_path: File for the standard output. Defaults to '<script name>.stdout.txt'.
+    :param stderr_path: File for the standard error. Defaults to '<script name>.stderr.txt'.
+
+    Returns:
+        RunResult, with 'killed' set to the reason if the watchdog killed the run.
+
+    Example usage:
+    result = run_script_watched('case1.txt', Watchdog(timeout=3600, stall_timeout=600))
+    """
+    from .runner import _run_one, _CoreBudget, build_command, resolve_fsexe_path, script_processors
+
+    fsexe_path = resolve_fsexe_path(fsexe_path)
+    if not os.path.exists(script_path):
+        raise FileNotFoundError(f"The specified file '{script_path}' does not exist on path.")
+    stem = os.path.splitext(script_path)[0]
+    stdout_path = stem + '.stdout.txt' if stdout_path is None else stdout_path
+    stderr_path = stem + '.stderr.txt' if stderr_path is None else stderr_path
+    processors = script_processors(script_path)
+    return _run_one(build_command(fsexe_path, script_path, hidden), script_path, stdout_path, stderr_path,
+                    processors, _CoreBudget(processors), watchdog=watchdog, log_path=log_path)
+
+if __name__ == '__main__':
+    # Self-check: a stand-in solver that prints a non-finite residual and then hangs is killed
+    import subprocess
+    import sys
+    import tempfile
+    failures = 0
+    for line in ('Iteration 12: residual = NaN', 'iter 13 residual -inf', 'Residual (L2) = Infinity'):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            stdout_path = os.path.join(tmpdir, 'run.stdout.txt')
+            with open(stdout_path, 'w') as stdout:
+                process = subprocess.Popen([sys.executable, '-c', f'import time; print({line!r}, flush=True); '
+                                                                  'time.sleep(60)'], stdout=stdout)
+            reason = Watchdog(timeout=30, interval=0.1).watch(process, stdout_path=stdout_path)
+        ok = reason is not None and reason.startswith('residual blow-up')
+        failures += not ok
+        print(f"{'ok' if ok else 'FAILED'}: {line!r} -> {reason}")
+    sys.exit(1 if failures else 0)
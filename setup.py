@@ -17,7 +17,7 @@ setup(
     ],
     python_requires=">=3.6",
     install_requires=[    ],
-    extras_require={       },
+    extras_require={'results': ['numpy']},
     package_data={   },
 )
 